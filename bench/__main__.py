@@ -0,0 +1,161 @@
+import argparse
+import os
+import shutil
+import sys
+
+from bench import results
+from bench.runner import run_in_process, run_subprocess, summarise
+
+SIZES = [100, 10_000, 100_000, 1_000_000]
+MODES = ["in-process", "subprocess"]
+
+# {id} is replaced with a task id from the generated profile
+COMMANDS = {
+    "ls": ["ls"],
+    "ls --all": ["ls", "--all"],
+    "new": ["new", "benchmark", "task"],
+    "modify": ["modify", "{id}", "--priority", "7"],
+    "info": ["info", "{id}"],
+    "config get": ["config", "get", "status.default"],
+    "profile ls": ["profile", "ls"],
+}
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Fir command line benchmarks")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run = sub.add_parser("run", help="Run the benchmarks")
+    run.add_argument("--sizes", type=__int_list, default=SIZES, help="Profile sizes, comma separated")
+    run.add_argument("--commands", type=__command_list, default=list(COMMANDS), help="Commands, comma separated")
+    run.add_argument("--modes", type=__mode_list, default=MODES, help="in-process and/or subprocess")
+    run.add_argument("--repeat", type=int, default=5, help="Measured runs per command")
+    run.add_argument("--warmup", type=int, default=1,
+                     help="Unmeasured runs per command, the first run after a reset rebuilds the snapshot cache")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--workdir", default=".bench", help="Generated profiles & the fir home used by the runs")
+    run.add_argument("--out", help="Write results to this JSON file")
+    run.add_argument("--baseline", help="Compare against an earlier results file")
+    run.add_argument("--threshold", type=float, default=0.1, help="Relative slow down reported as a regression")
+
+    cmp = sub.add_parser("compare", help="Compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.action == "compare":
+        return report(results.compare(results.load(args.baseline), results.load(args.current), args.threshold))
+
+    current = benchmark(args)
+    if args.out:
+        results.save(args.out, current)
+        print(f"Results written to {args.out}")
+    if args.baseline:
+        return report(results.compare(results.load(args.baseline), current, args.threshold))
+    return 0
+
+
+def benchmark(args) -> dict:
+    workdir = os.path.abspath(args.workdir)
+    home = os.path.join(workdir, "home")
+    # fir resolves its data directory from HOME on import, so this has to happen before anything imports fir
+    os.environ["HOME"] = home
+    os.environ.pop("POETRY_ACTIVE", None)
+
+    from bench import profiles
+    from fir.config import DATA_DIR
+    from fir.data.settings import Settings
+
+    current = results.new_results({
+        "sizes": args.sizes,
+        "commands": args.commands,
+        "modes": args.modes,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "seed": args.seed,
+    })
+
+    for size in args.sizes:
+        print(f"Preparing profile with {size} tasks", file=sys.stderr)
+        pristine, ids = profiles.prepare(os.path.join(workdir, "profiles"), size, args.seed)
+        name = f"bench-{size}"
+        target = os.path.join(DATA_DIR, f"{name}.toml")
+
+        settings = Settings()
+        settings.data.profiles[name] = target
+        settings.save()
+
+        for command in args.commands:
+            argv = ["--scope", name] + [a.format(id=ids[0]) for a in COMMANDS[command]]
+            for mode in args.modes:
+                __reset(pristine, target)
+                samples = []
+                for i in range(args.warmup + args.repeat):
+                    if mode == "in-process":
+                        sample = run_in_process(argv)
+                    else:
+                        sample = run_subprocess(argv, dict(os.environ), workdir)
+                    if sample["exit_code"] != 0:
+                        raise SystemExit(f"'fir {' '.join(argv)}' exited with {sample['exit_code']}")
+                    if i >= args.warmup:
+                        samples.append(sample)
+
+                result = {"mode": mode, "size": size, "command": command, "argv": argv, **summarise(samples)}
+                current["results"].append(result)
+                print(__format(result), file=sys.stderr)
+
+    return current
+
+
+def report(rows: list[dict]) -> int:
+    print(f"{'mode':<12}{'size':>9}  {'command':<12}{'baseline':>12}{'current':>12}{'change':>9}")
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['mode']:<12}{r['size']:>9}  {r['command']:<12}{r['baseline_ms']:>10.2f}ms"
+              f"{r['current_ms']:>10.2f}ms{r['change']:>+9.1%}{flag}")
+
+    regressions = [r for r in rows if r["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+def __reset(pristine: str, target: str):
+    # Mutating commands write to the profile, each command & mode starts from the generated copy
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copyfile(pristine, target)
+    if os.path.exists(f"{target}.journal"):
+        os.remove(f"{target}.journal")
+
+
+def __format(result: dict) -> str:
+    phases = " ".join(f"{p}={ms:.1f}" for p, ms in result["phases_ms"].items())
+    imported = f" import={result['import_ms']:.1f}ms" if result["import_ms"] is not None else ""
+    return (f"{result['mode']:<11} {result['size']:>8} {result['command']:<11} "
+            f"median={result['wall_ms']['median']:.1f}ms{imported} rss={result['peak_rss_kb'] // 1024}MB {phases}")
+
+
+def __int_list(value: str) -> list[int]:
+    return [int(v.replace("_", "")) for v in value.split(",")]
+
+
+def __command_list(value: str) -> list[str]:
+    commands = [v.strip() for v in value.split(",")]
+    for c in commands:
+        if c not in COMMANDS:
+            raise argparse.ArgumentTypeError(f"unknown command '{c}', choose from {', '.join(COMMANDS)}")
+    return commands
+
+
+def __mode_list(value: str) -> list[str]:
+    modes = [v.strip() for v in value.split(",")]
+    for m in modes:
+        if m not in MODES:
+            raise argparse.ArgumentTypeError(f"unknown mode '{m}', choose from {', '.join(MODES)}")
+    return modes
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import json
+import sys
+import time
+
+# Entry point for a single subprocess measurement: python -m bench.child <result file> <fir args...>
+
+if __name__ == "__main__":
+    out, argv = sys.argv[1], sys.argv[2:]
+
+    start = time.perf_counter()
+    from fir.cmd import cmd
+    import_ms = (time.perf_counter() - start) * 1000
+
+    from bench.runner import peak_rss_kb, phases_ms
+    from fir.utils import timings
+
+    timings.enable()
+    code = 0
+    sys.argv = ["fir"] + argv
+    try:
+        cmd()
+    except SystemExit as e:
+        code = e.code or 0
+
+    with open(out, "w") as f:
+        json.dump({
+            "exit_code": code,
+            "import_ms": import_ms,
+            "peak_rss_kb": peak_rss_kb(),
+            "phases_ms": phases_ms(),
+        }, f)
@@ -0,0 +1,23 @@
+import json
+import os
+
+from fir.data.generate import GenerateOptions, generate_profile, generate_statuses, generate_tasks
+
+
+def prepare(directory: str, size: int, seed: int) -> (str, list[str]):
+    # Generated once per size & seed and reused by later runs, returns the path & some task ids to target
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"tasks-{size}-{seed}.toml")
+    meta = f"{path}.json"
+    if os.path.exists(path) and os.path.exists(meta):
+        with open(meta) as f:
+            return path, json.load(f)["ids"]
+
+    options = GenerateOptions(tasks=size, description_length=40, seed=seed)
+    generate_profile(path, f"bench {size}", options)
+
+    # Generation is deterministic, the first task is regenerated rather than reading the whole profile back
+    ids = [next(generate_tasks(options, generate_statuses(options))).id]
+    with open(meta, "w") as f:
+        json.dump({"size": size, "seed": seed, "ids": ids}, f)
+    return path, ids
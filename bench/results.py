@@ -0,0 +1,69 @@
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from bench.runner import ROOT
+
+VERSION = 1
+
+
+def new_results(config: dict) -> dict:
+    return {
+        "version": VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": __commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": [],
+    }
+
+
+def save(path: str, results: dict):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported benchmark results version {results.get('version')}")
+    return results
+
+
+def key(result: dict) -> (str, int, str):
+    return result["mode"], result["size"], result["command"]
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float = 1.0) -> list[dict]:
+    # Median wall time of each (mode, size, command) against the baseline, a regression needs to be both
+    # relatively (threshold) & absolutely (min_delta_ms) slower so tiny commands don't flap on noise
+    previous = {key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        before = previous.get(key(r))
+        if before is None:
+            continue
+        old, new = before["wall_ms"]["median"], r["wall_ms"]["median"]
+        change = (new - old) / old if old else 0.0
+        rows.append({
+            "mode": r["mode"],
+            "size": r["size"],
+            "command": r["command"],
+            "baseline_ms": old,
+            "current_ms": new,
+            "change": change,
+            "regression": change > threshold and new - old > min_delta_ms,
+        })
+    return rows
+
+
+def __commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
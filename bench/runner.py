@@ -0,0 +1,94 @@
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def phases_ms() -> dict[str, float]:
+    # Phases recorded by fir.utils.timings for the last invocation, import & total are reported separately
+    from fir.utils import timings
+    return {p: ms for p, ms in timings.phases().items() if p not in ("import", "total")}
+
+
+def run_in_process(argv: list[str]) -> dict:
+    from fir.cmd import cmd
+    from fir.utils import timings
+
+    timings.enable()
+    code = 0
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        sys.argv = ["fir"] + argv
+        start = time.perf_counter()
+        try:
+            cmd()
+        except SystemExit as e:
+            code = e.code or 0
+        wall = (time.perf_counter() - start) * 1000
+
+    return {
+        "exit_code": code,
+        "wall_ms": wall,
+        "import_ms": None,
+        # Process wide high water mark, the harness & earlier runs count towards it
+        "peak_rss_kb": peak_rss_kb(),
+        "phases_ms": phases_ms(),
+    }
+
+
+def run_subprocess(argv: list[str], env: dict, cwd: str) -> dict:
+    fd, out = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        env = dict(env, PYTHONPATH=ROOT)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "bench.child", out, *argv], env=env, cwd=cwd,
+                       stdout=subprocess.DEVNULL, check=False)
+        wall = (time.perf_counter() - start) * 1000
+        with open(out) as f:
+            sample = json.load(f)
+    finally:
+        os.remove(out)
+
+    # Wall time here includes interpreter start up, the child reports its own import time separately
+    sample["wall_ms"] = wall
+    return sample
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss survives exec on Linux, so a child would report its parent's peak. VmHWM is per process.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def summarise(samples: list[dict]) -> dict:
+    walls = [s["wall_ms"] for s in samples]
+    imports = [s["import_ms"] for s in samples if s["import_ms"] is not None]
+    phases = {}
+    for s in samples:
+        for phase, ms in s["phases_ms"].items():
+            phases.setdefault(phase, []).append(ms)
+
+    return {
+        "runs": len(samples),
+        "wall_ms": {
+            "min": round(min(walls), 3),
+            "median": round(statistics.median(walls), 3),
+            "max": round(max(walls), 3),
+        },
+        "import_ms": round(statistics.median(imports), 3) if imports else None,
+        "peak_rss_kb": max(s["peak_rss_kb"] for s in samples),
+        "phases_ms": {p: round(statistics.median(v), 3) for p, v in phases.items()},
+    }
@@ -0,0 +1,4 @@
+import time
+
+# Start of the fir import, used to report import time when timings are enabled
+IMPORT_START_NS = time.perf_counter_ns()
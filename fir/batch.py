@@ -0,0 +1,204 @@
+import io
+import json
+import shlex
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from fir.cmd import cmd, load_handlers
+from fir.cmd.builder import Cmd
+from fir.cmd.builder.arg_parser import ArgParserSetup
+from fir.context import Context
+from fir.data.session import Session
+
+# Runs many commands against one Session with write-behind profiles, so a batch of edits is a single load & a
+# single save per profile. Each line is either CLI syntax ('modify abc --status done'), a JSON array of argv or a
+# JSON object naming the command & its arguments by parameter name:
+#   {"command": "modify", "task_id": "abc", "status": "done"}
+#   {"command": "tag", "task_id": "abc", "tags": ["x", "y"], "scope": "work"}
+
+# Handlers whose commands only change profiles, anything else would write outside the batch's single save
+BATCH_HANDLERS = (None, "set", "bulk", "status", "config")
+EXCLUDED_COMMANDS = ("shell", "batch", "serve")
+READ_ONLY_COMMANDS = ("ls",)
+
+
+def split_scope(argv: list[str]) -> (str | None, list[str]):
+    # Leading options & the command's words, e.g. '--scope work ls'
+    scope = None
+    words = list(argv)
+    while words and words[0].startswith("-"):
+        option = words.pop(0)
+        if option == "--scope" and words:
+            scope = words.pop(0)
+    return scope, words
+
+
+def task_ids(profile, command: Cmd, words: list[str]) -> list[str] | None:
+    # The task named by the command's task_id positional, if there is one & it resolves. Commands selecting tasks
+    # with filters (bulk) can change any of them, None checkpoints every task.
+    if any(a.name == "where" for a in command.optionals) and command.name not in READ_ONLY_COMMANDS:
+        return None
+    positionals = []
+    skip = False
+    for w in words:
+        if skip:
+            skip = False
+        elif any(w in a.aliases for a in command.optionals):
+            skip = True
+        elif not w.startswith("-"):
+            positionals.append(w)
+    for arg, value in zip(command.args, positionals):
+        if arg.name == "task_id":
+            task, _ = profile.get_task(value)
+            return [] if task is None else [task.id]
+    return []
+
+
+@dataclass
+class BatchResult:
+    line: int
+    argv: list[str]
+    exit: int
+    output: str
+
+    @property
+    def ok(self) -> bool:
+        return self.exit == 0
+
+    def to_dict(self) -> dict:
+        return {"line": self.line, "argv": self.argv, "ok": self.ok, "exit": self.exit, "output": self.output}
+
+
+class Batch:
+    session: Session
+    continue_on_error: bool
+    scope: str | None
+    applied: int
+    failed: int
+
+    def __init__(self, session: Session = None, continue_on_error: bool = False, scope: str = None):
+        self.session = session or Session(write_behind=True)
+        self.continue_on_error = continue_on_error
+        # Profile for lines that don't give their own --scope
+        self.scope = scope
+        self.applied = 0
+        self.failed = 0
+        self.__setup = ArgParserSetup(*load_handlers(Context()))
+
+    def run(self, lines: Iterable[str]) -> Iterator[BatchResult]:
+        # Stops at the first failure unless continue_on_error, nothing is written until commit()
+        for n, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            result = self.execute(n, line)
+            if result.ok:
+                self.applied += 1
+            else:
+                self.failed += 1
+            yield result
+            if not result.ok and not self.continue_on_error:
+                return
+
+    def commit(self) -> int:
+        pending = len(self.session.pending())
+        self.session.flush()
+        return pending
+
+    def execute(self, n: int, line: str) -> BatchResult:
+        try:
+            argv = self.parse(line)
+            if self.scope and "--scope" not in argv:
+                argv = ["--scope", self.scope] + argv
+            scope, command, words = self.__command(argv)
+        except ValueError as e:
+            return BatchResult(n, [], 2, str(e))
+
+        settings = self.session.settings()
+        profile = self.session.profile(settings.get_profile(scope or settings.data.scope)[1])
+        if not profile.has_read:
+            profile.read()
+        # A failed line is undone so the batch carries on from the state the previous lines left
+        cp = profile.checkpoint(task_ids(profile, command, words))
+
+        out = io.StringIO()
+        code = 0
+        with redirect_stdout(out), redirect_stderr(out):
+            try:
+                cmd(argv, self.session, record=False)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+
+        if code == 0:
+            profile.release(cp)
+        else:
+            profile.rollback(cp)
+        return BatchResult(n, argv, code, out.getvalue().strip())
+
+    def parse(self, line: str) -> list[str]:
+        if line.startswith("{"):
+            return self.to_argv(self.__json(line, dict))
+        if line.startswith("["):
+            argv = self.__json(line, list)
+            if not all(isinstance(a, str) for a in argv):
+                raise ValueError("A JSON array must only hold strings")
+            return argv
+        try:
+            return shlex.split(line)
+        except ValueError as e:
+            raise ValueError(f"Could not parse command: {e}")
+
+    def to_argv(self, op: dict) -> list[str]:
+        op = dict(op)
+        name = op.pop("command", None)
+        if not isinstance(name, str):
+            raise ValueError('JSON operations need a command, e.g. {"command": "modify", "task_id": "abc"}')
+        words = name.split()
+        scope = op.pop("scope", None)
+        _, command, _ = self.__setup.find_command(words)
+        if command is None:
+            raise ValueError(f"Unknown command: {name}")
+
+        argv = (["--scope", str(scope)] if scope else []) + words
+        for arg in command.args:
+            argv += self.__values(op.pop(arg.name, None))
+        for arg in command.optionals:
+            value = op.pop(arg.name, None)
+            if value is not None:
+                argv += [arg.aliases[0], str(value)]
+        for arg in command.flags:
+            if op.pop(arg.name, False):
+                argv.append(arg.aliases[0])
+        if op:
+            raise ValueError(f"Unknown fields for {name}: {', '.join(op)}")
+        return argv
+
+    def __command(self, argv: list[str]) -> (str | None, Cmd, list[str]):
+        scope, words = split_scope(argv)
+        handler, command, rest = self.__setup.find_command(words)
+        if command is None:
+            raise ValueError(f"Unknown command: {' '.join(argv)}")
+        if handler.name not in BATCH_HANDLERS or command.name in EXCLUDED_COMMANDS:
+            raise ValueError(f"'{' '.join(words[:2] if handler.name else words[:1])}' can't be used in a batch")
+        return scope, command, rest
+
+    def __values(self, value) -> list[str]:
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return [str(v) for v in value]
+        return [str(value)]
+
+    def __json(self, line: str, expected: type):
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(value, expected):
+            raise ValueError(f"Expected a JSON {expected.__name__}")
+        return value
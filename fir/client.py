@@ -0,0 +1,102 @@
+import os
+import sys
+
+from fir.config import DATA_DIR
+
+# Thin client for the fir daemon (fir daemon start). Only the standard library is imported until it's known that
+# no daemon is listening, in which case the command runs in process exactly as 'fir' would.
+
+SOCKET_ENV = "FIR_SOCKET"
+# Read by fir while running a command, so they're sent along with argv & applied in the daemon for that request
+FORWARDED_ENV = ("FIR_METRICS", "FIR_LOCK_TIMEOUT", "NO_COLOR", "FORCE_COLOR", "ANSI_COLORS_DISABLED", "TERM",
+                 "COLUMNS")
+# Commands that manage the daemon itself, or need this terminal, always run in process
+LOCAL_COMMANDS = ("daemon", "shell", "serve")
+# Commands that can read stdin, a piped stdin is sent along with the request
+STDIN_COMMANDS = ("batch",)
+
+
+def socket_path() -> str:
+    return os.environ.get(SOCKET_ENV) or os.path.join(DATA_DIR, "daemon.sock")
+
+
+def connect(path: str = None, timeout: float = None):
+    import socket
+
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        s.connect(path)
+    except OSError:
+        s.close()
+        return None
+    return s
+
+
+def request(s, message: dict):
+    import json
+
+    s.sendall((json.dumps(message) + "\n").encode("utf-8"))
+    with s.makefile("rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def forward(s, argv: list[str]) -> int:
+    message = {
+        "op": "run",
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": {k: os.environ[k] for k in FORWARDED_ENV if k in os.environ},
+        "tty": sys.stdout.isatty(),
+    }
+    if command_name(argv) in STDIN_COMMANDS and not sys.stdin.isatty():
+        message["stdin"] = sys.stdin.read()
+    for frame in request(s, message):
+        if "out" in frame:
+            sys.stdout.write(frame["out"])
+            sys.stdout.flush()
+        elif "err" in frame:
+            sys.stderr.write(frame["err"])
+            sys.stderr.flush()
+        elif "exit" in frame:
+            return frame["exit"]
+
+    # Not retried in process, the command may already have been applied
+    print("ERROR!\nThe fir daemon closed the connection before the command finished", file=sys.stderr)
+    return 1
+
+
+def main():
+    argv = sys.argv[1:]
+    if os.environ.get("_ARGCOMPLETE") is None and command_name(argv) not in LOCAL_COMMANDS:
+        s = connect()
+        if s is not None:
+            try:
+                code = forward(s, argv)
+            finally:
+                s.close()
+            raise SystemExit(code)
+
+    from fir.cmd import cmd
+    cmd()
+
+
+def command_name(argv: list[str]) -> str | None:
+    # The first positional, skipping --scope's value, see ArgParserSetup.peek_command
+    skip = False
+    for a in argv:
+        if skip:
+            skip = False
+        elif a == "--scope":
+            skip = True
+        elif not a.startswith("-"):
+            return a
+    return None
+
+
+if __name__ == "__main__":
+    main()
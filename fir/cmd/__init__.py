@@ -1,45 +1,135 @@
+import os
+import sys
+import time
+from importlib import import_module
+
+import fir
 from fir import config
+from fir.cmd.builder import CmdBuilder
 from fir.cmd.builder.arg_parser import ArgParserSetup
-from fir.cmd.set_commands import SetHandlers
-from fir.cmd.status_commands import StatusHandlers
 from fir.context import Context
-from fir.cmd.base_commands import CommandHandlers
-from fir.cmd.profile_commands import ProfileHandlers
-from fir.cmd.config_commands import ConfigHandlers
 from fir.data.profile import Profile
+from fir.data.session import Session
 from fir.data.settings import Settings
+from fir.utils import timings
+
+# Command modules by handler name (None being the top level commands), imported only when argv needs them
+HANDLERS = {
+    None: ("fir.cmd.base_commands", "CommandHandlers"),
+    "config": ("fir.cmd.config_commands", "ConfigHandlers"),
+    "profile": ("fir.cmd.profile_commands", "ProfileHandlers"),
+    "status": ("fir.cmd.status_commands", "StatusHandlers"),
+    "set": ("fir.cmd.set_commands", "SetHandlers"),
+    "bulk": ("fir.cmd.bulk_commands", "BulkHandlers"),
+    "dev": ("fir.cmd.dev_commands", "DevHandlers"),
+    "perf": ("fir.cmd.perf_commands", "PerfHandlers"),
+    "daemon": ("fir.cmd.daemon_commands", "DaemonHandlers"),
+    "archive": ("fir.cmd.archive_commands", "ArchiveHandlers"),
+}
+
+
+def cmd(argv: list[str] = None, session: Session = None, record: bool = True):
+    # A session (see fir.data.session) keeps settings & profiles loaded between calls, e.g. in the daemon.
+    # Without record the command's spans add to the enclosing invocation's timings, e.g. lines of a batch.
+    if argv is None:
+        argv = sys.argv[1:]
+    metrics = timings.metrics_path(config.DATA_DIR)
+    if "--timings" in argv or metrics is not None:
+        timings.enable()
+    if not timings.enabled or not record:
+        return __run(argv, {}, session)
 
+    timings.reset()
+    if session is None:
+        timings.record("import", IMPORT_NS)
+    info = {}
+    code = 0
+    start = time.perf_counter_ns()
+    try:
+        __run(argv, info, session)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        raise
+    except BaseException:
+        code = 1
+        raise
+    finally:
+        timings.record("total", time.perf_counter_ns() - start)
+        if info.get("timings"):
+            timings.print_report()
+        if metrics is not None:
+            timings.append_metrics(metrics, __metrics_entry(info, code))
 
-def cmd():
-    s = Settings()
+
+def __run(argv: list[str], info: dict, session: Session = None):
+    with timings.span("settings"):
+        s = Settings() if session is None else session.settings()
     c = Context()
 
-    setup = ArgParserSetup(
-        CommandHandlers(c),
-        ConfigHandlers(c),
-        ProfileHandlers(c),
-        StatusHandlers(c),
-        SetHandlers(c))
+    with timings.span("handlers"):
+        setup = ArgParserSetup(*load_handlers(c, argv))
 
-    parser = setup.configure_argparser()
+    with timings.span("argparse"):
+        parser = setup.configure_argparser(argv)
+        if os.environ.get("_ARGCOMPLETE") is not None:
+            import argcomplete
+            argcomplete.autocomplete(parser)
 
-    args = vars(parser.parse_args())
+        args = vars(parser.parse_args(argv))
+    info["timings"] = args.get("timings")
     scope = s.data.scope
 
     if args.get("scope"):
         scope = args.get("scope")
 
     _, profile_path = s.get_profile(scope)
-    p = Profile(profile_path, read=False)
+    p = Profile(profile_path, read=False) if session is None else session.profile(profile_path)
     c.setup(args, p, s)
+    info["profile"] = scope
+    info["profile_instance"] = p
 
     c.logger.log_debug(f"Args: {c.args.as_dict()}")
     c.logger.log_debug(f"Env: {config.ENV}")
 
     command = setup.get_command(c.args.as_dict())
     if command is not None:
+        info["command"] = command.name if args.get("sub_command") is None else f"{args['command']} {command.name}"
         c.logger.log_info(f"Running command: {command.name}")
-        command.func()
+        with timings.span("command"):
+            command.func()
     else:
         c.logger.log_error("Command not found", exit=False)
-        parser.print_help()
+        ArgParserSetup(*load_handlers(c)).configure_argparser().print_help()
+
+
+def load_handlers(context: Context, argv: list[str] = None) -> list[CmdBuilder]:
+    command = ArgParserSetup.peek_command(argv)
+    if command is not None and command in HANDLERS:
+        return [__new_handler(command, context)]
+
+    base = __new_handler(None, context)
+    if command is not None and any(command in c.aliases + [c.name] for c in base.cmds.values()):
+        return [base]
+
+    return [base] + [__new_handler(name, context) for name in HANDLERS if name is not None]
+
+
+def __new_handler(name: str | None, context: Context) -> CmdBuilder:
+    module, cls = HANDLERS[name]
+    return getattr(import_module(module), cls)(context)
+
+
+def __metrics_entry(info: dict, code: int) -> dict:
+    p: Profile = info.get("profile_instance")
+    return {
+        "ts": round(time.time(), 3),
+        "command": info.get("command"),
+        "profile": info.get("profile"),
+        "storage": None if p is None else ("sqlite" if p.sqlite is not None else "toml"),
+        "size": len(p.data.tasks) if p is not None and p.has_read else None,
+        "exit": code,
+        "phases": timings.phases(),
+    }
+
+
+IMPORT_NS = time.perf_counter_ns() - fir.IMPORT_START_NS
@@ -0,0 +1,74 @@
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.context import Context
+from fir.data.sorting import DEFAULT_SORT, sort_key
+from fir.types.parameters import ParameterMap as pm
+from fir.utils.parse import parse_int_from_arg
+
+
+class ArchiveHandlers(CmdBuilder):
+    name = "archive"
+    aliases = []
+    cmds: dict[str, Cmd] = {}
+
+    context: Context
+
+    def __init__(self, context: Context):
+        self.context = context
+
+        self.register("run", self.run,
+                      description="Move tasks in hidden statuses that haven't been modified for a while to the archive.")\
+            .with_optional(pm["archive_days"])\
+            .with_flag(pm["dry_run"])
+
+        self.register("list", self.list, description="List archived tasks.", aliases=["ls"])
+
+        self.register("restore", self.restore, description="Move an archived task back into the profile.")\
+            .with_positional(pm["task_id"])
+
+    def run(self):
+        profile = self.context.profile
+        days = self.__days()
+        tasks = profile.archivable(days)
+        if self.context.args.get("dry_run"):
+            self.context.logger.log(f"Would archive {len(tasks)} task(s)")
+            for task in tasks:
+                self.context.logger.log(f"  {task.id}  {task.name}")
+            return
+        if not tasks:
+            return self.context.logger.log(f"No tasks in hidden statuses unmodified for {days} day(s)")
+
+        profile.archive_tasks(tasks)
+        profile.save()
+        self.context.logger.log_success(f"Archived {len(tasks)} task(s)")
+
+    def list(self):
+        tasks = list(self.context.profile.archive.tasks().values())
+        if not tasks:
+            return self.context.logger.log("No archived tasks")
+        key = sort_key(DEFAULT_SORT, self.context.profile.data.statuses)
+        self.context.logging.profile.log_task_table(sorted(tasks, key=key), order=False)
+
+    def restore(self):
+        profile = self.context.profile
+        task, err = profile.get_task(self.context.args.get("task_id"), include_archived=True)
+        if task is None:
+            return self.context.logger.log_error(err)
+        if profile.id_index.get(task.id) is not None:
+            return self.context.logger.log_error(f"Task {task.id} isn't archived")
+
+        profile.restore_task(task)
+        profile.save()
+        self.context.logger.log_success(f"Restored task \"{task.name}\" [{task.id}]")
+
+    def __days(self) -> int:
+        value = self.context.args.get("archive_days")
+        if value is None:
+            days = self.context.profile.try_get_config_value_int("archive.after_days")
+            if days <= 0:
+                return self.context.logger.log_error(
+                    "No age to archive at, pass --days or set it with 'fir config set archive.after_days <days>'")
+            return days
+        success, days = parse_int_from_arg(value)
+        if not success or days < 0:
+            self.context.logger.log_error(f"Invalid value for days: {value}")
+        return days
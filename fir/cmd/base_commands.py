@@ -1,16 +1,20 @@
 from datetime import datetime
-from fir.cmd import status_commands
-
+from typing import TYPE_CHECKING
 
 from fir.cmd.builder import Cmd, CmdBuilder
 from fir.cmd.set_commands import SetHandlers
 from fir.context import Context
+from fir.data import sorting
+from fir.data.query import QueryError
 from fir.utils import generate_task_id
-from fir.utils.parse import parse_date_from_arg, parse_priority_from_arg
+from fir.utils.parse import parse_date_from_arg, parse_int_from_arg, parse_priority_from_arg
 from fir.utils.dates import datetime_to_date_string
 from fir.types.dtos import TaskDto
 from fir.types.parameters import ParameterMap as pm
 
+if TYPE_CHECKING:
+    from fir.batch import BatchResult
+
 
 class CommandHandlers(CmdBuilder):
     name = None
@@ -39,7 +43,13 @@ class CommandHandlers(CmdBuilder):
             .with_positional(pm["task_id"])
 
         self.register("list", self.ls, description="List tasks", aliases=["ls"])\
-            .with_optional(pm["status"], pm["task_name"], pm["assignee"], pm["tags"])\
+            .with_optional(pm["status"], pm["task_name"], pm["assignee"], pm["tags"], pm["where"], pm["sort"],
+                           pm["limit"], pm["offset"], pm["after"])\
+            .with_flag(pm["all"])
+
+        self.register("search", self.search, description="Search task names & descriptions, best matches first.")\
+            .with_positional(pm["query"])\
+            .with_optional(pm["limit"])\
             .with_flag(pm["all"])
 
         self.register("tag", self.add_tag, description="Add tag(s) to a task.")\
@@ -57,6 +67,93 @@ class CommandHandlers(CmdBuilder):
         self.register("set-status", self.set_status, description="Set the status of a task.", aliases=["ss"])\
             .with_positional(pm["task_id"], pm["status"])
 
+        self.register("shell", self.shell,
+                      description="Interactive prompt that keeps the profile loaded & saves changes in the background.")\
+            .with_optional(pm["interval"])
+
+        self.register("batch", self.batch,
+                      description="Run commands from a file or stdin, one per line, saving once at the end.")\
+            .with_positional(pm["batch_file"].with_overrides(nargs="?"))\
+            .with_flag(pm["continue_on_error"], pm["json_output"])
+
+        self.register("serve", self.serve, description="Serve the profiles over a local HTTP JSON API.")\
+            .with_optional(pm["host"], pm["port"], pm["flush_delay"])
+
+
+    def shell(self):
+        from fir.shell import Shell
+
+        interval = self.context.args.get("interval")
+        try:
+            interval = 5.0 if interval is None else float(interval)
+        except ValueError:
+            return self.context.logger.log_error(f"Invalid value for interval: {interval}")
+        if interval <= 0:
+            return self.context.logger.log_error("Interval must be more than 0 seconds")
+        Shell(interval).run()
+
+    def serve(self):
+        from fir.server import DEFAULT_HOST, DEFAULT_PORT, Server
+
+        try:
+            port = int(self.context.args.get("port") or DEFAULT_PORT)
+            delay = float(self.context.args.get("flush_delay") or 0)
+        except ValueError:
+            return self.context.logger.log_error("Port must be an integer & the flush delay a number of seconds")
+        if delay < 0:
+            return self.context.logger.log_error("The flush delay can't be negative")
+        try:
+            Server(self.context.args.get("host") or DEFAULT_HOST, port, delay, self.context.args.get("scope")).run()
+        except OSError as e:
+            print(e)
+            print('ERROR!\nUnable to listen on the given host & port')
+            raise SystemExit(1)
+
+    def batch(self):
+        import json
+        import sys
+
+        from fir.batch import Batch
+
+        path = self.context.args.get("batch_file") or "-"
+        as_json = self.context.args.get("json_output")
+        batch = Batch(continue_on_error=self.context.args.get("continue_on_error"), scope=self.context.args.get("scope"))
+        try:
+            f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        except OSError as e:
+            return self.context.logger.log_error(f"Could not read {path}: {e}")
+
+        failed_line = None
+        with f:
+            for result in batch.run(f):
+                if not result.ok:
+                    failed_line = failed_line or result.line
+                self.__log_batch_result(result, as_json)
+
+        if batch.failed and not batch.continue_on_error:
+            if as_json:
+                self.context.logger.log(json.dumps({"applied": 0, "failed": batch.failed, "saved": False}))
+                raise SystemExit(1)
+            return self.context.logger.log_error(f"Stopped at line {failed_line}, nothing was saved")
+
+        saved = batch.commit()
+        if as_json:
+            self.context.logger.log(json.dumps({"applied": batch.applied, "failed": batch.failed, "saved": saved > 0}))
+        else:
+            self.context.logger.log_success(
+                f"Applied {batch.applied} of {batch.applied + batch.failed} commands, saved {saved} profile(s)")
+        if batch.failed:
+            raise SystemExit(1)
+
+    def __log_batch_result(self, result: "BatchResult", as_json: bool):
+        import json
+
+        if as_json:
+            self.context.logger.log(json.dumps(result.to_dict()))
+        elif not result.ok:
+            self.context.logger.log(f"Line {result.line}: {result.output}")
+        elif self.context.logger.verbose and result.output:
+            self.context.logger.log(result.output)
 
     def create_task(self):
         status = self.context.profile.data.config.get("status.default", "")
@@ -68,7 +165,7 @@ class CommandHandlers(CmdBuilder):
             return self.context.logger.log_error("Unable to parse date from due date")
 
         task_name = ' '.join(self.context.args.get("task_name"))
-        task = TaskDto(generate_task_id(not_in=[t.id for t in self.context.profile.data.tasks]), task_name, due=due)
+        task = TaskDto(generate_task_id(not_in=self.context.profile.id_index), task_name, due=due)
 
         set_status = self.context.profile.set_status(task, status)
         if not set_status:
@@ -84,7 +181,7 @@ class CommandHandlers(CmdBuilder):
         if self.context.args.get("link"):
             task.link = self.context.args.get("link")
 
-        self.context.profile.data.tasks.append(task)
+        self.context.profile.add_task(task)
         self.context.profile.save()
 
         self.context.logger.log_success(f"Added task \"{task.name}\" [{task.id}]")
@@ -119,6 +216,7 @@ class CommandHandlers(CmdBuilder):
             task.link = self.context.args.get("link")
 
         task.modified = datetime_to_date_string(datetime.now())
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task \"{task.name}\" [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -129,39 +227,83 @@ class CommandHandlers(CmdBuilder):
         if task is None:
             return self.context.logger.log_error(err)
 
-        self.context.profile.data.tasks.remove(task)
+        self.context.profile.remove_task(task)
         self.context.profile.save()
 
         return self.context.logger.log_success(f"Removed task {task.name} [{task.id}]")
 
     def task_info(self):
-        task, err = self.context.profile.get_task(self.context.args.get("task_id"))
+        task, err = self.context.profile.get_task(self.context.args.get("task_id"), include_archived=True)
         if task is None:
             return self.context.logger.log_error(err)
 
         self.context.logging.profile.log_task(task)
 
     def ls(self):
-        tasks = []
-        for task in self.context.profile.data.tasks:
-            if self.context.args.get("status") and task.status != self.context.args.get("status"):
-                continue
-            if self.context.args.get("task_name") and not \
-                    self.context.args.get("task_name").lower() in task.name.lower():
-                continue
-            if self.context.args.get("assignee") and self.context.args.get("assignee") not in task.assigned_to:
-                continue
-            if self.context.args.get("tags") and self.context.args.get("tags") not in task.tags:
-                continue
+        try:
+            tasks = self.context.profile.find_tasks(
+                status=self.context.args.get("status"),
+                name=self.context.args.get("task_name"),
+                assignee=self.context.args.get("assignee"),
+                tag=self.context.args.get("tags"),
+                include_hidden=self.context.args.get("all", False),
+                where=self.context.args.get("where"),
+                include_archived=self.context.args.get("all", False))
+        except QueryError as e:
+            return self.context.logger.log_error(f"Invalid --where: {e}")
+
+        try:
+            key = sorting.sort_key(self.context.args.get("sort") or sorting.DEFAULT_SORT,
+                                   self.context.profile.data.statuses)
+        except ValueError as e:
+            return self.context.logger.log_error(str(e))
+
+        after = None
+        if self.context.args.get("after"):
+            task, err = self.context.profile.get_task(self.context.args.get("after"),
+                                                      include_archived=self.context.args.get("all", False))
+            if task is None:
+                return self.context.logger.log_error(err)
+            after = task.id
+
+        limit = self.__int_arg("limit")
+        offset = self.__int_arg("offset") or 0
+        try:
+            rows, total = sorting.page(tasks, key, limit, offset, after)
+        except ValueError as e:
+            return self.context.logger.log_error(str(e))
+
+        self.context.logging.profile.log_task_table(rows, order=False)
+        remaining = total - offset - len(rows)
+        if rows and limit is not None and remaining > 0:
+            self.context.logger.log(f"{remaining} more, continue with --after {rows[-1].id}")
+
+    def search(self):
+        profile = self.context.profile
+        hidden = set() if self.context.args.get("all") else profile.get_hidden_status_names()
+        limit = self.__int_arg("limit")
 
-            get_all = self.context.args.get("all", False)
-            status = self.context.profile.get_status_by_name(task.status)
-            if not get_all and task.status != self.context.args.get("status") and status.hide_by_default:
+        tasks = []
+        for id, _ in profile.search_index.search(" ".join(self.context.args.get("query"))):
+            if limit is not None and len(tasks) >= limit:
+                break
+            task = profile.id_index.get(id)
+            if task is None or task.status in hidden:
                 continue
-
             tasks.append(task)
 
-        self.context.logging.profile.log_task_table(tasks)
+        if not tasks:
+            return self.context.logger.log("No matching tasks")
+        self.context.logging.profile.log_task_table(tasks, order=False)
+
+    def __int_arg(self, arg: str) -> int | None:
+        value = self.context.args.get(arg)
+        if value is None:
+            return None
+        success, i = parse_int_from_arg(value)
+        if not success or i < 0:
+            self.context.logger.log_error(f"Invalid value for {arg}: {value}")
+        return i
 
     def ls_category(self):
         return self.ls(self.context.args.get("status"))
@@ -177,6 +319,7 @@ class CommandHandlers(CmdBuilder):
             if t not in task.tags:
                 task.tags.append(t)
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -193,6 +336,7 @@ class CommandHandlers(CmdBuilder):
             if t in task.tags:
                 task.tags.remove(t)
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -209,6 +353,7 @@ class CommandHandlers(CmdBuilder):
             if a not in task.assigned_to:
                 task.assigned_to.append(a)
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -225,6 +370,7 @@ class CommandHandlers(CmdBuilder):
             if a in task.assigned_to:
                 task.assigned_to.remove(a)
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -1,38 +1,138 @@
 import argparse
+import os
 import sys
+from typing import Callable, Iterator
 
 from fir.cmd.builder import Cmd, CmdBuilder
 
 
 class FirParser(argparse.ArgumentParser):
+    # Set on parsers built for part of the command tree, errors then print help from the full tree
+    full_parser: Callable[[], "FirParser"] | None = None
+
     def error(self, message):
         sys.stderr.write('error: %s\n' % message)
-        self.print_help()
+        self.__help_parser().print_help()
         sys.exit(2)
 
+    def __help_parser(self) -> "FirParser":
+        if self.full_parser is None:
+            return self
+        return next((p for p in parsers(self.full_parser()) if p.prog == self.prog), self)
+
+
+def parsers(parser: argparse.ArgumentParser) -> Iterator[argparse.ArgumentParser]:
+    # The parser & all its sub parsers, once each
+    yield parser
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for sub in dict.fromkeys(action.choices.values()):
+                yield from parsers(sub)
+
 
 class ArgParserSetup:
 
     handlers: list[CmdBuilder]
+    value_options = ["--scope"]
+    help_options = ["-h", "--help"]
 
     def __init__(self, *handlers: CmdBuilder):
         self.handlers = handlers
 
-    def configure_argparser(self) -> FirParser:
+    def configure_argparser(self, argv: list[str] = None) -> FirParser:
+        # With argv, only the sub parsers needed to parse it are built. Help, shell completion & anything
+        # that doesn't resolve to a known command get the full tree so the usual listings & errors show.
+        command, sub_command = None, None
+        if argv is not None and os.environ.get("_ARGCOMPLETE") is None:
+            command, sub_command = self.__peek_commands(argv)
+
+        parser = self.__build_parser(command, sub_command)
+        if command is not None:
+            for p in parsers(parser):
+                p.full_parser = self.configure_argparser
+        return parser
+
+    def __build_parser(self, command: str | None, sub_command: str | None) -> FirParser:
         parser = self.__new_parser()
         sub = parser.add_subparsers(dest="command", metavar="<command>")
         for h in self.handlers:
             if h.name is None:
                 for c in h.cmds:
-                    self.__setup_handlers(h.cmds.get(c), sub)
-            else:
+                    cmd = h.cmds.get(c)
+                    if command is None or command in cmd.aliases + [cmd.name]:
+                        self.__setup_handlers(cmd, sub)
+            elif command is None or command in h.aliases + [h.name]:
                 sub_parser = sub.add_parser(h.name, aliases=h.aliases, help=f"See: 'fir {h.name} --help'")
                 sub_sub_parser = sub_parser.add_subparsers(dest="sub_command", metavar="<command>")
                 for c in h.cmds:
-                    self.__setup_handlers(h.cmds.get(c), sub_sub_parser)
+                    cmd = h.cmds.get(c)
+                    if sub_command is None or sub_command in cmd.aliases + [cmd.name]:
+                        self.__setup_handlers(cmd, sub_sub_parser)
 
         return parser
 
+    @classmethod
+    def peek_command(cls, argv: list[str] = None) -> str | None:
+        if argv is None or os.environ.get("_ARGCOMPLETE") is not None:
+            return None
+        tokens = cls.__positional_tokens(argv)
+        if tokens is None or len(tokens) == 0:
+            return None
+        return tokens[0]
+
+    def __peek_commands(self, argv: list[str]) -> (str | None, str | None):
+        tokens = self.__positional_tokens(argv)
+        if tokens is None or len(tokens) == 0:
+            return None, None
+
+        command = tokens[0]
+        for h in self.handlers:
+            if h.name is not None and command in h.aliases + [h.name]:
+                sub_command = tokens[1] if len(tokens) > 1 else None
+                if any(sub_command in c.aliases + [c.name] for c in h.cmds.values()):
+                    return command, sub_command
+                return command, None
+            if h.name is None and any(command in c.aliases + [c.name] for c in h.cmds.values()):
+                return command, None
+
+        return None, None
+
+    @classmethod
+    def __positional_tokens(cls, argv: list[str]) -> list[str] | None:
+        tokens = []
+        skip = False
+        for a in argv:
+            if skip:
+                skip = False
+            elif a in cls.help_options and len(tokens) == 0:
+                return None
+            elif a in cls.value_options:
+                skip = True
+            elif a == "--":
+                return None
+            elif not a.startswith("-"):
+                tokens.append(a)
+                if len(tokens) == 2:
+                    break
+
+        return tokens
+
+    def find_command(self, words: list[str]) -> (CmdBuilder | None, Cmd | None, list[str]):
+        # Resolves 'ls ...' or 'status add ...' to its handler & command without parsing, returning the remaining
+        # words. The handler is still returned for a group name on its own, e.g. 'status'.
+        for h in self.handlers:
+            if h.name is not None and words and words[0] in h.aliases + [h.name]:
+                for c in h.cmds.values():
+                    if len(words) > 1 and words[1] in c.aliases + [c.name]:
+                        return h, c, words[2:]
+                return h, None, []
+        for h in self.handlers:
+            if h.name is None and words:
+                for c in h.cmds.values():
+                    if words[0] in c.aliases + [c.name]:
+                        return h, c, words[1:]
+        return None, None, []
+
     def get_command(self, args: dict) -> Cmd | None:
         command = args.get("command")
         handler = self.__handler_or_default(command)
@@ -77,6 +177,8 @@ class ArgParserSetup:
                             dest="silent", default=False, help="Don't print anything")
         parser.add_argument("--scope", action="store",
                             dest="scope", help="Use a specific profile to run this action")
+        parser.add_argument("--timings", action="store_true", dest="timings", default=False,
+                            help="Prints a breakdown of where time was spent to stderr")
 
         return parser
 
@@ -0,0 +1,166 @@
+from datetime import datetime
+from typing import Callable
+
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.context import Context
+from fir.data.query import QueryError
+from fir.types.dtos import TaskDto
+from fir.types.parameters import ParameterMap as pm
+from fir.utils.dates import datetime_to_date_string
+from fir.utils.parse import parse_priority_from_arg
+
+FILTERS = [pm["filter_status"], pm["task_name"], pm["filter_assignee"], pm["filter_tags"], pm["where"]]
+FLAGS = [pm["all"], pm["dry_run"], pm["everything"]]
+
+
+class BulkHandlers(CmdBuilder):
+    name = "bulk"
+    aliases = []
+    cmds: dict[str, Cmd] = {}
+
+    context: Context
+
+    def __init__(self, context: Context):
+        self.context = context
+
+        self.register("status", self.set_status, description="Set the status of every matching task.")\
+            .with_positional(pm["status"])\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("priority", self.set_priority, description="Set the priority of every matching task.")\
+            .with_positional(pm["priority"])\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("tag", self.add_tag, description="Add tag(s) to every matching task.")\
+            .with_positional(pm["tags"].with_overrides(nargs="+"))\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("rmtag", self.rm_tag, description="Remove tag(s) from every matching task.", aliases=["rmt"])\
+            .with_positional(pm["tags"].with_overrides(nargs="+"))\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("assign", self.add_assigned, description="Add person(s) to every matching task.")\
+            .with_positional(pm["assignee"].with_overrides(nargs="+"))\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("unassign", self.rm_assigned, description="Remove person(s) from every matching task.")\
+            .with_positional(pm["assignee"].with_overrides(nargs="+"))\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+        self.register("remove", self.remove_tasks, description="Remove every matching task.", aliases=["rm"])\
+            .with_optional(*FILTERS)\
+            .with_flag(*FLAGS)
+
+    def set_status(self):
+        status = self.context.args.get("status")
+
+        def apply(task: TaskDto):
+            if not self.context.profile.set_status(task, status):
+                self.context.logger.log_error("Invalid status provided")
+
+        self.__apply(lambda task: task.status != status, apply)
+
+    def set_priority(self):
+        passed, priority = parse_priority_from_arg(self.context.args.get("priority"))
+        if not passed:
+            return self.context.logger.log_error("Invalid priorty value. Must be an integer and between 1 - 999.")
+
+        def apply(task: TaskDto):
+            task.priority = priority
+
+        self.__apply(lambda task: task.priority != priority, self.__update(apply))
+
+    def add_tag(self):
+        tags = self.context.args.get("tags")
+        self.__apply(lambda task: self.__any_missing(task.tags, tags),
+                     self.__update(lambda task: self.__add_values(task.tags, tags)))
+
+    def rm_tag(self):
+        tags = self.context.args.get("tags")
+        self.__apply(lambda task: self.__any_present(task.tags, tags),
+                     self.__update(lambda task: self.__remove_values(task.tags, tags)))
+
+    def add_assigned(self):
+        assignees = self.context.args.get("assignee")
+        self.__apply(lambda task: self.__any_missing(task.assigned_to, assignees),
+                     self.__update(lambda task: self.__add_values(task.assigned_to, assignees)))
+
+    def rm_assigned(self):
+        assignees = self.context.args.get("assignee")
+        self.__apply(lambda task: self.__any_present(task.assigned_to, assignees),
+                     self.__update(lambda task: self.__remove_values(task.assigned_to, assignees)))
+
+    def remove_tasks(self):
+        tasks = self.__find()
+        if self.context.args.get("dry_run"):
+            return self.__log_dry_run("remove", tasks)
+        if not tasks:
+            return self.context.logger.log("No matching tasks")
+
+        self.context.profile.remove_tasks(tasks)
+        self.context.profile.save()
+        self.context.logger.log_success(f"Removed {len(tasks)} task(s)")
+
+    def __apply(self, changes: Callable[[TaskDto], bool], apply: Callable[[TaskDto], None]):
+        # Changes every matching task in memory & saves once, tasks the change wouldn't affect aren't rewritten
+        tasks = self.__find()
+        changing = [task for task in tasks if changes(task)]
+        if self.context.args.get("dry_run"):
+            return self.__log_dry_run("update", changing)
+
+        if not changing:
+            return self.context.logger.log(f"No changes, {len(tasks)} matching task(s)")
+        for task in changing:
+            apply(task)
+        self.context.profile.save()
+        self.context.logger.log_success(f"Updated {len(changing)} of {len(tasks)} matching task(s)")
+
+    def __update(self, change: Callable[[TaskDto], None]) -> Callable[[TaskDto], None]:
+        def apply(task: TaskDto):
+            change(task)
+            task.modified = datetime_to_date_string(datetime.now())
+            self.context.profile.update_task(task)
+        return apply
+
+    def __find(self) -> list[TaskDto]:
+        # The same selection as 'fir ls', through the profile's field indexes
+        if not self.context.args.get("everything") and not any(self.context.args.get(f.name) for f in FILTERS):
+            return self.context.logger.log_error(
+                "No filter given, pass --status, --tag, --assigned, --name or --where, or --everything for every task")
+        try:
+            return self.context.profile.find_tasks(
+                status=self.context.args.get("filter_status"),
+                name=self.context.args.get("task_name"),
+                assignee=self.context.args.get("filter_assignee"),
+                tag=self.context.args.get("filter_tags"),
+                include_hidden=self.context.args.get("all", False),
+                where=self.context.args.get("where"))
+        except QueryError as e:
+            return self.context.logger.log_error(f"Invalid --where: {e}")
+
+    def __log_dry_run(self, action: str, tasks: list[TaskDto]):
+        self.context.logger.log(f"Would {action} {len(tasks)} task(s)")
+        for task in tasks:
+            self.context.logger.log(f"  {task.id}  {task.name}")
+
+    def __any_missing(self, values: list[str], add: list[str]) -> bool:
+        return any(v not in values for v in add)
+
+    def __any_present(self, values: list[str], remove: list[str]) -> bool:
+        return any(v in values for v in remove)
+
+    def __add_values(self, values: list[str], add: list[str]):
+        for v in add:
+            if v not in values:
+                values.append(v)
+
+    def __remove_values(self, values: list[str], remove: list[str]):
+        for v in remove:
+            if v in values:
+                values.remove(v)
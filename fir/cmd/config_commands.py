@@ -1,6 +1,4 @@
 from typing import get_args
-from tabulate import tabulate
-from termcolor import colored
 
 from fir.cmd.builder import Cmd, CmdBuilder
 from fir.context import Context
@@ -45,7 +43,7 @@ class ConfigHandlers(CmdBuilder):
         if self.context.args.get("config_name") not in get_args(ConfigOptions):
             return self.context.invalid_config_option()
 
-        self.context.profile.data.config[self.context.args.get("config_name")] = self.context.args.get("config_value")
+        self.context.profile.set_config_value(self.context.args.get("config_name"), self.context.args.get("config_value"))
         self.context.profile.save()
         self.context.logger.log_success(f"Updated config {self.context.args.get('config_name')}")
 
@@ -53,11 +51,14 @@ class ConfigHandlers(CmdBuilder):
         if self.context.args.get("config_name") not in get_args(ConfigOptions):
             return self.context.invalid_config_option()
 
-        self.context.profile.data.config.pop(self.context.args.get("config_name"))
+        self.context.profile.remove_config_value(self.context.args.get("config_name"))
         self.context.profile.save()
         self.context.logger.log_success(f"Removed config {self.context.args.get('config_name')}")
 
     def list_config_values(self):
+        from tabulate import tabulate
+        from termcolor import colored
+
         table = []
         for key, value in self.context.profile.data.config.items():
             table.append([key, value])
@@ -67,6 +68,9 @@ class ConfigHandlers(CmdBuilder):
                                                   f"{colored('Value', 'light_blue', attrs=['bold'])}"]))
 
     def list_config_options(self):
+        from tabulate import tabulate
+        from termcolor import colored
+
         table = []
         for key in get_args(ConfigOptions):
             map = ConfigOptionsMap.get(key)
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+
+from fir import client
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.config import DATA_DIR
+from fir.context import Context
+from fir.types.parameters import ParameterMap as pm
+
+
+class DaemonHandlers(CmdBuilder):
+    name = "daemon"
+    aliases = []
+    cmds: dict[str, Cmd] = {}
+
+    context: Context
+
+    def __init__(self, context: Context):
+        self.context = context
+
+        self.register("start", self.start,
+                      description="Start a background process that keeps profiles loaded between commands. "
+                                  "Run commands through 'fir-client' to use it.")\
+            .with_flag(pm["foreground"])
+
+        self.register("stop", self.stop, description="Stop the background process.")
+
+        self.register("status", self.status, description="Show whether the background process is running.")
+
+    def start(self):
+        s = client.connect()
+        if s is not None:
+            s.close()
+            return self.context.logger.log_error(f"Daemon is already running on {client.socket_path()}")
+
+        if self.context.args.get("foreground"):
+            from fir import daemon
+            return daemon.main()
+
+        import subprocess
+        log_path = os.path.join(DATA_DIR, "daemon.log")
+        with open(log_path, "ab") as log:
+            process = subprocess.Popen([sys.executable, "-m", "fir.daemon"], stdin=subprocess.DEVNULL,
+                                       stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            s = client.connect()
+            if s is not None:
+                s.close()
+                return self.context.logger.log_success(f"Daemon started with pid {process.pid}")
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        self.context.logger.log_error(f"Daemon didn't start, see {log_path}")
+
+    def stop(self):
+        s = client.connect()
+        if s is None:
+            return self.context.logger.log_success("Daemon is not running")
+        with s:
+            for _ in client.request(s, {"op": "stop"}):
+                pass
+
+        # The daemon finishes the command it's running (if any) & removes its socket on the way out
+        deadline = time.monotonic() + 10
+        while os.path.exists(client.socket_path()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.context.logger.log_success("Daemon stopped")
+
+    def status(self):
+        s = client.connect()
+        if s is None:
+            return self.context.logger.log("Daemon is not running")
+        with s:
+            status = next((f["status"] for f in client.request(s, {"op": "status"}) if "status" in f), None)
+        if status is None:
+            return self.context.logger.log_error("Daemon didn't respond")
+
+        uptime = int(time.time() - status["started"])
+        self.context.logger.log(f"Daemon running with pid {status['pid']} on {status['socket']}, "
+                                f"up {uptime // 3600}h {uptime // 60 % 60}m {uptime % 60}s, "
+                                f"{status['served']} commands served")
+        for p in status["profiles"]:
+            tasks = "not loaded" if p["tasks"] is None else f"{p['tasks']} tasks"
+            self.context.logger.log(f"  {p['path']} ({tasks})")
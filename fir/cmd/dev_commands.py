@@ -0,0 +1,79 @@
+import os
+
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.cmd.profile_commands import new_profile_path
+from fir.context import Context
+from fir.types.parameters import ParameterMap as pm
+from fir.utils.parse import parse_int_from_arg
+
+
+class DevHandlers(CmdBuilder):
+    name = "dev"
+    aliases = []
+    cmds: dict[str, Cmd] = {}
+
+    context: Context
+
+    def __init__(self, context: Context):
+        self.context = context
+
+        self.register("generate", self.generate, aliases=["gen"],
+                      description="Generate a profile of synthetic tasks for load testing.")\
+            .with_positional(pm["profile_name"])\
+            .with_optional(pm["profile_path"], pm["task_count"], pm["status_count"], pm["tag_count"],
+                           pm["assignee_count"], pm["hidden_fraction"], pm["description_length"], pm["due_fraction"],
+                           pm["due_days"], pm["due_distribution"], pm["seed"])\
+            .with_flag(pm["sqlite"], pm["force"], pm["profile_set"])
+
+    def generate(self):
+        from fir.data.generate import GenerateOptions, generate_profile
+
+        name = self.context.args.get("profile_name")
+        path = new_profile_path(name, self.context.args.get("profile_path"), self.context.args.get("sqlite"))
+        if os.path.exists(path) and not self.context.args.get("force"):
+            return self.context.logger.log_error("File already exists")
+
+        defaults = GenerateOptions()
+        options = GenerateOptions(
+            tasks=self.__int_arg("task_count", defaults.tasks),
+            statuses=self.__int_arg("status_count", defaults.statuses),
+            tags=self.__int_arg("tag_count", defaults.tags),
+            assignees=self.__int_arg("assignee_count", defaults.assignees),
+            hidden_fraction=self.__float_arg("hidden_fraction", defaults.hidden_fraction),
+            description_length=self.__int_arg("description_length", defaults.description_length),
+            due_fraction=self.__float_arg("due_fraction", defaults.due_fraction),
+            due_days=self.__int_arg("due_days", defaults.due_days),
+            due_distribution=self.context.args.get("due_distribution", defaults.due_distribution),
+            seed=self.__int_arg("seed", defaults.seed))
+        if options.due_distribution not in ("uniform", "normal"):
+            return self.context.logger.log_error("Due date distribution must be 'uniform' or 'normal'")
+
+        try:
+            generate_profile(path, name, options)
+        except ValueError as e:
+            return self.context.logger.log_error(str(e))
+
+        # Linked without reading it back, a large profile would otherwise be parsed just to validate it
+        self.context.settings.data.profiles[name] = path
+        if self.context.args.get("profile_set"):
+            self.context.settings.data.scope = name
+        self.context.settings.save()
+        self.context.logger.log_success(f"Generated {options.tasks} tasks into {path}")
+
+    def __int_arg(self, arg: str, default: int) -> int:
+        value = self.context.args.get(arg)
+        if value is None:
+            return default
+        success, i = parse_int_from_arg(value)
+        if not success or i < 0:
+            self.context.logger.log_error(f"Invalid value for {arg}: {value}")
+        return i
+
+    def __float_arg(self, arg: str, default: float) -> float:
+        value = self.context.args.get(arg)
+        if value is None:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            self.context.logger.log_error(f"Invalid value for {arg}: {value}")
@@ -0,0 +1,140 @@
+import os
+import time
+
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.config import DATA_DIR
+from fir.context import Context
+from fir.types.parameters import ParameterMap as pm
+from fir.utils import timings
+from fir.utils.parse import parse_int_from_arg
+
+
+class PerfHandlers(CmdBuilder):
+    name = "perf"
+    aliases = []
+    cmds: dict[str, Cmd] = {}
+
+    context: Context
+
+    def __init__(self, context: Context):
+        self.context = context
+
+        self.register("report", self.report,
+                      description="Summarise recorded invocation metrics, see FIR_METRICS.")\
+            .with_optional(pm["metrics_file"], pm["command_filter"], pm["period"], pm["limit"])\
+            .with_flag(pm["all"].with_overrides(description="Include rotated metrics files"))
+
+        self.register("rotate", self.rotate, description="Start a new metrics log, keeping previous ones alongside.")\
+            .with_optional(pm["metrics_file"], pm["keep"])
+
+        self.register("compact", self.compact,
+                      description="Fold old metrics into a summary, which reports still include.")\
+            .with_optional(pm["metrics_file"], pm["keep_days"])
+
+    def report(self):
+        from fir.data import metrics
+
+        path = self.__path()
+        period = self.context.args.get("period") or "day"
+        if period not in ("day", "week", "month"):
+            return self.context.logger.log_error("Period must be 'day', 'week' or 'month'")
+        limit = self.__int_arg("limit", 8)
+        command = self.context.args.get("command_filter")
+
+        paths = [path]
+        if self.context.args.get("all"):
+            paths += metrics.rotated_paths(path)
+        try:
+            a = metrics.aggregate(paths, into=metrics.load_summary(path))
+        except ValueError as e:
+            return self.context.logger.log_error(str(e))
+        if a.lines == 0:
+            return self.context.logger.log_error(f"No metrics recorded in {path}, set FIR_METRICS=1 to record them")
+
+        self.context.logger.log(f"{a.lines} invocations from {self.__date(a.first_ts)} to {self.__date(a.last_ts)}"
+                                + (f", {a.skipped} lines skipped" if a.skipped else "") + "\n")
+
+        rows = [[c, s.count, a.errors.get(c, 0), *self.__quantiles(s), f"{s.mean():.1f}"]
+                for c, s in sorted(a.commands.items()) if command in (None, c)]
+        self.__table(rows, ["Command", "Count", "Errors", "p50", "p95", "p99", "Mean"])
+
+        rows = [[c, p, s.count, *self.__quantiles(s)]
+                for (c, p), s in sorted(a.phases.items(), key=lambda i: i[0][0]) if command in (None, c)]
+        self.__table(rows, ["Command", "Phase", "Count", "p50", "p95", "p99"])
+
+        profiles = sorted(a.profiles.items(), key=lambda i: (i[0][0], self.__size_key(i[0][1]), i[0][2]))
+        rows = [[p, size, c, s.count, *self.__quantiles(s)] for (p, size, c), s in profiles if command in (None, c)]
+        self.__table(rows, ["Profile", "Tasks", "Command", "Count", "p50", "p95", "p99"])
+
+        rows = []
+        for c in sorted(a.commands):
+            if command not in (None, c):
+                continue
+            previous = None
+            trend = a.trend(c, period)
+            for i, (start, s) in enumerate(trend):
+                p50 = s.quantile(0.5)
+                change = "" if previous is None else f"{(p50 - previous) / previous * 100:+.0f}%"
+                previous = p50
+                if i >= len(trend) - limit:
+                    rows.append([c, start, s.count, f"{p50:.1f}", f"{s.quantile(0.95):.1f}", change])
+        self.__table(rows, ["Command", period.capitalize(), "Count", "p50", "p95", "Change"])
+
+    def rotate(self):
+        from fir.data import metrics
+
+        path = self.__path()
+        rotated = metrics.rotate(path, self.__int_arg("keep", 5))
+        if rotated is None:
+            return self.context.logger.log_success(f"Nothing to rotate in {path}")
+        self.context.logger.log_success(f"Rotated {path} to {rotated}")
+
+    def compact(self):
+        from fir.data import metrics
+
+        path = self.__path()
+        try:
+            folded, kept = metrics.compact(path, self.__int_arg("keep_days", 30), time.time())
+        except ValueError as e:
+            return self.context.logger.log_error(str(e))
+        self.context.logger.log_success(
+            f"Summarised {folded} lines into {metrics.summary_path(path)}, kept {kept} lines in {path}")
+
+    def __path(self) -> str:
+        path = self.context.args.get("metrics_file")
+        if path:
+            return os.path.abspath(os.path.expanduser(path))
+        return timings.metrics_path(DATA_DIR) or os.path.join(DATA_DIR, "metrics.jsonl")
+
+    def __quantiles(self, sketch) -> list[str]:
+        from fir.data.metrics import QUANTILES
+        return [f"{sketch.quantile(q):.1f}" for q in QUANTILES]
+
+    def __table(self, rows: list, headers: list[str]):
+        from tabulate import tabulate
+        from termcolor import colored
+
+        if not rows:
+            return
+        self.context.logger.log(tabulate(rows, headers=[colored(h, "light_blue", attrs=["bold"]) for h in headers],
+                                         disable_numparse=True))
+        self.context.logger.log("")
+
+    def __date(self, ts: float) -> str:
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+
+    def __size_key(self, bucket: str) -> int:
+        # "1k-10k" sorts by its lower bound, unknown sizes last
+        if bucket == "-":
+            return 2 ** 63
+        lower = bucket.split("-")[0]
+        return int(lower.rstrip("kM")) * {"k": 10 ** 3, "M": 10 ** 6}.get(lower[-1], 1)
+
+    def __int_arg(self, arg: str, default: int) -> int:
+        value = self.context.args.get(arg)
+        if value is None:
+            return default
+        success, i = parse_int_from_arg(value)
+        if not success or i < 0:
+            self.context.logger.log_error(f"Invalid value for {arg}: {value}")
+        return i
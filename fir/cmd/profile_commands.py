@@ -1,7 +1,4 @@
 import os
-from tabulate import tabulate
-from termcolor import colored
-from slugify import slugify
 
 from fir.cmd.builder import CmdBuilder, Cmd
 from fir.config import DATA_DIR
@@ -9,6 +6,7 @@ from fir.context import Context
 from fir.data.defaults import default_profile
 from fir.data.profile import Profile
 from fir.types.parameters import ParameterMap as pm
+from fir.utils.files import is_sqlite_path
 
 
 class ProfileHandlers(CmdBuilder):
@@ -34,13 +32,21 @@ class ProfileHandlers(CmdBuilder):
         self.register("create", self.create, aliases=["new"], description="Create a new fir profile.")\
             .with_positional(pm["profile_name"])\
             .with_optional(pm["description"], pm["profile_path"])\
-            .with_flag(pm["profile_set"], pm["force"])
+            .with_flag(pm["profile_set"], pm["force"], pm["sqlite"])
 
         self.register("remove", self.remove, description="Remove a fir profile. Does not remove the file.", aliases=["rm"])\
             .with_positional(pm["profile_name"])
 
         self.register("list", self.ls, description="List linked profiles.", aliases=["ls"])
 
+        self.register("convert", self.convert, description="Convert a profile between toml and SQLite storage.")\
+            .with_positional(pm["profile_name"])\
+            .with_optional(pm["profile_path"])\
+            .with_flag(pm["force"])
+
+        self.register("compact", self.compact, description="Write journaled changes into the profile file.")\
+            .with_positional(pm["profile_name"].with_overrides(nargs="?"))
+
     def link(self):
         name = self.context.args.get("profile_name")
         path = os.path.abspath(self.context.args.get("profile_path"))
@@ -71,14 +77,7 @@ class ProfileHandlers(CmdBuilder):
         if self.context.args.get("description"):
             desc = self.context.args.get("description")
 
-        path = os.path.abspath(os.path.join(DATA_DIR, f"{slugify(name)}.toml"))
-        if self.context.args.get("profile_path"):
-            dir_path = os.path.abspath(self.context.args.get("profile_path"))
-            if os.path.isdir(dir_path):
-                path = os.path.join(dir_path, f"{slugify(name)}.toml")
-            else:
-                path = dir_path
-
+        path = new_profile_path(name, self.context.args.get("profile_path"), self.context.args.get("sqlite"))
         if os.path.exists(path) and not self.context.args.get("force"):
             return self.context.logger.log_error("File already exists")
 
@@ -101,7 +100,51 @@ class ProfileHandlers(CmdBuilder):
         self.context.settings.save()
         self.context.logger.log_success("Profile removed")
 
+    def convert(self):
+        name = self.context.args.get("profile_name")
+        source_path = self.context.settings.data.profiles.get(name)
+        if source_path is None:
+            return self.context.logger.log_error("Profile not found")
+
+        ext = ".toml" if is_sqlite_path(source_path) else ".db"
+        path = os.path.splitext(source_path)[0] + ext
+        if self.context.args.get("profile_path"):
+            path = os.path.abspath(self.context.args.get("profile_path"))
+        if is_sqlite_path(path) == is_sqlite_path(source_path):
+            return self.context.logger.log_error("Target path must use a different storage format")
+        if os.path.exists(path) and not self.context.args.get("force"):
+            return self.context.logger.log_error("File already exists")
+
+        # In lock mode the source stays locked until the new file is linked, so no write to it is left behind
+        source = Profile(source_path)
+        try:
+            target = Profile(path=path, read=False)
+            target.data = source.data
+            target.save()
+
+            self.context.link_profile(name, path)
+        finally:
+            source.unlock()
+        self.context.logger.log_success(f"Profile {name} converted to {path}. {source_path} was left in place.")
+
+    def compact(self):
+        name = self.context.args.get("profile_name")
+        if name is None:
+            profile = self.context.profile
+        else:
+            path = self.context.settings.data.profiles.get(name)
+            if path is None:
+                return self.context.logger.log_error("Profile not found")
+            profile = Profile(path)
+
+        entries = profile.journal.count
+        profile.compact()
+        self.context.logger.log_success(f"Compacted {entries} journal entries into {profile.path}")
+
     def ls(self):
+        from tabulate import tabulate
+        from termcolor import colored
+
         table = []
         for key in self.context.settings.data.profiles.keys():
             table.append([key, self.context.settings.data.profiles[key]])
@@ -109,3 +152,18 @@ class ProfileHandlers(CmdBuilder):
         self.context.logger.log(tabulate(table,
                                          headers=[f"{colored('Id', 'light_blue', attrs=['bold'])}",
                                                   f"{colored('Path', 'light_blue', attrs=['bold'])}"]))
+
+
+def new_profile_path(name: str, profile_path: str = None, sqlite: bool = False) -> str:
+    from slugify import slugify
+
+    ext = "db" if sqlite else "toml"
+    path = os.path.abspath(os.path.join(DATA_DIR, f"{slugify(name)}.{ext}"))
+    if profile_path:
+        dir_path = os.path.abspath(profile_path)
+        if os.path.isdir(dir_path):
+            path = os.path.join(dir_path, f"{slugify(name)}.{ext}")
+        else:
+            path = dir_path
+
+    return path
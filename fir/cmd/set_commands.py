@@ -56,12 +56,13 @@ class SetHandlers(CmdBuilder):
 
         task.link = self.context.args.get("link")
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
             self.context.logging.profile.log_task(task)
 
-    def set_priority(self, context: Context):
+    def set_priority(self):
         task, err = self.context.profile.get_task(self.context.args.get("task_id"))
         if task is None:
             return self.context.logger.log_error(err)
@@ -72,6 +73,7 @@ class SetHandlers(CmdBuilder):
 
         task.priority = priority
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -84,6 +86,7 @@ class SetHandlers(CmdBuilder):
 
         task.description = ' '.join(self.context.args.get("description"))
 
+        self.context.profile.update_task(task)
         self.context.profile.save()
         self.context.logger.log_success(f"Updated task {task.name} [{task.id}]")
         if self.context.profile.try_get_config_value_bool("enable.log_task_post_modify"):
@@ -1,7 +1,5 @@
 from cmd import Cmd
 
-import tabulate
-from termcolor import colored
 from fir.cmd.builder import CmdBuilder
 from fir.context import Context
 from fir.utils.parse import parse_priority_from_arg
@@ -50,7 +48,7 @@ class StatusHandlers(CmdBuilder):
             return self.context.logger.log_error("Invalid priorty value. Must be an integer and between 1 - 999.")
 
         status = StatusDto(self.context.args.get("status"), color, order=order, hide_by_default=hide_status)
-        self.context.profile.data.statuses.append(status)
+        self.context.profile.add_status(status)
 
         self.context.profile.save()
         self.context.logger.log_success(f"Added status \"{status.name}\"")
@@ -62,6 +60,7 @@ class StatusHandlers(CmdBuilder):
 
         status.color = self.context.args.get("color", "light_blue")
 
+        self.context.profile.update_status(status)
         self.context.profile.save()
         self.context.logger.log_success(f"Set color of status to \"{status.color}\"")
 
@@ -76,6 +75,7 @@ class StatusHandlers(CmdBuilder):
 
         status.order = order
 
+        self.context.profile.update_status(status)
         self.context.profile.save()
         self.context.logger.log_success(f"Set order value of status \"{status.name}\" to {status.order}.")
 
@@ -86,6 +86,7 @@ class StatusHandlers(CmdBuilder):
 
         status.hide_by_default = not status.hide_by_default
 
+        self.context.profile.update_status(status)
         self.context.profile.save()
         self.context.logger.log_success(f"Set hide status to \"{status.hide_by_default}\"")
 
@@ -94,12 +95,15 @@ class StatusHandlers(CmdBuilder):
         if status is None:
             return self.context.logger.log_error("Could not find status.")
 
-        self.context.profile.data.statuses.remove(status)
+        self.context.profile.remove_status(status)
 
         self.context.profile.save()
         self.context.logger.log_success(f"Removed status \"{status.name}\"")
 
     def list_status(self):
+        from tabulate import tabulate
+        from termcolor import colored
+
         table = []
         statuses = sorted(self.context.profile.data.statuses, key=lambda s: s.order)
         for s in statuses:
@@ -110,6 +114,6 @@ class StatusHandlers(CmdBuilder):
                    f"{colored('Order', 'light_blue', attrs=['bold'])}",
                    f"{colored('Hide', 'light_blue', attrs=['bold'])}"]
 
-        tab = tabulate.tabulate(table, headers=headers)
+        tab = tabulate(table, headers=headers)
 
         self.context.logger.log(tab)
@@ -45,6 +45,7 @@ class Context:
 
     def link_profile(self, name: str, path: str):
         p = Profile(path)
+        p.unlock()
         if p.data is None:
             return self.logger.log_error("Invalid profile")
 
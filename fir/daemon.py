@@ -0,0 +1,224 @@
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from fir.client import FORWARDED_ENV, LOCAL_COMMANDS, command_name, connect, socket_path
+from fir.data.session import Session
+
+# Long lived fir process serving commands over a Unix socket, see fir.client for the other end. Requests are
+# handled one at a time against a shared Session, so settings & profiles are parsed once & reloaded only when
+# their files change. Commands save through Profile.save as usual, a reply is only sent once the write is done.
+#
+# Protocol: one JSON line per request, {"op": "run" | "status" | "stop", ...}. A run streams back {"out": ...}
+# & {"err": ...} lines followed by {"exit": code}.
+
+
+class FrameWriter(io.TextIOBase):
+    # Stands in for stdout/stderr while a command runs, output is sent in frames as it's produced
+    def __init__(self, conn: socket.socket, key: str, tty: bool):
+        self.__conn = conn
+        self.__key = key
+        self.__tty = tty
+        self.__buffer: list[str] = []
+        self.__size = 0
+        self.closed_by_client = False
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self.__tty
+
+    def write(self, s: str) -> int:
+        self.__buffer.append(s)
+        self.__size += len(s)
+        if self.__size >= 65536:
+            self.flush()
+        return len(s)
+
+    def flush(self):
+        if not self.__buffer:
+            return
+        data = "".join(self.__buffer)
+        self.__buffer.clear()
+        self.__size = 0
+        send(self.__conn, {self.__key: data}, self)
+
+
+class Daemon:
+    path: str
+    session: Session
+    started: float
+    served: int
+
+    def __init__(self, path: str = None):
+        self.path = path or socket_path()
+        self.session = Session()
+        self.started = time.time()
+        self.served = 0
+        self.__socket = None
+        self.__busy = False
+        self.__stopping = False
+
+    def serve(self):
+        self.__bind()
+        signal.signal(signal.SIGTERM, self.__signal)
+        signal.signal(signal.SIGINT, self.__signal)
+        print(f"fir daemon {os.getpid()} listening on {self.path}", flush=True)
+        try:
+            while not self.__stopping:
+                conn, _ = self.__socket.accept()
+                self.__busy = True
+                try:
+                    with conn:
+                        self.__handle(conn)
+                finally:
+                    self.__busy = False
+        except SystemExit:
+            pass
+        finally:
+            self.__socket.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            print(f"fir daemon {os.getpid()} stopped", flush=True)
+
+    def __bind(self):
+        s = connect(self.path)
+        if s is not None:
+            s.close()
+            print(f'ERROR!\nA fir daemon is already listening on "{self.path}"')
+            raise SystemExit(1)
+        if os.path.exists(self.path):
+            # Left behind by a daemon that didn't shut down cleanly
+            os.remove(self.path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owner may connect, commands run with the daemon's access to every linked profile
+        umask = os.umask(0o077)
+        try:
+            self.__socket.bind(self.path)
+        finally:
+            os.umask(umask)
+        self.__socket.listen(16)
+
+    def __signal(self, signum, frame):
+        # Never interrupts a running command, it could be part way through saving
+        self.__stopping = True
+        if not self.__busy:
+            raise SystemExit(0)
+
+    def __handle(self, conn: socket.socket):
+        # A client that connects but never sends a request can't hold up everyone else
+        conn.settimeout(10)
+        try:
+            with conn.makefile("rb") as f:
+                line = f.readline()
+        except OSError:
+            return
+        conn.settimeout(None)
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return send(conn, {"err": "Invalid request\n", "exit": 2})
+
+        op = message.get("op")
+        if op == "run" and command_name(message.get("argv", [])) in LOCAL_COMMANDS:
+            return send(conn, {"err": "This command can't run in the daemon\n", "exit": 2})
+        if op == "run":
+            return self.__run(conn, message)
+        if op == "status":
+            return send(conn, {"status": self.__status()})
+        if op == "stop":
+            self.__stopping = True
+            return send(conn, {"exit": 0})
+        send(conn, {"err": f"Unknown operation {op}\n", "exit": 2})
+
+    def __run(self, conn: socket.socket, message: dict):
+        from fir.cmd import cmd
+
+        tty = bool(message.get("tty"))
+        out, err = FrameWriter(conn, "out", tty), FrameWriter(conn, "err", tty)
+        cwd = os.getcwd()
+        env = {k: os.environ.get(k) for k in FORWARDED_ENV}
+        streams = sys.stdin, sys.stdout, sys.stderr
+        argv = sys.argv
+        code = 0
+        try:
+            os.chdir(message.get("cwd") or cwd)
+            for k in FORWARDED_ENV:
+                self.__set_env(k, message.get("env", {}).get(k))
+            sys.stdin, sys.stdout, sys.stderr = io.StringIO(message.get("stdin", "")), out, err
+            # argparse takes the program name for usage & errors from argv
+            sys.argv = ["fir"] + list(message.get("argv", []))
+            cmd(sys.argv[1:], self.session)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = streams
+            sys.argv = argv
+            os.chdir(cwd)
+            for k, v in env.items():
+                self.__set_env(k, v)
+
+        if code == 0:
+            self.session.saved()
+        else:
+            # A failed command may have changed data it never saved, the next one starts from the files again
+            self.session.discard()
+        self.served += 1
+        out.flush()
+        err.flush()
+        send(conn, {"exit": code}, out)
+
+    def __status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "socket": self.path,
+            "started": self.started,
+            "served": self.served,
+            "profiles": [
+                {"path": p.path, "tasks": len(p.data.tasks) if p.has_read else None}
+                for p in self.session.profiles()
+            ],
+        }
+
+    def __set_env(self, key: str, value: str | None):
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def send(conn: socket.socket, frame: dict, writer: FrameWriter = None):
+    # A client going away doesn't stop the command, it still runs to completion & saves
+    if writer is not None and writer.closed_by_client:
+        return
+    try:
+        conn.sendall((json.dumps(frame) + "\n").encode("utf-8"))
+    except OSError:
+        if writer is not None:
+            writer.closed_by_client = True
+
+
+def main():
+    from importlib import import_module
+
+    from fir.cmd import HANDLERS
+
+    # Imported up front so the first request doesn't pay for them
+    for module in [m for m, _ in HANDLERS.values()] + ["tabulate", "termcolor"]:
+        import_module(module)
+    Daemon().serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import gzip
+import json
+import os
+import time
+import zlib
+from bisect import bisect_left
+from typing import Iterable
+
+from fir.types import codec
+from fir.types.dtos import TaskDto
+from fir.utils.files import write_file_atomic
+
+# Tasks moved out of a profile by Profile.archive_tasks, the cold tier. They're kept as gzip compressed JSON lines in
+# '<profile>.archive.gz', each archived batch appended as its own gzip member, & only read when a command asks for
+# archived tasks. '<profile>.archive.ids' lists the archived ids one per line: small enough to read for any id lookup,
+# so prefixes resolve across both tiers without opening the archive. Its mtime records when tiering last ran.
+
+# Seconds between automatic tiering passes over a profile
+TIER_INTERVAL = 24 * 60 * 60
+
+
+class Archive:
+    path: str
+    ids_path: str
+
+    def __init__(self, profile_path: str):
+        self.path = f"{profile_path}.archive.gz"
+        self.ids_path = f"{profile_path}.archive.ids"
+        self.__ids: list[str] | None = None
+        self.__tasks: dict[str, TaskDto] | None = None
+
+    def __contains__(self, id: str) -> bool:
+        ids = self.ids()
+        i = bisect_left(ids, id)
+        return i < len(ids) and ids[i] == id
+
+    def ids(self) -> list[str]:
+        # Sorted, like TaskIdIndex.ids
+        if self.__ids is None:
+            try:
+                with open(self.ids_path, encoding="utf-8") as f:
+                    self.__ids = sorted({line.strip() for line in f} - {""})
+            except FileNotFoundError:
+                self.__ids = []
+        return self.__ids
+
+    def find(self, prefix: str, limit: int = None) -> list[str]:
+        ids = self.ids()
+        found = []
+        i = bisect_left(ids, prefix)
+        while i < len(ids) and ids[i].startswith(prefix):
+            found.append(ids[i])
+            if limit is not None and len(found) >= limit:
+                break
+            i += 1
+        return found
+
+    def shared_prefix_length(self, id: str) -> int:
+        # Longest prefix the id shares with an archived id other than itself
+        ids = self.ids()
+        i = bisect_left(ids, id)
+        shared = 0
+        for other in (ids[i - 1] if i > 0 else None, ids[i] if i < len(ids) else None,
+                      ids[i + 1] if i + 1 < len(ids) else None):
+            if other is None or other == id:
+                continue
+            n = 0
+            for x, y in zip(id, other):
+                if x != y:
+                    break
+                n += 1
+            shared = max(shared, n)
+        return shared
+
+    def tasks(self) -> dict[str, TaskDto]:
+        if self.__tasks is None:
+            ids = set(self.ids())
+            tasks = {}
+            error = None
+            try:
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        task = codec.load_task(json.loads(line))
+                        # The ids file is written last, tasks it doesn't list were never fully archived
+                        if task.id in ids:
+                            tasks[task.id] = task
+            except FileNotFoundError as e:
+                error = e
+            except (EOFError, OSError, ValueError, zlib.error) as e:
+                # Fine for a batch cut short by a crash, its ids were never listed
+                error = e
+            missing = ids - tasks.keys()
+            if missing:
+                if error is not None:
+                    print(error)
+                print(f'ERROR!\nThe archive "{self.path}" is damaged, {len(missing)} archived task(s) could not be read!')
+                raise SystemExit(1)
+            self.__tasks = tasks
+        return self.__tasks
+
+    def get(self, id: str) -> TaskDto | None:
+        return self.tasks().get(id) if id in self else None
+
+    def append(self, tasks: list[TaskDto]):
+        # Tasks first, then their ids, so an id is only listed once its task can be read back
+        with open(self.path, "ab") as f:
+            f.write(gzip.compress(self.__lines(tasks)))
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.ids_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{task.id}\n" for task in tasks))
+            f.flush()
+            os.fsync(f.fileno())
+        self.clear()
+
+    def remove(self, ids: Iterable[str]):
+        ids = set(ids)
+        keep = [t for id, t in self.tasks().items() if id not in ids]
+        # Ids first, tasks the ids file no longer lists are ignored until the archive is rewritten
+        write_file_atomic(self.ids_path, "".join(f"{task.id}\n" for task in keep).encode("utf-8"))
+        write_file_atomic(self.path, gzip.compress(self.__lines(keep)))
+        self.clear()
+
+    def tier_due(self) -> bool:
+        try:
+            return time.time() - os.stat(self.ids_path).st_mtime >= TIER_INTERVAL
+        except FileNotFoundError:
+            return True
+
+    def touch(self):
+        with open(self.ids_path, "a", encoding="utf-8"):
+            pass
+        os.utime(self.ids_path)
+
+    def clear(self):
+        self.__ids = None
+        self.__tasks = None
+
+    def __lines(self, tasks: list[TaskDto]) -> bytes:
+        return "".join(json.dumps(codec.dump_task(task)) + "\n" for task in tasks).encode("utf-8")
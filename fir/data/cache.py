@@ -0,0 +1,82 @@
+import hashlib
+import os
+import pickle
+
+from fir.config import DATA_DIR
+from fir.data.columnar import TaskStore, use_columnar
+from fir.types.dtos import ProfileDto, StatusDto, TaskDto
+
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+CACHE_VERSION = 1
+
+
+# Pre-validated copy of a profile file, keyed by path, size, mtime & content hash. The header is pickled
+# separately from the payload so a stale entry is rejected without unpickling its tasks.
+class SnapshotCache:
+    source: str
+    path: str
+
+    def __init__(self, profile_path: str):
+        self.source = os.path.abspath(profile_path)
+        key = hashlib.sha1(self.source.encode("utf-8")).hexdigest()
+        self.path = os.path.join(CACHE_DIR, f"{key}.bin")
+
+    def load(self, content: bytes) -> ProfileDto | None:
+        try:
+            st = os.stat(self.source)
+            with open(self.path, "rb") as f:
+                header = pickle.load(f)
+                if header[:4] != (CACHE_VERSION, self.source, st.st_size, st.st_mtime_ns):
+                    return None
+                if header[4] != self.__digest(content):
+                    return None
+                return self.__unpack(pickle.load(f))
+        except Exception:
+            return None
+
+    def store(self, content: bytes, data: ProfileDto):
+        try:
+            st = os.stat(self.source)
+            header = (CACHE_VERSION, self.source, st.st_size, st.st_mtime_ns, self.__digest(content))
+
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(self.__pack(data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            # The cache is only an optimisation, the profile file stays the source of truth
+            return
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __digest(self, content: bytes) -> bytes:
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def __pack(self, data: ProfileDto) -> tuple:
+        if isinstance(data.tasks, TaskStore):
+            # Columns pickle as raw buffers, dead rows left behind by removals are dropped first
+            tasks = data.tasks.compacted()
+        else:
+            tasks = [(t.id, t.name, t.status, t.due, t.tags, t.added, t.modified, t.link, t.description, t.priority,
+                      t.assigned_to) for t in data.tasks]
+        statuses = [(s.name, s.color, s.order, s.hide_by_default) for s in data.statuses]
+        return (data.name, data.description, data.config, tasks, statuses)
+
+    def __unpack(self, payload: tuple) -> ProfileDto:
+        name, description, config, tasks, statuses = payload
+        if isinstance(tasks, TaskStore):
+            if not use_columnar(config):
+                tasks = list(tasks)
+        elif use_columnar(config):
+            try:
+                tasks = TaskStore.from_rows(tasks)
+            except ValueError:
+                tasks = [TaskDto(*t) for t in tasks]
+        else:
+            tasks = [TaskDto(*t) for t in tasks]
+
+        return ProfileDto(name, description, config, tasks=tasks, statuses=[StatusDto(*s) for s in statuses])
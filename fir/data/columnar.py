@@ -0,0 +1,397 @@
+from array import array
+from bisect import bisect_left
+from functools import cache
+from typing import Iterable, Iterator
+
+from fir.types.dtos import TaskDto
+from fir.utils import str2bool
+
+ID_WIDTH = 8
+DEAD = 0xFFFFFFFF
+
+
+@cache
+def load_numpy():
+    # Optional, speeds up scans of large stores. Imported by the first scan rather than with fir.data.profile,
+    # so commands that never scan don't pay for it.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def use_columnar(config: dict) -> bool:
+    return str2bool(config.get("store.columnar"))
+
+
+class Dictionary:
+    values: list[str]
+    codes: dict[str, int]
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+
+# Dates are stored as sortable integers: YYYYMMDDhhmmss * 10 + 1 for datetimes, YYYYMMDD000000 * 10 for dates
+# and 0 when empty. Anything else can't be packed and keeps the profile on plain TaskDto lists.
+def encode_date(value: str) -> int:
+    if value == "":
+        return 0
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return int(value[:4] + value[5:7] + value[8:10]) * 10_000_000
+    if len(value) == 19 and value[10] == " " and value[13] == ":" and value[16] == ":":
+        return int(value[:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]) * 10 + 1
+    raise ValueError(f"Unsupported date value '{value}'")
+
+
+def decode_date(value: int) -> str:
+    if value == 0:
+        return ""
+    s = str(value // 10)
+    if value % 10 == 0:
+        return f"{s[:4]}-{s[4:6]}-{s[6:8]}"
+    return f"{s[:4]}-{s[4:6]}-{s[6:8]} {s[8:10]}:{s[10:12]}:{s[12:14]}"
+
+
+class MultiValueColumn:
+    # Dictionary encoded list column. Each row points at a (start, length) slice of codes, updated rows get a new
+    # slice at the end and their old slots are marked dead so they drop out of vectorised lookups.
+    dictionary: Dictionary
+
+    def __init__(self):
+        self.dictionary = Dictionary()
+        self.start = array("L")
+        self.length = array("H")
+        self.codes = array("I")
+        self.rows = array("I")
+
+    def append(self, values: list[str]):
+        self.start.append(len(self.codes))
+        self.length.append(len(values))
+        row = len(self.start) - 1
+        for v in values:
+            self.codes.append(self.dictionary.encode(v))
+            self.rows.append(row)
+
+    def replace(self, row: int, values: list[str]):
+        self.clear(row)
+        self.start[row] = len(self.codes)
+        self.length[row] = len(values)
+        for v in values:
+            self.codes.append(self.dictionary.encode(v))
+            self.rows.append(row)
+
+    def clear(self, row: int):
+        start = self.start[row]
+        for i in range(start, start + self.length[row]):
+            self.rows[i] = DEAD
+        self.length[row] = 0
+
+    def has_dead_slots(self) -> bool:
+        return len(self.codes) != sum(self.length)
+
+    def get(self, row: int) -> list[str]:
+        start = self.start[row]
+        values = self.dictionary.values
+        return [values[c] for c in self.codes[start:start + self.length[row]]]
+
+    def rows_with(self, value: str) -> set[int]:
+        code = self.dictionary.codes.get(value)
+        if code is None:
+            return set()
+        np = load_numpy()
+        if np is not None:
+            codes = np.frombuffer(self.codes, dtype=f"u{self.codes.itemsize}")
+            rows = np.frombuffer(self.rows, dtype=f"u{self.rows.itemsize}")[codes == code]
+            return set(rows[rows != DEAD].tolist())
+        rows = self.rows
+        return {rows[i] for i, c in enumerate(self.codes) if c == code and rows[i] != DEAD}
+
+
+class TaskStore:
+    # Columnar storage for ProfileDto.tasks, enabled with the 'store.columnar' config option. Ids, priorities
+    # and dates are packed arrays, statuses, tags & assignees are dictionary encoded. TaskDto views are created
+    # on demand and are detached copies, changes are written back through update()/put(), which
+    # Profile.update_task already does for every command.
+
+    def __init__(self):
+        self.__ids = bytearray()
+        self.__alive = bytearray()
+        self.__count = 0
+        self.__by_id = array("I")
+        self.__status = array("H")
+        self.__statuses = Dictionary()
+        self.__priority = array("q")
+        self.__due = array("q")
+        self.__added = array("q")
+        self.__modified = array("q")
+        self.__names: list[str] = []
+        self.__links: list[str] = []
+        self.__descriptions: list[str] = []
+        self.__tags = MultiValueColumn()
+        self.__assigned = MultiValueColumn()
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[TaskDto]) -> "TaskStore":
+        return cls.from_rows((t.id, t.name, t.status, t.due, t.tags, t.added, t.modified, t.link, t.description,
+                              t.priority, t.assigned_to) for t in tasks)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "TaskStore":
+        store = cls()
+        for r in rows:
+            store.__append_row(r)
+        store.__by_id = array("I", sorted(range(len(store.__alive)), key=store.__id_bytes))
+        return store
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def compacted(self) -> "TaskStore":
+        if self.__count == len(self.__alive) and not self.__tags.has_dead_slots() \
+                and not self.__assigned.has_dead_slots():
+            return self
+        return TaskStore.from_rows(self.rows())
+
+    def __iter__(self) -> Iterator[TaskDto]:
+        for row in range(len(self.__alive)):
+            if self.__alive[row]:
+                yield self.view(row)
+
+    def __contains__(self, id: str) -> bool:
+        return self.row_of(id) is not None
+
+    def rows(self) -> Iterator[tuple]:
+        for row in range(len(self.__alive)):
+            if self.__alive[row]:
+                yield self.__row_tuple(row)
+
+    def view(self, row: int) -> TaskDto:
+        return TaskDto(*self.__row_tuple(row))
+
+    def views(self, rows: Iterable[int]) -> list[TaskDto]:
+        return [self.view(r) for r in rows]
+
+    def get(self, id: str) -> TaskDto | None:
+        row = self.row_of(id)
+        return None if row is None else self.view(row)
+
+    def append(self, task: TaskDto):
+        self.put(task)
+
+    def put(self, task: TaskDto):
+        row = self.row_of(task.id)
+        if row is not None:
+            return self.update(task)
+
+        self.__append_row((task.id, task.name, task.status, task.due, task.tags, task.added, task.modified,
+                           task.link, task.description, task.priority, task.assigned_to))
+        row = len(self.__alive) - 1
+        i = bisect_left(self.__by_id, self.__id_bytes(row), key=self.__id_bytes)
+        self.__by_id.insert(i, row)
+
+    def update(self, task: TaskDto):
+        row = self.row_of(task.id)
+        if row is None:
+            return
+        self.__check_row(task.id, task.priority)
+        due, added, modified = encode_date(task.due), encode_date(task.added), encode_date(task.modified)
+        self.__status[row] = self.__statuses.encode(task.status)
+        self.__priority[row] = task.priority
+        self.__due[row] = due
+        self.__added[row] = added
+        self.__modified[row] = modified
+        self.__names[row] = task.name
+        self.__links[row] = task.link
+        self.__descriptions[row] = task.description
+        if self.__tags.get(row) != task.tags:
+            self.__tags.replace(row, task.tags)
+        if self.__assigned.get(row) != task.assigned_to:
+            self.__assigned.replace(row, task.assigned_to)
+
+    def remove(self, task: TaskDto):
+        if not self.discard(task.id):
+            raise ValueError(f"Task {task.id} not in store")
+
+    def discard(self, id: str) -> bool:
+        row = self.row_of(id)
+        if row is None:
+            return False
+        i = bisect_left(self.__by_id, self.__id_bytes(row), key=self.__id_bytes)
+        del self.__by_id[i]
+        self.__alive[row] = 0
+        self.__count -= 1
+        self.__tags.clear(row)
+        self.__assigned.clear(row)
+        return True
+
+    def row_of(self, id: str) -> int | None:
+        key = id.encode("utf-8")
+        i = bisect_left(self.__by_id, key, key=self.__id_bytes)
+        if i < len(self.__by_id) and self.__id_bytes(self.__by_id[i]) == key:
+            return self.__by_id[i]
+        return None
+
+    def find(self, prefix: str, limit: int = None) -> list[TaskDto]:
+        key = prefix.encode("utf-8")
+        tasks = []
+        i = bisect_left(self.__by_id, key, key=self.__id_bytes)
+        while i < len(self.__by_id) and self.__id_bytes(self.__by_id[i]).startswith(key):
+            tasks.append(self.view(self.__by_id[i]))
+            if limit is not None and len(tasks) >= limit:
+                break
+            i += 1
+        return tasks
+
+    def values(self, field: str) -> list[str]:
+        # Every value encoded so far, which can include ones no live task uses any more
+        dictionary = {"status": self.__statuses, "tags": self.__tags.dictionary,
+                      "assigned_to": self.__assigned.dictionary}[field]
+        return list(dictionary.values)
+
+    def sorted_ids(self) -> Iterator[str]:
+        for row in self.__by_id:
+            yield self.__id(row)
+
+    def neighbour_ids(self, id: str) -> (str | None, str | None):
+        key = id.encode("utf-8")
+        i = bisect_left(self.__by_id, key, key=self.__id_bytes)
+        before = self.__id(self.__by_id[i - 1]) if i > 0 else None
+        j = i + 1 if i < len(self.__by_id) and self.__id_bytes(self.__by_id[i]) == key else i
+        after = self.__id(self.__by_id[j]) if j < len(self.__by_id) else None
+        return before, after
+
+    def select(self, status: str = None, tag: str = None, assignee: str = None, name: str = None,
+               hidden_statuses: set[str] = set()) -> list[int]:
+        status_codes = self.__statuses.codes
+        hidden = {status_codes[s] for s in hidden_statuses if s in status_codes}
+        wanted = None
+        if status:
+            if status not in status_codes:
+                return []
+            wanted = status_codes[status]
+
+        np = load_numpy()
+        if np is not None:
+            mask = np.frombuffer(self.__alive, dtype="u1").astype(bool)
+            statuses = np.frombuffer(self.__status, dtype=f"u{self.__status.itemsize}")
+            if wanted is not None:
+                mask &= statuses == wanted
+            if hidden:
+                mask &= ~np.isin(statuses, list(hidden))
+            rows = np.flatnonzero(mask).tolist()
+        else:
+            alive = self.__alive
+            statuses = self.__status
+            rows = [r for r in range(len(alive)) if alive[r]
+                    and (wanted is None or statuses[r] == wanted) and statuses[r] not in hidden]
+
+        if tag:
+            tagged = self.__tags.rows_with(tag)
+            rows = [r for r in rows if r in tagged]
+        if assignee:
+            assigned = self.__assigned.rows_with(assignee)
+            rows = [r for r in rows if r in assigned]
+        if name:
+            name = name.lower()
+            rows = [r for r in rows if name in self.__names[r].lower()]
+
+        return rows
+
+    def __append_row(self, r: tuple):
+        id, name, status, due, tags, added, modified, link, description, priority, assigned_to = r
+        self.__check_row(id, priority)
+        dates = encode_date(due), encode_date(added), encode_date(modified)
+        self.__ids += id.encode("ascii")
+        self.__alive.append(1)
+        self.__count += 1
+        self.__status.append(self.__statuses.encode(status))
+        self.__priority.append(priority)
+        self.__due.append(dates[0])
+        self.__added.append(dates[1])
+        self.__modified.append(dates[2])
+        self.__names.append(name)
+        self.__links.append(link)
+        self.__descriptions.append(description)
+        self.__tags.append(tags)
+        self.__assigned.append(assigned_to)
+
+    def __check_row(self, id: str, priority: int):
+        if len(id) != ID_WIDTH or not id.isascii():
+            raise ValueError(f"Task id '{id}' can't be packed")
+        if priority.__class__ is not int:
+            raise ValueError(f"Priority '{priority}' can't be packed")
+
+    def __row_tuple(self, row: int) -> tuple:
+        return (self.__id(row), self.__names[row], self.__statuses.decode(self.__status[row]),
+                decode_date(self.__due[row]), self.__tags.get(row), decode_date(self.__added[row]),
+                decode_date(self.__modified[row]), self.__links[row], self.__descriptions[row], self.__priority[row],
+                self.__assigned.get(row))
+
+    def __id(self, row: int) -> str:
+        return self.__ids[row * ID_WIDTH:(row + 1) * ID_WIDTH].decode("ascii")
+
+    def __id_bytes(self, row: int) -> bytes:
+        return bytes(self.__ids[row * ID_WIDTH:(row + 1) * ID_WIDTH])
+
+
+class TaskStoreIdIndex:
+    # TaskIdIndex interface over a TaskStore, which keeps its own id order up to date
+
+    def __init__(self, store: TaskStore):
+        self.store = store
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def add(self, task: TaskDto):
+        pass
+
+    def remove(self, task: TaskDto):
+        pass
+
+    def get(self, id: str) -> TaskDto | None:
+        return self.store.get(id)
+
+    def find(self, prefix: str, limit: int = None) -> list[TaskDto]:
+        return self.store.find(prefix, limit=limit)
+
+    def resolve(self, prefix: str) -> (TaskDto | None, str):
+        if prefix in self.store:
+            return self.store.get(prefix), None
+
+        vals = self.find(prefix, limit=2)
+        if len(vals) > 1:
+            return None, "Conflicting tasks found, use full id value"
+        if len(vals) == 0:
+            return None, "Task not found"
+        return vals[0], None
+
+    def unique_prefix_length(self, id: str) -> int:
+        shared = 0
+        for other in self.store.neighbour_ids(id):
+            if other is None or other == id:
+                continue
+            n = 0
+            for x, y in zip(id, other):
+                if x != y:
+                    break
+                n += 1
+            shared = max(shared, n)
+        return min(shared + 1, len(id))
@@ -0,0 +1,118 @@
+import os
+from dataclasses import replace
+
+from fir.data.columnar import TaskStore
+from fir.data.journal import ProfileChanges
+from fir.types.dtos import ProfileDto, StatusDto, TaskDto
+from fir.utils.locks import FileLock, LockTimeout, lock_for, lock_timeout
+
+# Profiles written by more than one process. Reads take a shared lock on '<profile>.lock' & saves an exclusive one.
+# A profile saved by another process since it was read isn't overwritten: the save starts again from what's on disk
+# & re-applies this instance's own changes (merge). With 'write.concurrency' set to lock, the lock a read takes is
+# held until the save instead, so other processes wait.
+
+
+class ProfileConcurrency:
+    path: str
+    lock: FileLock
+    holding: bool = False
+    # Stamp of the files as this instance read or last saved them
+    stamp: tuple | None = None
+
+    def __init__(self, path: str, paths: list[str]):
+        self.path = path
+        self.lock = lock_for(f"{path}.lock")
+        # Files backing the profile, any write by anyone changes their stamp
+        self.paths = paths
+        # Statuses & config as read or last saved, what a merge diffs against
+        self.base: tuple[list[StatusDto], dict] = ([], {})
+
+    def acquire(self, exclusive: bool):
+        try:
+            self.lock.acquire(exclusive, lock_timeout())
+        except LockTimeout:
+            print(f'ERROR!\nTimed out waiting for another fir process to finish with "{self.path}"!')
+            raise SystemExit(1)
+
+    def release(self, exclusive: bool):
+        self.lock.release(exclusive=exclusive)
+
+    def hold(self):
+        # Kept until unlock(), see Profile.read
+        if not self.holding:
+            self.acquire(exclusive=True)
+            self.holding = True
+
+    def unlock(self):
+        if self.holding:
+            self.holding = False
+            self.lock.release(exclusive=True)
+
+    def current_stamp(self) -> tuple:
+        # Size, mtime & inode of each file
+        stamp = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_size, st.st_mtime_ns, st.st_ino))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def mark(self):
+        self.stamp = self.current_stamp()
+
+    def changed(self) -> bool:
+        return self.stamp is not None and self.current_stamp() != self.stamp
+
+    def keep_base(self, data: ProfileDto):
+        self.base = ([replace(s) for s in data.statuses], dict(data.config))
+
+    def merge(self, theirs: ProfileDto, ours: ProfileDto, changes: ProfileChanges):
+        # Applies our tracked changes to the profile as read again: tasks by id, statuses by name & config by key
+        merge_tasks(theirs.tasks, changes)
+        base_statuses, base_config = self.base
+        if changes.statuses:
+            theirs.statuses = merge_statuses(theirs.statuses, ours.statuses, base_statuses)
+        if changes.config:
+            for key in base_config.keys() - ours.config.keys():
+                theirs.config.pop(key, None)
+            for key, value in ours.config.items():
+                if base_config.get(key) != value:
+                    theirs.config[key] = value
+
+
+def merge_tasks(tasks: list[TaskDto] | TaskStore, changes: ProfileChanges):
+    if isinstance(tasks, TaskStore):
+        for id in changes.removed:
+            tasks.discard(id)
+        for task in changes.tasks.values():
+            tasks.put(task)
+        return
+
+    positions = {t.id: i for i, t in enumerate(tasks)}
+    for task in changes.tasks.values():
+        i = positions.get(task.id)
+        if i is None:
+            tasks.append(task)
+        else:
+            tasks[i] = task
+    if changes.removed:
+        tasks[:] = [t for t in tasks if t.id not in changes.removed]
+
+
+def merge_statuses(theirs: list[StatusDto], ours: list[StatusDto], base_statuses: list[StatusDto]) -> list[StatusDto]:
+    # Ours where they differ from what was read, theirs otherwise, statuses either side removed are left out
+    base = {s.name: s for s in base_statuses}
+    names = {s.name for s in ours}
+    statuses = [s for s in theirs if s.name in names or s.name not in base]
+    positions = {s.name: i for i, s in enumerate(statuses)}
+    for status in ours:
+        if base.get(status.name) == status:
+            continue
+        i = positions.get(status.name)
+        if i is None:
+            statuses.append(status)
+        else:
+            statuses[i] = status
+    return statuses
@@ -0,0 +1,119 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, Literal
+
+from fir.data.defaults import default_profile, default_statuses
+from fir.data.profile import Profile
+from fir.types.dtos import StatusDto, TaskDto
+from fir.utils.dates import datetime_to_date_string
+
+DueDistribution = Literal["uniform", "normal"]
+
+WORDS = ["fix", "write", "review", "release", "update", "docs", "bug", "api", "tests", "deploy", "parser", "cache",
+         "refactor", "profile", "status", "config", "migrate", "flaky", "build", "index", "support", "remove"]
+COLORS = ["light_red", "light_yellow", "light_blue", "light_green", "red", "light_cyan", "magenta", "yellow"]
+# Tasks are added & due relative to this date rather than now, so the same seed always gives the same file
+EPOCH = datetime(2024, 1, 1, 9, 0, 0)
+
+
+@dataclass
+class GenerateOptions:
+    tasks: int = 1000
+    statuses: int = 6
+    tags: int = 20
+    assignees: int = 10
+    hidden_fraction: float = 0.3
+    description_length: int = 0
+    due_fraction: float = 0.3
+    due_days: int = 90
+    due_distribution: DueDistribution = "uniform"
+    seed: int = 1
+
+
+def generate_profile(path: str, name: str, options: GenerateOptions) -> Profile:
+    # Tasks are handed to Profile.save as an iterator, they're written as they're generated & never all held in
+    # memory. The returned profile hasn't been read back.
+    profile = Profile(path, read=False)
+    profile.data = default_profile(name, f"Generated with seed {options.seed}")
+    profile.data.statuses = generate_statuses(options)
+    profile.data.tasks = generate_tasks(options, profile.data.statuses)
+    profile.save()
+    return profile
+
+
+def generate_statuses(options: GenerateOptions) -> list[StatusDto]:
+    if options.statuses < 1:
+        raise ValueError("At least one status is required")
+
+    statuses = default_statuses()[:options.statuses]
+    for i in range(len(statuses), options.statuses):
+        statuses.append(StatusDto(f"status{i}", COLORS[i % len(COLORS)], 100 + i))
+
+    visible = [s for s in statuses if not s.hide_by_default]
+    hidden = [s for s in statuses if s.hide_by_default]
+    if options.hidden_fraction > 0 and not hidden:
+        if len(visible) < 2:
+            raise ValueError("A hidden fraction needs at least two statuses")
+        statuses[-1].hide_by_default = True
+    return statuses
+
+
+def generate_tasks(options: GenerateOptions, statuses: list[StatusDto]) -> Iterator[TaskDto]:
+    if not 0 <= options.hidden_fraction <= 1 or not 0 <= options.due_fraction <= 1:
+        raise ValueError("Fractions must be between 0 and 1")
+    if options.tasks > 2 ** 32:
+        raise ValueError("At most 2^32 tasks can be generated")
+    return __tasks(options, statuses)
+
+
+def __tasks(options: GenerateOptions, statuses: list[StatusDto]) -> Iterator[TaskDto]:
+    r = random.Random(options.seed)
+    visible = [s.name for s in statuses if not s.hide_by_default]
+    hidden = [s.name for s in statuses if s.hide_by_default]
+    tags = [f"tag{i}" for i in range(options.tags)]
+    assignees = [f"user{i}" for i in range(options.assignees)]
+    offset = r.getrandbits(32)
+
+    for i in range(options.tasks):
+        if hidden and (not visible or r.random() < options.hidden_fraction):
+            status = r.choice(hidden)
+        else:
+            status = r.choice(visible)
+        added = EPOCH + timedelta(seconds=r.randrange(365 * 24 * 3600))
+
+        yield TaskDto(
+            # An odd multiplier is a bijection on 32 bits, ids are unique but spread over the whole prefix space
+            id=f"{(i * 2654435761 + offset) % 2 ** 32:08x}",
+            name=" ".join(r.choice(WORDS) for _ in range(r.randint(2, 8))),
+            status=status,
+            due=__due(r, options),
+            tags=r.sample(tags, min(len(tags), r.randint(0, 3))),
+            added=datetime_to_date_string(added),
+            modified=datetime_to_date_string(added + timedelta(seconds=r.randrange(30 * 24 * 3600))),
+            description=__description(r, options.description_length),
+            priority=r.randint(0, 999),
+            assigned_to=r.sample(assignees, min(len(assignees), r.randint(0, 2))))
+
+
+def __due(r: random.Random, options: GenerateOptions) -> str:
+    if r.random() >= options.due_fraction:
+        return ""
+    if options.due_distribution == "normal":
+        days = int(r.gauss(options.due_days / 2, options.due_days / 6))
+    else:
+        days = r.randint(0, options.due_days)
+    return (EPOCH + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def __description(r: random.Random, length: int) -> str:
+    if length <= 0:
+        return ""
+    words = []
+    size = 0
+    target = r.randint(length // 2, length)
+    while size < target:
+        w = r.choice(WORDS)
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)[:length]
@@ -0,0 +1,153 @@
+from bisect import bisect_left, insort
+from typing import Callable, Iterable
+
+from fir.types.dtos import TaskDto
+
+
+class TaskIdIndex:
+    ids: list[str]
+    tasks: dict[str, TaskDto]
+
+    def __init__(self, tasks: Iterable[TaskDto]):
+        self.tasks = {t.id: t for t in tasks}
+        self.ids = sorted(self.tasks)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.tasks
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, task: TaskDto):
+        if task.id not in self.tasks:
+            insort(self.ids, task.id)
+        self.tasks[task.id] = task
+
+    def remove(self, task: TaskDto):
+        if self.tasks.pop(task.id, None) is None:
+            return
+        i = bisect_left(self.ids, task.id)
+        del self.ids[i]
+
+    def get(self, id: str) -> TaskDto | None:
+        return self.tasks.get(id)
+
+    def find(self, prefix: str, limit: int = None) -> list[TaskDto]:
+        tasks = []
+        i = bisect_left(self.ids, prefix)
+        while i < len(self.ids) and self.ids[i].startswith(prefix):
+            tasks.append(self.tasks[self.ids[i]])
+            if limit is not None and len(tasks) >= limit:
+                break
+            i += 1
+        return tasks
+
+    def resolve(self, prefix: str) -> (TaskDto | None, str):
+        if prefix in self.tasks:
+            return self.tasks[prefix], None
+
+        vals = self.find(prefix, limit=2)
+        if len(vals) > 1:
+            return None, "Conflicting tasks found, use full id value"
+        if len(vals) == 0:
+            return None, "Task not found"
+        return vals[0], None
+
+    def unique_prefix_length(self, id: str) -> int:
+        # Also for ids that aren't in the index, e.g. archived tasks listed alongside these
+        i = bisect_left(self.ids, id)
+        j = i + 1 if i < len(self.ids) and self.ids[i] == id else i
+
+        shared = 0
+        if i > 0:
+            shared = self.__common_prefix_length(id, self.ids[i - 1])
+        if j < len(self.ids):
+            shared = max(shared, self.__common_prefix_length(id, self.ids[j]))
+
+        return min(shared + 1, len(id))
+
+    def __common_prefix_length(self, a: str, b: str) -> int:
+        n = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            n += 1
+        return n
+
+
+class TaskFieldIndex:
+    FIELDS: dict[str, Callable[[TaskDto], Iterable[str]]] = {
+        "status": lambda t: (t.status,),
+        "tags": lambda t: t.tags,
+        "assigned_to": lambda t: t.assigned_to,
+    }
+
+    def __init__(self, tasks: list[TaskDto]):
+        self.__tasks = tasks
+        self.__postings: dict[str, dict[str, set[str]]] = {}
+        self.__values: dict[str, dict[str, tuple[str, ...]]] = {}
+        self.__order: dict[str, int] | None = None
+        self.__next = 0
+
+    def lookup(self, field: str, value: str) -> set[str]:
+        return self.__field(field).get(value, set())
+
+    def values(self, field: str) -> list[str]:
+        return list(self.__field(field))
+
+    def count(self, field: str, value: str) -> int:
+        return len(self.lookup(field, value))
+
+    def ordered(self, ids: Iterable[str]) -> list[str]:
+        if self.__order is None:
+            self.__order = {t.id: i for i, t in enumerate(self.__tasks)}
+            self.__next = len(self.__order)
+        return sorted(ids, key=self.__order.__getitem__)
+
+    def add(self, task: TaskDto):
+        if self.__order is not None:
+            self.__order[task.id] = self.__next
+            self.__next += 1
+        for field in self.__postings:
+            self.__index(field, task)
+
+    def remove(self, task: TaskDto):
+        if self.__order is not None:
+            self.__order.pop(task.id, None)
+        for field in self.__postings:
+            self.__unindex(field, task.id)
+
+    def update(self, task: TaskDto):
+        for field in self.__postings:
+            if self.__values[field].get(task.id) != tuple(self.FIELDS[field](task)):
+                self.__unindex(field, task.id)
+                self.__index(field, task)
+
+    def __field(self, field: str) -> dict[str, set[str]]:
+        # Fields are indexed on first lookup so one-off commands only pay for the filters they use
+        if field not in self.__postings:
+            self.__postings[field] = {}
+            self.__values[field] = {}
+            for task in self.__tasks:
+                self.__index(field, task)
+        return self.__postings[field]
+
+    def __index(self, field: str, task: TaskDto):
+        values = tuple(self.FIELDS[field](task))
+        self.__values[field][task.id] = values
+        postings = self.__postings[field]
+        for v in values:
+            ids = postings.get(v)
+            if ids is None:
+                postings[v] = ids = set()
+            ids.add(task.id)
+
+    def __unindex(self, field: str, id: str):
+        postings = self.__postings[field]
+        for v in self.__values[field].pop(id, ()):
+            ids = postings.get(v)
+            if ids is None:
+                continue
+            ids.discard(id)
+            if not ids:
+                del postings[v]
@@ -0,0 +1,132 @@
+import json
+import os
+from dataclasses import dataclass, field
+
+from fir.data.columnar import TaskStore
+from fir.types import codec
+from fir.types.dtos import ProfileDto, TaskDto
+
+
+@dataclass
+class ProfileChanges:
+    tasks: dict[str, TaskDto] = field(default_factory=dict[str, TaskDto])
+    removed: set[str] = field(default_factory=set[str])
+    config: bool = False
+    statuses: bool = False
+
+    def put_task(self, task: TaskDto):
+        self.removed.discard(task.id)
+        self.tasks[task.id] = task
+
+    def remove_task(self, task: TaskDto):
+        self.tasks.pop(task.id, None)
+        self.removed.add(task.id)
+
+    def copy(self) -> "ProfileChanges":
+        return ProfileChanges(dict(self.tasks), set(self.removed), self.config, self.statuses)
+
+    def is_empty(self) -> bool:
+        return not (self.tasks or self.removed or self.config or self.statuses)
+
+    def clear(self):
+        self.tasks.clear()
+        self.removed.clear()
+        self.config = False
+        self.statuses = False
+
+
+class Journal:
+    path: str
+    count: int = 0
+
+    def __init__(self, profile_path: str):
+        self.path = f"{profile_path}.journal"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def replay(self, data: ProfileDto):
+        self.count = 0
+        if not self.exists():
+            return
+
+        tasks = None
+        for record in self.__records():
+            self.count += 1
+            op = record.get("op")
+            if op == "put" or op == "rm":
+                if tasks is None:
+                    # Columnar stores take changes in place, a task list is rebuilt once at the end
+                    tasks = data.tasks if isinstance(data.tasks, TaskStore) else {t.id: t for t in data.tasks}
+                self.__replay_task(tasks, record)
+            elif op == "config":
+                data.config = record["config"]
+            elif op == "statuses":
+                data.statuses = [codec.load_status(s) for s in record["statuses"]]
+
+        if isinstance(tasks, dict):
+            data.tasks = list(tasks.values())
+
+    def append(self, data: ProfileDto, changes: ProfileChanges):
+        records = self.__changed_records(data, changes)
+        if len(records) == 0:
+            return
+
+        lines = ''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records).encode("utf-8")
+        try:
+            with open(self.path, "a+b") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        lines = b'\n' + lines
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(e)
+            print(f'ERROR!\nCould not write to journal location "{self.path}"!')
+            raise SystemExit(1)
+
+        self.count += len(records)
+
+    def reset(self):
+        if self.exists():
+            os.remove(self.path)
+        self.count = 0
+
+    def __replay_task(self, tasks: TaskStore | dict[str, TaskDto], record: dict):
+        if record["op"] == "rm":
+            if isinstance(tasks, TaskStore):
+                tasks.discard(record["id"])
+            else:
+                tasks.pop(record["id"], None)
+            return
+
+        task = codec.load_task(record["task"])
+        if isinstance(tasks, TaskStore):
+            tasks.put(task)
+        else:
+            tasks[task.id] = task
+
+    def __changed_records(self, data: ProfileDto, changes: ProfileChanges) -> list[dict]:
+        records = []
+        if changes.config:
+            records.append({"op": "config", "config": data.config})
+        if changes.statuses:
+            records.append({"op": "statuses", "statuses": [codec.dump_status(s) for s in data.statuses]})
+        for id in changes.removed:
+            records.append({"op": "rm", "id": id})
+        for task in changes.tasks.values():
+            records.append({"op": "put", "task": codec.dump_task(task)})
+        return records
+
+    def __records(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn record from an interrupted append, append() starts the next record on a fresh line
+                    continue
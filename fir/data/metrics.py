@@ -0,0 +1,267 @@
+import json
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Literal
+
+from fir.utils.files import write_chunks_atomic
+from fir.utils.sketch import QuantileSketch
+
+# Aggregates the invocation metrics written with FIR_METRICS. Lines are streamed & folded into quantile sketches,
+# so memory grows with the number of distinct commands, phases, profiles & days rather than the number of lines.
+
+Period = Literal["day", "week", "month"]
+
+QUANTILES = (0.5, 0.95, 0.99)
+SUMMARY_SUFFIX = ".summary.json"
+VERSION = 1
+
+
+class MetricsAggregate:
+    commands: dict[str, QuantileSketch]
+    phases: dict[tuple[str, str], QuantileSketch]
+    profiles: dict[tuple[str, str, str], QuantileSketch]
+    days: dict[tuple[str, str], QuantileSketch]
+    errors: dict[str, int]
+    lines: int
+    skipped: int
+    first_ts: float | None
+    last_ts: float | None
+
+    def __init__(self):
+        self.commands = {}
+        self.phases = {}
+        self.profiles = {}
+        self.days = {}
+        self.errors = {}
+        self.lines = 0
+        self.skipped = 0
+        self.first_ts = None
+        self.last_ts = None
+
+    def add(self, entry: dict):
+        phases = entry.get("phases") or {}
+        total = phases.get("total")
+        if total is None:
+            self.skipped += 1
+            return
+
+        command = entry.get("command") or "-"
+        self.lines += 1
+        _sketch(self.commands, command).add(total)
+        for phase, ms in phases.items():
+            if phase != "total":
+                _sketch(self.phases, (command, phase)).add(ms)
+
+        profile = entry.get("profile") or "-"
+        _sketch(self.profiles, (profile, size_bucket(entry.get("size")), command)).add(total)
+
+        ts = entry.get("ts")
+        if ts is not None:
+            _sketch(self.days, (day_of(ts), command)).add(total)
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+        if entry.get("exit"):
+            self.errors[command] = self.errors.get(command, 0) + 1
+
+    def add_line(self, line: str):
+        entry = _load_entry(line)
+        if entry is None:
+            self.skipped += 1
+            return
+        self.add(entry)
+
+    def merge(self, other: "MetricsAggregate"):
+        for name in ("commands", "phases", "profiles", "days"):
+            sketches = getattr(self, name)
+            for key, sketch in getattr(other, name).items():
+                _sketch(sketches, key).merge(sketch)
+        for command, count in other.errors.items():
+            self.errors[command] = self.errors.get(command, 0) + count
+        self.lines += other.lines
+        self.skipped += other.skipped
+        for ts in (other.first_ts, other.last_ts):
+            if ts is not None:
+                self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+                self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+    def trend(self, command: str, period: Period = "day") -> list[tuple[str, QuantileSketch]]:
+        # Day sketches are merged into the requested period, sketches merge without losing accuracy
+        merged: dict[str, QuantileSketch] = {}
+        for (day, c), sketch in self.days.items():
+            if c == command:
+                _sketch(merged, period_of(day, period)).merge(sketch)
+        return sorted(merged.items())
+
+    def to_dict(self) -> dict:
+        return {
+            "version": VERSION,
+            "lines": self.lines,
+            "skipped": self.skipped,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "errors": self.errors,
+            "commands": [[k, s.to_dict()] for k, s in self.commands.items()],
+            "phases": [[list(k), s.to_dict()] for k, s in self.phases.items()],
+            "profiles": [[list(k), s.to_dict()] for k, s in self.profiles.items()],
+            "days": [[list(k), s.to_dict()] for k, s in self.days.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "MetricsAggregate":
+        if d.get("version") != VERSION:
+            raise ValueError(f"Unsupported metrics summary version {d.get('version')}")
+        a = cls()
+        a.lines = d["lines"]
+        a.skipped = d["skipped"]
+        a.first_ts = d["first_ts"]
+        a.last_ts = d["last_ts"]
+        a.errors = d["errors"]
+        a.commands = {k: QuantileSketch.from_dict(s) for k, s in d["commands"]}
+        a.phases = {tuple(k): QuantileSketch.from_dict(s) for k, s in d["phases"]}
+        a.profiles = {tuple(k): QuantileSketch.from_dict(s) for k, s in d["profiles"]}
+        a.days = {tuple(k): QuantileSketch.from_dict(s) for k, s in d["days"]}
+        return a
+
+
+def _load_entry(line: str) -> dict | None:
+    # None for lines that aren't a JSON object, e.g. one cut short by a crash
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _sketch(sketches: dict, key) -> QuantileSketch:
+    sketch = sketches.get(key)
+    if sketch is None:
+        sketch = sketches[key] = QuantileSketch()
+    return sketch
+
+
+def size_bucket(size: int | None) -> str:
+    # Order of magnitude buckets, "1k-10k" holds profiles with 1,000 to 9,999 tasks
+    if size is None:
+        return "-"
+    if size < 10:
+        return "0-10"
+    lower = 10 ** int(math.log10(size))
+    return f"{__short_number(lower)}-{__short_number(lower * 10)}"
+
+
+def __short_number(n: int) -> str:
+    for suffix, div in (("M", 10 ** 6), ("k", 10 ** 3)):
+        if n >= div:
+            return f"{n // div}{suffix}"
+    return str(n)
+
+
+def day_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def period_of(day: str, period: Period) -> str:
+    if period == "month":
+        return day[:7]
+    if period == "week":
+        d = datetime.strptime(day, "%Y-%m-%d")
+        return (d - timedelta(days=d.weekday())).strftime("%Y-%m-%d")
+    return day
+
+
+def summary_path(path: str) -> str:
+    return path + SUMMARY_SUFFIX
+
+
+def rotated_paths(path: str) -> list[str]:
+    paths = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        paths.append(f"{path}.{i}")
+        i += 1
+    return paths
+
+
+def read_lines(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def load_summary(path: str) -> MetricsAggregate:
+    summary = summary_path(path)
+    if not os.path.exists(summary):
+        return MetricsAggregate()
+    with open(summary, "r", encoding="utf-8") as f:
+        return MetricsAggregate.from_dict(json.load(f))
+
+
+def aggregate(paths: Iterable[str], into: MetricsAggregate = None) -> MetricsAggregate:
+    a = MetricsAggregate() if into is None else into
+    for path in paths:
+        if os.path.exists(path):
+            for line in read_lines(path):
+                a.add_line(line)
+    return a
+
+
+def rotate(path: str, keep: int = 5) -> str | None:
+    # metrics.jsonl becomes metrics.jsonl.1, older files shift up & anything past keep is removed. New invocations
+    # create a fresh log on their next append.
+    if not os.path.exists(path):
+        return None
+    for rotated in reversed(rotated_paths(path)):
+        i = int(rotated.rsplit(".", 1)[1])
+        if i >= keep:
+            os.remove(rotated)
+        else:
+            os.replace(rotated, f"{path}.{i + 1}")
+    if keep < 1:
+        os.remove(path)
+        return None
+    os.replace(path, f"{path}.1")
+    return f"{path}.1"
+
+
+def compact(path: str, keep_days: int, now: float) -> tuple[int, int]:
+    # Lines older than keep_days are folded into the summary next to the log, newer lines are kept as they are.
+    # The log is moved aside first so invocations running meanwhile append to a fresh file, kept lines are then
+    # appended back rather than rewriting the log over the top of them.
+    if not os.path.exists(path):
+        return 0, 0
+    pending = path + ".compacting"
+    if os.path.exists(pending):
+        raise ValueError(f"A previous compaction was interrupted, {pending} needs to be checked by hand")
+
+    os.replace(path, pending)
+    cutoff = now - keep_days * 24 * 3600
+    summary = load_summary(path)
+    folded = kept = 0
+    batch = []
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        for line in read_lines(pending):
+            entry = _load_entry(line)
+            if entry is None:
+                summary.skipped += 1
+            elif entry.get("ts") is not None and entry["ts"] >= cutoff:
+                batch.append(line.encode("utf-8"))
+                kept += 1
+                if len(batch) >= 1000:
+                    os.write(fd, b"".join(batch))
+                    batch.clear()
+            else:
+                summary.add(entry)
+                folded += 1
+        if batch:
+            os.write(fd, b"".join(batch))
+    finally:
+        os.close(fd)
+
+    write_chunks_atomic(summary_path(path), [json.dumps(summary.to_dict(), separators=(",", ":")).encode("utf-8")],
+                        verify="off")
+    os.remove(pending)
+    return folded, kept
@@ -1,49 +1,371 @@
 import os
+from collections.abc import Iterable, Iterator
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime
+from typing import TYPE_CHECKING
 
 from fir.config import DATA_DIR
+from fir.data.archive import Archive
+from fir.data.cache import SnapshotCache
+from fir.data.columnar import TaskStore, TaskStoreIdIndex, use_columnar
+from fir.data.concurrency import ProfileConcurrency
 from fir.data.defaults import default_profile
-from fir.utils import str2bool
+from fir.data.index import TaskFieldIndex, TaskIdIndex
+from fir.data.journal import Journal, ProfileChanges
+from fir.data.query import Query, all_of, filters
+from fir.data.search import ProfileSearch, SearchIndex
+from fir.data.tiers import ProfileTiers
+from fir.utils import str2bool, timings
+from fir.utils.dates import datetime_to_date_string
+from fir.types import codec
 from fir.types.config_options import ConfigOptions, ConfigOptionsMap
 from fir.types.dtos import StatusDto, TaskDto, ProfileDto
-from fir.utils.files import read_toml_file, write_toml_file
+from fir.utils.files import is_sqlite_path, read_binary_file, read_toml_bytes, write_toml_file, write_toml_stream
+
+if TYPE_CHECKING:
+    # Imported when a profile is a SQLite database, see Profile.__init__
+    from fir.data.sqlite import SqliteStore
+
+
+@dataclass
+class ProfileCheckpoint:
+    # Enough to undo a single command (see Profile.checkpoint): copies of the tasks it names, the statuses &
+    # config & the changes tracked for the next save, plus tasks added or removed since
+    tasks: dict[str, TaskDto]
+    statuses: list[StatusDto]
+    config: dict
+    changes: ProfileChanges
+    archiving: int
+    restoring: set[str]
+    undo: list[tuple[str, TaskDto]] = field(default_factory=list)
 
 
 class Profile:
     path: str
     data: ProfileDto
+    journal: Journal
+    cache: SnapshotCache
+    archive: Archive
+    sqlite: "SqliteStore | None" = None
     has_read: bool = False
+    # With write_behind, save() only marks the profile as pending & flush() writes it (see fir shell)
+    write_behind: bool = False
+    pending: bool = False
+    # Bumped by every change made through this instance, e.g. for HTTP ETags in fir serve
+    version: int = 0
+    # With 'write.concurrency' set to lock, the lock taken by read() is held until save(). Profiles kept
+    # across commands (fir.data.session) never hold it between them, they rely on the merge in save().
+    hold_lock: bool = True
 
     def __init__(self, path: str = None, read: bool = True):
         self.path = path
         if self.path is None:
             self.path = os.path.join(DATA_DIR, "default.toml")
+
+        self.journal = Journal(self.path)
+        self.cache = SnapshotCache(self.path)
+        self.__tiers = ProfileTiers(self.path)
+        self.archive = self.__tiers.archive
+        self.__search = ProfileSearch(self.path)
+        self.search_path = self.__search.path
+        self.__id_index = None
+        self.__field_index = None
+        if is_sqlite_path(self.path):
+            from fir.data.sqlite import SqliteStore
+            self.sqlite = SqliteStore(self.path)
+        stamped = [self.path, f"{self.path}-wal"] if self.sqlite is not None else [self.path, self.journal.path]
+        self.__concurrency = ProfileConcurrency(self.path, stamped)
+        self.__changes = ProfileChanges()
+        self.__undo: list | None = None
+
+        if path is None:
             if not os.path.exists(self.path):
                 self.data = default_profile("default")
                 self.save()
 
         if read:
-            self.__read()
+            self.read()
 
     def save(self):
-        return self.__save()
+        if self.write_behind:
+            self.pending = True
+            return
+        with timings.span("profile.save"):
+            return self.__save_locked()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with timings.span("profile.save"):
+            self.__save_locked()
+        self.pending = False
 
     def read(self):
-        return self.__read()
+        concurrency = self.__concurrency
+        with timings.span("profile.read"):
+            concurrency.acquire(exclusive=False)
+            try:
+                self.__read()
+                concurrency.mark()
+            finally:
+                concurrency.release(exclusive=False)
+
+            if self.hold_lock and not concurrency.holding and \
+                    self.try_get_config_value("write.concurrency") == "lock":
+                concurrency.hold()
+                # Saved by someone else between the shared & exclusive lock
+                if self.changed():
+                    self.__read()
+                    concurrency.mark()
+            concurrency.keep_base(self.data)
+
+    def stamp(self) -> tuple:
+        # Size, mtime & inode of the files backing the profile, any write by anyone changes it
+        return self.__concurrency.current_stamp()
+
+    def changed(self) -> bool:
+        # Whether the profile was saved elsewhere since this instance read or saved it
+        return self.has_read and self.__concurrency.changed()
+
+    def unlock(self):
+        self.__concurrency.unlock()
+
+    def compact(self):
+        if self.sqlite is not None:
+            return self.sqlite.vacuum()
+        return self.__write_snapshot()
+
+    @property
+    def id_index(self) -> TaskIdIndex | TaskStoreIdIndex:
+        # Rebuilt whenever the task list is swapped out, i.e. on read or when a new profile is assigned
+        if self.__id_index is None or self.__id_index_tasks is not self.data.tasks:
+            if isinstance(self.data.tasks, TaskStore):
+                self.__id_index = TaskStoreIdIndex(self.data.tasks)
+            else:
+                self.__id_index = TaskIdIndex(self.data.tasks)
+            self.__id_index_tasks = self.data.tasks
+        return self.__id_index
+
+    @property
+    def field_index(self) -> TaskFieldIndex:
+        if self.__field_index is None or self.__field_index_tasks is not self.data.tasks:
+            self.__field_index = TaskFieldIndex(self.data.tasks)
+            self.__field_index_tasks = self.data.tasks
+        return self.__field_index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        # Loaded on first use, kept up to date by the changes below & stored again once brought up to date
+        if self.__search.index is None:
+            with timings.span("search.load"):
+                stale = self.__search.load(self.__concurrency.stamp, self.data.tasks)
+            if stale and not self.pending and self.__changes.is_empty():
+                self.__store_search()
+        return self.__search.index
+
+    def find_tasks(self, status: str = None, name: str = None, assignee: str = None, tag: str = None,
+                   include_hidden: bool = False, where: str = None, include_archived: bool = False) -> list[TaskDto]:
+        tasks = self.__find_tasks(status, name, assignee, tag, include_hidden, where)
+        if include_archived and self.archive.ids():
+            # Raises QueryError for an invalid expression
+            queries = filters(status=status, name=name, assignee=assignee, tag=tag)
+            if where:
+                queries.append(Query(where))
+            tasks += self.__tiers.archived(self.id_index, all_of(queries).match if queries else None)
+        return tasks
+
+    def __find_tasks(self, status: str, name: str, assignee: str, tag: str, include_hidden: bool,
+                     where: str) -> list[TaskDto]:
+        if where:
+            # Raises QueryError for an invalid expression
+            query = all_of([Query(where)] + filters(status=status, name=name, assignee=assignee, tag=tag))
+            return query.select(self, include_hidden)
+
+        hidden = set() if include_hidden or status else self.get_hidden_status_names()
+        if isinstance(self.data.tasks, TaskStore):
+            rows = self.data.tasks.select(status=status, tag=tag, assignee=assignee, name=name, hidden_statuses=hidden)
+            return self.data.tasks.views(rows)
+
+        candidates = []
+        if status:
+            candidates.append(self.field_index.lookup("status", status))
+        if tag:
+            candidates.append(self.field_index.lookup("tags", tag))
+        if assignee:
+            candidates.append(self.field_index.lookup("assigned_to", assignee))
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+            tasks = [self.id_index.get(id) for id in self.field_index.ordered(ids)]
+        else:
+            tasks = self.data.tasks
+
+        if not name and not hidden:
+            return list(tasks)
+
+        name = name.lower() if name else None
+        return [t for t in tasks if t.status not in hidden and (name is None or name in t.name.lower())]
+
+    def field_values(self, field: str) -> list[str]:
+        # Distinct status, tags or assigned_to values across the tasks
+        if isinstance(self.data.tasks, TaskStore):
+            return self.data.tasks.values(field)
+        return self.field_index.values(field)
+
+    def checkpoint(self, ids: Iterable[str] | None = ()) -> ProfileCheckpoint:
+        # Commands edit tasks in place before validating everything, this records what a rollback() needs, ids None
+        # records every task. Tasks a command doesn't name can only change by being added or removed, which are
+        # logged until release().
+        if ids is None:
+            ids = [t.id for t in self.data.tasks]
+        tasks = {id: deepcopy(self.id_index.get(id)) for id in ids if id in self.id_index}
+        cp = ProfileCheckpoint(tasks, deepcopy(self.data.statuses), deepcopy(self.data.config), self.__changes.copy(),
+                               *self.__tiers.queued())
+        self.__undo = cp.undo
+        return cp
+
+    def release(self, cp: ProfileCheckpoint):
+        if self.__undo is cp.undo:
+            self.__undo = None
+
+    def rollback(self, cp: ProfileCheckpoint):
+        self.release(cp)
+        for op, task in reversed(cp.undo):
+            if op == "add":
+                current = self.id_index.get(task.id)
+                if current is not None:
+                    self.remove_task(current)
+            else:
+                self.add_task(task)
+
+        for id, saved in cp.tasks.items():
+            current = self.id_index.get(id)
+            if current is None:
+                continue
+            for f in fields(TaskDto):
+                setattr(current, f.name, deepcopy(getattr(saved, f.name)))
+            self.update_task(current)
+
+        if self.data.statuses != cp.statuses:
+            self.data.statuses = cp.statuses
+            self.version += 1
+        if self.data.config != cp.config:
+            self.data.config = cp.config
+            self.version += 1
+        self.__restore_changes(cp)
+
+    def __restore_changes(self, cp: ProfileCheckpoint):
+        # Only what was pending before the command is saved, pointing at the tasks as they are now
+        self.__changes = cp.changes
+        for id in list(self.__changes.tasks):
+            current = self.id_index.get(id)
+            if current is not None:
+                self.__changes.tasks[id] = current
+        self.__tiers.reset(cp.archiving, cp.restoring)
 
-    def get_task(self, id: str) -> (TaskDto | None, str):
-        vals = [x for x in self.data.tasks if x.id.startswith(id)]
-        if len(vals) > 1:
-            return None, "Conflicting tasks found, use full id value"
-        n = next((v for v in vals), None)
-        if n is None:
-            return None, "Task not found"
-        return n, None
+    def add_task(self, task: TaskDto):
+        if self.__undo is not None:
+            self.__undo.append(("add", task))
+        self.data.tasks.append(task)
+        self.id_index.add(task)
+        self.field_index.add(task)
+        self.__search.put(task)
+        self.__changes.put_task(task)
+        self.version += 1
+
+    def remove_task(self, task: TaskDto):
+        if self.__undo is not None:
+            self.__undo.append(("remove", deepcopy(task)))
+        self.data.tasks.remove(task)
+        self.id_index.remove(task)
+        self.field_index.remove(task)
+        self.__search.remove(task.id)
+        self.__changes.remove_task(task)
+        self.version += 1
+
+    def remove_tasks(self, tasks: list[TaskDto]):
+        # One pass over the task list rather than a list.remove per task
+        if isinstance(self.data.tasks, TaskStore):
+            for task in tasks:
+                self.remove_task(task)
+            return
+
+        ids = {t.id for t in tasks}
+        for task in tasks:
+            if self.__undo is not None:
+                self.__undo.append(("remove", deepcopy(task)))
+            self.id_index.remove(task)
+            self.field_index.remove(task)
+            self.__search.remove(task.id)
+            self.__changes.remove_task(task)
+        self.data.tasks[:] = [t for t in self.data.tasks if t.id not in ids]
+        self.version += 1
+
+    def update_task(self, task: TaskDto):
+        # Tasks not added yet (e.g. 'fir add' setting the status first) have nothing to record
+        if task.id not in self.id_index:
+            return
+        if isinstance(self.data.tasks, TaskStore):
+            self.data.tasks.update(task)
+        self.field_index.update(task)
+        self.__search.put(task)
+        self.__changes.put_task(task)
+        self.version += 1
+
+    def add_status(self, status: StatusDto):
+        self.data.statuses.append(status)
+        self.__changes.statuses = True
+        self.version += 1
+
+    def remove_status(self, status: StatusDto):
+        self.data.statuses.remove(status)
+        self.__changes.statuses = True
+        self.version += 1
+
+    def update_status(self, status: StatusDto):
+        self.__changes.statuses = True
+        self.version += 1
+
+    def set_config_value(self, key: ConfigOptions, value: str):
+        self.data.config[key] = value
+        self.__changes.config = True
+        self.version += 1
+
+    def remove_config_value(self, key: ConfigOptions):
+        self.data.config.pop(key)
+        self.__changes.config = True
+        self.version += 1
+
+    def get_task(self, id: str, include_archived: bool = False) -> (TaskDto | None, str):
+        return self.__tiers.get_task(id, self.id_index, include_archived)
+
+    def unique_prefix_length(self, id: str) -> int:
+        return self.__tiers.unique_prefix_length(id, self.id_index)
+
+    def archivable(self, days: int) -> list[TaskDto]:
+        return self.__tiers.archivable(self.data.tasks, self.get_hidden_status_names(), days)
+
+    def archive_tasks(self, tasks: list[TaskDto]):
+        self.remove_tasks(tasks)
+        self.__tiers.archiving.extend(tasks)
+
+    def restore_task(self, task: TaskDto):
+        # As modified now, or the next tiering would archive it again
+        task.modified = datetime_to_date_string(datetime.now())
+        self.add_task(task)
+        self.__tiers.restoring.add(task.id)
 
     def set_status(self, task: TaskDto, status: str) -> bool:
         if status not in self.get_status_names():
             return False
 
+        if task.status != status:
+            # Also what archivable() measures how long a task has been in a hidden status by
+            task.modified = datetime_to_date_string(datetime.now())
         task.status = status
+        self.update_task(task)
         return True
 
     def try_get_config_value(self, key: ConfigOptions):
@@ -74,16 +396,152 @@ class Profile:
     def get_status_names(self) -> list[str]:
         return [s.name for s in self.data.statuses]
 
+    def get_hidden_status_names(self) -> set[str]:
+        return {s.name for s in self.data.statuses if s.hide_by_default}
+
     def __read(self):
         self.__check_dir()
-        d = read_toml_file(self.path)
-        self.data = ProfileDto.Schema().load(d)
+        if self.sqlite is not None:
+            with timings.span("sqlite.read"):
+                self.data = self.sqlite.read()
+        else:
+            self.data = self.__read_snapshot()
+            with timings.span("journal.replay"):
+                self.journal.replay(self.data)
+        if use_columnar(self.data.config) and not isinstance(self.data.tasks, TaskStore):
+            try:
+                with timings.span("columnar.build"):
+                    self.data.tasks = TaskStore.from_tasks(self.data.tasks)
+            except ValueError:
+                # Tasks with values the packed columns can't represent stay as plain TaskDto lists
+                pass
+        self.__changes.clear()
+        self.__search.clear()
+        self.archive.clear()
+        self.version += 1
         self.has_read = True
 
+    def __read_snapshot(self) -> ProfileDto:
+        with timings.span("file.read"):
+            content = read_binary_file(self.path)
+        with timings.span("cache.load"):
+            data = self.cache.load(content)
+        if data is None:
+            with timings.span("toml.parse"):
+                d = read_toml_bytes(self.path, content)
+            with timings.span("codec.load"):
+                data = codec.load_profile(d)
+            with timings.span("cache.store"):
+                self.cache.store(content, data)
+        return data
+
+    def __save_locked(self):
+        concurrency = self.__concurrency
+        concurrency.acquire(exclusive=True)
+        try:
+            if self.changed():
+                self.__merge()
+            self.__tier()
+            self.__tiers.write_archived()
+            search = None
+            if not self.__changes.is_empty():
+                # Untracked changes can't be described, the next search load reconciles instead
+                search = self.__search.delta(self.stamp(), self.__changes.tasks.values(), self.__changes.removed)
+            self.__save()
+            concurrency.mark()
+            if search is not None:
+                self.__search.append(search, concurrency.stamp)
+            self.__tiers.write_restored()
+            concurrency.keep_base(self.data)
+        finally:
+            concurrency.release(exclusive=True)
+        self.unlock()
+
+    def __merge(self):
+        # Another process saved the profile since it was read. Rather than overwrite that, start again from what's
+        # on disk & re-apply this instance's own changes (see fir.data.concurrency).
+        ours, changes = self.data, self.__changes
+        if changes.is_empty():
+            # Changes made straight to self.data can't be told apart, the whole profile is written as before
+            return
+        with timings.span("profile.merge"):
+            self.__changes = ProfileChanges()
+            self.__read()
+            self.__concurrency.merge(self.data, ours, changes)
+            self.__changes = changes
+
+    def __tier(self):
+        # Automatic tiering, only for saves of tracked changes, untracked ones need the whole profile written (see
+        # __save) which removals would turn into a journal append
+        days = self.try_get_config_value_int("archive.after_days")
+        if self.__changes.is_empty() or not self.__tiers.tier_due(days):
+            return
+        tasks = self.archivable(days)
+        if tasks:
+            self.archive_tasks(tasks)
+        self.archive.touch()
+
+    def __store_search(self):
+        concurrency = self.__concurrency
+        concurrency.acquire(exclusive=True)
+        try:
+            # Only if nothing was saved since the index was brought up to date against this instance's data
+            if not self.changed():
+                self.__search.index.store(concurrency.stamp)
+        finally:
+            concurrency.release(exclusive=True)
+
     def __save(self):
+        if self.sqlite is not None:
+            return self.__save_sqlite()
+
+        threshold = self.try_get_config_value_int("journal.compact_threshold")
+        # Untracked changes (direct edits to self.data) can only be persisted by rewriting the whole file
+        if threshold <= 0 or self.__changes.is_empty() or not os.path.exists(self.path):
+            return self.__write_snapshot()
+
+        self.__check_dir()
+        with timings.span("journal.append"):
+            self.journal.append(self.data, self.__changes)
+        self.__changes.clear()
+        if self.journal.count >= threshold:
+            self.__write_snapshot()
+
+    def __save_sqlite(self):
         self.__check_dir()
-        s = ProfileDto.Schema().dump(self.data)
-        write_toml_file(self.path, s)
+        if self.__changes.is_empty() or not self.sqlite.exists():
+            with timings.span("sqlite.write"):
+                self.sqlite.write(self.data)
+        else:
+            with timings.span("sqlite.commit"):
+                self.sqlite.commit(self.data, self.__changes)
+        self.__changes.clear()
+
+    def __write_snapshot(self):
+        self.__check_dir()
+        if isinstance(self.data.tasks, Iterator):
+            return self.__write_stream()
+
+        with timings.span("codec.dump"):
+            s = codec.dump_profile(self.data)
+        with timings.span("toml.write"):
+            content = write_toml_file(self.path, s, verify=self.try_get_config_value("write.verify"))
+        with timings.span("cache.store"):
+            self.cache.store(content, self.data)
+        self.journal.reset()
+        self.__changes.clear()
+
+    def __write_stream(self):
+        # Tasks given as an iterator (e.g. fir.data.generate) are serialised as they're produced. Nothing is
+        # left to cache afterwards, the next read parses the file & fills the cache.
+        head = codec.dump_profile(replace(self.data, tasks=[]))
+        head.pop("tasks")
+        with timings.span("toml.write"):
+            write_toml_stream(self.path, head, "tasks", (codec.dump_task(t) for t in self.data.tasks),
+                              verify=self.try_get_config_value("write.verify"))
+        self.cache.clear()
+        self.journal.reset()
+        self.__changes.clear()
 
     def __check_dir(self):
         if not os.path.isdir(DATA_DIR):
@@ -0,0 +1,379 @@
+import operator
+import re
+from datetime import date, timedelta
+from typing import Callable
+
+from fir.types.dtos import TaskDto
+from fir.utils.dates import str_to_date_string
+
+# Filter expressions for 'fir ls --where', e.g.
+#   status in (todo, prog) and (priority <= 2 or due < today+7) and not tags = blocked
+# An expression is parsed once into a tree of nodes & compiled into a single predicate. Equality & 'in' terms on
+# status, tags & assigned can be answered by the profile's field index: select() starts from the most selective of
+# those & only runs the rest of the expression on the tasks they leave.
+
+FIELDS = {
+    "id": "id",
+    "name": "name",
+    "description": "description",
+    "desc": "description",
+    "link": "link",
+    "status": "status",
+    "priority": "priority",
+    "due": "due",
+    "added": "added",
+    "modified": "modified",
+    "tags": "tags",
+    "tag": "tags",
+    "assigned": "assigned_to",
+    "assignee": "assigned_to",
+}
+LIST_FIELDS = {"tags", "assigned_to"}
+DATE_FIELDS = {"due", "added", "modified"}
+# Fields TaskFieldIndex can look up
+INDEXED_FIELDS = {"status", "tags", "assigned_to"}
+KEYWORDS = {"and", "or", "not", "in"}
+
+TOKEN = re.compile(r"""\s*(?:(?P<string>"[^"]*"|'[^']*')|(?P<op><=|>=|!=|==|!~|[=<>~(),])|(?P<word>[^\s()=<>!~,"']+))""")
+TODAY = re.compile(r"today(?:([+-])(\d+))?")
+
+Predicate = Callable[[TaskDto], bool]
+Lookup = Callable[[str, str], set[str]]
+
+
+class QueryError(ValueError):
+    pass
+
+
+class Node:
+    def compile(self) -> Predicate:
+        raise NotImplementedError
+
+    def plan(self, lookup: Lookup) -> tuple[set[str] | None, "Node | None"]:
+        """Ids the index narrows this node down to (None if it can't) & what's left to check on them"""
+        return None, self
+
+    def fields(self) -> set[str]:
+        raise NotImplementedError
+
+
+class And(Node):
+    def __init__(self, children: list[Node]):
+        self.children = children
+
+    def compile(self) -> Predicate:
+        predicates = [c.compile() for c in self.children]
+        return lambda t: all(p(t) for p in predicates)
+
+    def plan(self, lookup: Lookup) -> tuple[set[str] | None, Node | None]:
+        indexed, rest = [], []
+        for child in self.children:
+            ids, residual = child.plan(lookup)
+            if ids is not None:
+                indexed.append(ids)
+            if residual is not None:
+                rest.append(residual)
+        if not indexed:
+            return None, self
+
+        indexed.sort(key=len)
+        ids = indexed[0].intersection(*indexed[1:])
+        if not rest:
+            return ids, None
+        return ids, rest[0] if len(rest) == 1 else And(rest)
+
+    def fields(self) -> set[str]:
+        return set().union(*(c.fields() for c in self.children))
+
+
+class Or(Node):
+    def __init__(self, children: list[Node]):
+        self.children = children
+
+    def compile(self) -> Predicate:
+        predicates = [c.compile() for c in self.children]
+        return lambda t: any(p(t) for p in predicates)
+
+    def plan(self, lookup: Lookup) -> tuple[set[str] | None, Node | None]:
+        # Only when every branch is answered by the index on its own
+        union = set()
+        for child in self.children:
+            ids, residual = child.plan(lookup)
+            if ids is None or residual is not None:
+                return None, self
+            union |= ids
+        return union, None
+
+    def fields(self) -> set[str]:
+        return set().union(*(c.fields() for c in self.children))
+
+
+class Not(Node):
+    def __init__(self, child: Node):
+        self.child = child
+
+    def compile(self) -> Predicate:
+        predicate = self.child.compile()
+        return lambda t: not predicate(t)
+
+    def fields(self) -> set[str]:
+        return self.child.fields()
+
+
+class Compare(Node):
+    def __init__(self, field: str, op: str, values: list[str]):
+        self.field = field
+        self.op = "=" if op == "==" else op
+        self.values = values
+        # Checked when the expression is parsed rather than on the first task
+        self.__predicate = self.__compile()
+
+    def compile(self) -> Predicate:
+        return self.__predicate
+
+    def plan(self, lookup: Lookup) -> tuple[set[str] | None, Node | None]:
+        if self.field not in INDEXED_FIELDS or self.op not in ("=", "in"):
+            return None, self
+        ids = set()
+        for value in self.values:
+            ids |= lookup(self.field, value)
+        return ids, None
+
+    def fields(self) -> set[str]:
+        return {self.field}
+
+    def __compile(self) -> Predicate:
+        op = self.op
+        if self.field in LIST_FIELDS:
+            return self.__compile_list()
+
+        get, values = self.__typed()
+        value = values[0]
+        if op == "=":
+            return lambda t: get(t) == value
+        if op == "!=":
+            return lambda t: get(t) != value
+        if op == "in":
+            wanted = set(values)
+            return lambda t: get(t) in wanted
+        if op in ("~", "!~"):
+            return self.__compile_contains(get, value)
+        return self.__compile_order(get, value)
+
+    def __typed(self) -> tuple[Callable[[TaskDto], object], list]:
+        # The field's getter & the values parsed to compare with it
+        field = self.field
+        if field == "priority":
+            try:
+                values = [int(v) for v in self.values]
+            except ValueError:
+                raise QueryError(f"priority is compared with numbers, not '{', '.join(self.values)}'")
+            return lambda t: t.priority or 0, values
+        if field in DATE_FIELDS:
+            return lambda t: (getattr(t, field) or "")[:10], [_date(v) for v in self.values]
+        return lambda t: getattr(t, field) or "", self.values
+
+    def __compile_contains(self, get: Callable[[TaskDto], str], value: str) -> Predicate:
+        if self.field == "priority" or self.field in DATE_FIELDS:
+            raise QueryError(f"'{self.op}' only applies to text fields, not {self.field}")
+        value = value.lower()
+        if self.op == "~":
+            return lambda t: value in get(t).lower()
+        return lambda t: value not in get(t).lower()
+
+    def __compile_order(self, get: Callable[[TaskDto], object], value) -> Predicate:
+        field, op = self.field, self.op
+        if field != "priority" and field not in DATE_FIELDS:
+            raise QueryError(f"'{op}' only applies to priority & dates, not {field}")
+        if value == "":
+            raise QueryError(f"'{op}' needs a date to compare {field} with")
+
+        # Tasks without the date never match an ordering comparison
+        compare = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}[op]
+        if field in DATE_FIELDS:
+            return lambda t: (d := get(t)) != "" and compare(d, value)
+        return lambda t: compare(get(t), value)
+
+    def __compile_list(self) -> Predicate:
+        field, op, values = self.field, self.op, self.values
+        if op == "=":
+            value = values[0]
+            return lambda t: value in getattr(t, field)
+        if op == "!=":
+            value = values[0]
+            return lambda t: value not in getattr(t, field)
+        if op == "in":
+            wanted = set(values)
+            return lambda t: not wanted.isdisjoint(getattr(t, field))
+        if op in ("~", "!~"):
+            value = values[0].lower()
+            if op == "~":
+                return lambda t: any(value in v.lower() for v in getattr(t, field))
+            return lambda t: not any(value in v.lower() for v in getattr(t, field))
+        raise QueryError(f"'{op}' doesn't apply to {field}, use =, != or in")
+
+
+class Query:
+    text: str
+    root: Node
+    match: Predicate
+
+    def __init__(self, text: str = "", root: Node = None):
+        self.text = text
+        self.root = root if root is not None else _Parser(text).parse()
+        self.match = self.root.compile()
+
+    def fields(self) -> set[str]:
+        return self.root.fields()
+
+    def select(self, profile, include_hidden: bool = False) -> list[TaskDto]:
+        # Hidden statuses are left out like 'fir ls' does, unless the expression asks about statuses itself
+        hidden = set() if include_hidden or "status" in self.fields() else profile.get_hidden_status_names()
+        ids, residual = self.root.plan(profile.field_index.lookup)
+        if ids is None:
+            tasks = profile.data.tasks
+        else:
+            tasks = [profile.id_index.get(id) for id in profile.field_index.ordered(ids)]
+
+        match = residual.compile() if residual is not None else None
+        return [t for t in tasks if t.status not in hidden and (match is None or match(t))]
+
+
+def all_of(queries: list[Query]) -> Query:
+    if len(queries) == 1:
+        return queries[0]
+    return Query(" and ".join(f"({q.text})" for q in queries), And([q.root for q in queries]))
+
+
+def filters(status: str = None, name: str = None, assignee: str = None, tag: str = None) -> list[Query]:
+    # The fixed 'fir ls' options as expressions, so they're planned together with --where
+    queries = []
+    if status:
+        queries.append(Query(f"status = {status!r}", Compare("status", "=", [status])))
+    if tag:
+        queries.append(Query(f"tags = {tag!r}", Compare("tags", "=", [tag])))
+    if assignee:
+        queries.append(Query(f"assigned = {assignee!r}", Compare("assigned_to", "=", [assignee])))
+    if name:
+        queries.append(Query(f"name ~ {name!r}", Compare("name", "~", [name])))
+    return queries
+
+
+def _date(value: str) -> str:
+    if value == "":
+        return value
+    today = TODAY.fullmatch(value.lower())
+    if today is not None:
+        sign, days = today.groups()
+        d = date.today()
+        if days is not None:
+            d += timedelta(days=int(days) if sign == "+" else -int(days))
+        return d.isoformat()
+    try:
+        return str_to_date_string(value)
+    except ValueError:
+        raise QueryError(f"'{value}' isn't a date, use YYYY-MM-DD, today, today+N or today-N")
+
+
+class _Parser:
+    # or_expr  := and_expr ('or' and_expr)*
+    # and_expr := not_expr ('and' not_expr)*
+    # not_expr := 'not' not_expr | '(' or_expr ')' | field op value | field 'in' '(' value (',' value)* ')'
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: list[tuple[str, str, int]] = []
+        pos = 0
+        while pos < len(text):
+            m = TOKEN.match(text, pos)
+            if m is None or m.end() == pos:
+                if text[pos:].strip() == "":
+                    break
+                raise QueryError(f"Unexpected '{text[pos:].strip()[0]}' at position {pos + 1}")
+            kind = m.lastgroup
+            value, start = m.group(kind), m.start(kind)
+            if kind == "string":
+                value = value[1:-1]
+            elif kind == "word" and value.lower() in KEYWORDS:
+                kind, value = "keyword", value.lower()
+            self.tokens.append((kind, value, start + 1))
+            pos = m.end()
+        self.i = 0
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QueryError("Empty expression")
+        node = self.__or()
+        if self.i < len(self.tokens):
+            raise self.__error("Expected 'and', 'or' or the end of the expression")
+        return node
+
+    def __or(self) -> Node:
+        children = [self.__and()]
+        while self.__accept("keyword", "or"):
+            children.append(self.__and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def __and(self) -> Node:
+        children = [self.__not()]
+        while self.__accept("keyword", "and"):
+            children.append(self.__not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def __not(self) -> Node:
+        if self.__accept("keyword", "not"):
+            return Not(self.__not())
+        if self.__accept("op", "("):
+            node = self.__or()
+            self.__expect("op", ")")
+            return node
+        return self.__comparison()
+
+    def __comparison(self) -> Node:
+        kind, name, _ = self.__peek()
+        if kind != "word" or name.lower() not in FIELDS:
+            raise self.__error(f"Expected a field, one of: {', '.join(sorted(FIELDS))}")
+        self.i += 1
+        field = FIELDS[name.lower()]
+
+        if self.__accept("keyword", "in"):
+            self.__expect("op", "(")
+            values = [self.__value()]
+            while self.__accept("op", ","):
+                values.append(self.__value())
+            self.__expect("op", ")")
+            return Compare(field, "in", values)
+
+        kind, op, _ = self.__peek()
+        if kind != "op" or op in ("(", ")", ","):
+            raise self.__error(f"Expected an operator after '{name}': =, !=, <, <=, >, >=, ~, !~ or in")
+        self.i += 1
+        return Compare(field, op, [self.__value()])
+
+    def __value(self) -> str:
+        kind, value, _ = self.__peek()
+        if kind not in ("word", "string"):
+            raise self.__error("Expected a value")
+        self.i += 1
+        return value
+
+    def __peek(self) -> tuple[str, str, int]:
+        if self.i < len(self.tokens):
+            return self.tokens[self.i]
+        return "end", "", len(self.text) + 1
+
+    def __accept(self, kind: str, value: str) -> bool:
+        k, v, _ = self.__peek()
+        if k == kind and v == value:
+            self.i += 1
+            return True
+        return False
+
+    def __expect(self, kind: str, value: str):
+        if not self.__accept(kind, value):
+            raise self.__error(f"Expected '{value}'")
+
+    def __error(self, message: str) -> QueryError:
+        kind, value, pos = self.__peek()
+        found = "the end of the expression" if kind == "end" else f"'{value}'"
+        return QueryError(f"{message}, found {found} at position {pos}")
@@ -0,0 +1,207 @@
+import math
+import os
+import pickle
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable
+
+from fir.types.dtos import TaskDto
+
+SEARCH_VERSION = 1
+# Deltas applied on load before the sidecar is rewritten in one piece
+COMPACT_DELTAS = 50
+# Matches in the name count for more than matches in the description
+NAME_WEIGHT = 2
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+# Inverted index over task names & descriptions, token -> {task id: weight}.
+# Kept in '<profile>.search' beside the profile: a snapshot followed by delta frames appended by each save, every
+# frame carries the profile stamp it was written against. On load the frames are replayed while their stamps chain,
+# if the result doesn't match the profile on disk (a save from before the sidecar existed, an edit by hand...)
+# only the tasks whose name or description differ are re-indexed.
+class SearchIndex:
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__postings: dict[str, dict[str, int]] = {}
+        # id -> (name, description) as indexed, to un-index & to spot tasks that changed behind the sidecar's back
+        self.__docs: dict[str, tuple[str, str]] = {}
+        self.__vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self.__docs)
+
+    @classmethod
+    def load(cls, path: str, stamp: tuple, tasks: Iterable[TaskDto]) -> tuple["SearchIndex", bool]:
+        """Returns the index for the tasks & whether it should be stored again"""
+        index = cls(path)
+        current, deltas = None, 0
+        try:
+            with open(path, "rb") as f:
+                header = pickle.load(f)
+                if header[0] == SEARCH_VERSION:
+                    index.__postings, index.__docs = pickle.load(f)
+                    current = header[1]
+                    while True:
+                        previous, new, puts, removed = pickle.load(f)
+                        if previous != current:
+                            break
+                        for id in removed:
+                            index.remove(id)
+                        for id, name, description in puts:
+                            index.put(id, name, description)
+                        current, deltas = new, deltas + 1
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # EOF after the last delta, or a frame cut short by a concurrent append, either way the stamp check
+            # below decides what happens next
+            pass
+
+        if current is not None and current == stamp:
+            return index, deltas > COMPACT_DELTAS
+        index.reconcile(tasks)
+        return index, True
+
+    @staticmethod
+    def append_delta(path: str, previous: tuple, new: tuple, puts: Iterable[TaskDto], removed: Iterable[str]):
+        # Only called while holding the profile's exclusive lock, frames from different processes can't interleave
+        frame = (previous, new, [(t.id, t.name, t.description) for t in puts], list(removed))
+        try:
+            with open(path, "ab") as f:
+                pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            # The next load finds the chain broken & reconciles
+            return
+
+    def store(self, stamp: tuple):
+        try:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((SEARCH_VERSION, stamp), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump((self.__postings, self.__docs), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Like the snapshot cache, only an optimisation
+            return
+
+    def reconcile(self, tasks: Iterable[TaskDto]):
+        seen = set()
+        for task in tasks:
+            seen.add(task.id)
+            if self.__docs.get(task.id) != (task.name, task.description):
+                self.put(task.id, task.name, task.description)
+        for id in [id for id in self.__docs if id not in seen]:
+            self.remove(id)
+
+    def put(self, id: str, name: str, description: str):
+        if self.__docs.get(id) == (name, description):
+            return
+        self.remove(id)
+        self.__docs[id] = (name, description)
+        weights = Counter(tokenize(description))
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token, weight in weights.items():
+            ids = self.__postings.get(token)
+            if ids is None:
+                self.__postings[token] = ids = {}
+                self.__vocabulary = None
+            ids[id] = weight
+
+    def remove(self, id: str):
+        doc = self.__docs.pop(id, None)
+        if doc is None:
+            return
+        for token in set(tokenize(doc[0])) | set(tokenize(doc[1])):
+            ids = self.__postings.get(token)
+            if ids is None:
+                continue
+            ids.pop(id, None)
+            if not ids:
+                del self.__postings[token]
+                self.__vocabulary = None
+
+    def search(self, query: str) -> list[tuple[str, float]]:
+        """Ids of the tasks matching every word of the query, best match first. 'word*' matches by prefix."""
+        terms = []
+        for word in query.split():
+            tokens = tokenize(word)
+            if not tokens:
+                continue
+            for token in tokens[:-1]:
+                terms.append(self.__postings.get(token, {}))
+            terms.append(self.__prefixed(tokens[-1]) if word.endswith("*") else self.__postings.get(tokens[-1], {}))
+        if not terms or not all(terms):
+            return []
+
+        # Only the postings of the query's terms are read, starting from the rarest
+        terms.sort(key=len)
+        total = len(self.__docs)
+        scores = {}
+        for i, postings in enumerate(terms):
+            idf = math.log(1 + total / len(postings))
+            if i == 0:
+                scores = {id: weight * idf for id, weight in postings.items()}
+                continue
+            scores = {id: score + postings[id] * idf for id, score in scores.items() if id in postings}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda s: (-s[1], s[0]))
+
+    def __prefixed(self, prefix: str) -> dict[str, int]:
+        if self.__vocabulary is None:
+            self.__vocabulary = sorted(self.__postings)
+        postings = {}
+        for i in range(bisect_left(self.__vocabulary, prefix), len(self.__vocabulary)):
+            token = self.__vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            for id, weight in self.__postings[token].items():
+                if weight > postings.get(id, 0):
+                    postings[id] = weight
+        return postings
+
+
+class ProfileSearch:
+    # A profile's SearchIndex, loaded on first use & kept up to date by the profile's changes. Each save appends what
+    # it changed to the sidecar, so the next load doesn't have to reconcile.
+    path: str
+    index: SearchIndex | None = None
+
+    def __init__(self, profile_path: str):
+        self.path = f"{profile_path}.search"
+
+    def load(self, stamp: tuple, tasks: Iterable[TaskDto]) -> bool:
+        """Loads the index against the profile's stamp, returning whether it should be stored again"""
+        self.index, stale = SearchIndex.load(self.path, stamp, tasks)
+        return stale
+
+    def clear(self):
+        self.index = None
+
+    def put(self, task: TaskDto):
+        if self.index is not None:
+            self.index.put(task.id, task.name, task.description)
+
+    def remove(self, id: str):
+        if self.index is not None:
+            self.index.remove(id)
+
+    def delta(self, stamp: tuple, puts: Iterable[TaskDto], removed: Iterable[str]) -> tuple | None:
+        # What a save adds to an existing sidecar, taken before the save clears the profile's changes
+        if not os.path.exists(self.path):
+            return None
+        return stamp, list(puts), set(removed)
+
+    def append(self, delta: tuple, stamp: tuple):
+        previous, puts, removed = delta
+        SearchIndex.append_delta(self.path, previous, stamp, puts, removed)
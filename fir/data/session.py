@@ -0,0 +1,75 @@
+import os
+
+from fir.data.profile import Profile
+from fir.data.settings import Settings
+
+# Settings & profiles kept in memory across several commands (daemon, shell, batch). Each access compares the
+# size & mtime of the backing files against what was loaded, so edits made by other processes are picked up
+# before the next command runs instead of being merged in when it saves.
+
+
+class Session:
+    write_behind: bool
+
+    def __init__(self, write_behind: bool = False):
+        # With write_behind, profile saves are held in memory until flush()
+        self.write_behind = write_behind
+        self.__settings: Settings | None = None
+        self.__settings_stamp = None
+        self.__profiles: dict[str, Profile] = {}
+
+    def settings(self) -> Settings:
+        stamp = self.__stamp([Settings.path])
+        if self.__settings is None or stamp != self.__settings_stamp:
+            self.__settings = Settings()
+            self.__settings_stamp = self.__stamp([Settings.path])
+        return self.__settings
+
+    def profile(self, path: str | None) -> Profile:
+        if path is None:
+            # Unknown scope, falls back to the default profile (created if missing) as a plain invocation does
+            path = Profile(read=False).path
+        key = os.path.abspath(path)
+        cached = self.__profiles.get(key)
+        # Unflushed changes are kept over a reload, they're merged with the other writes when saved
+        if cached is not None and (cached.pending or not cached.changed()):
+            return cached
+
+        profile = Profile(key, read=False)
+        profile.write_behind = self.write_behind
+        profile.hold_lock = False
+        self.__profiles[key] = profile
+        return profile
+
+    def profiles(self) -> list[Profile]:
+        return list(self.__profiles.values())
+
+    def pending(self) -> list[Profile]:
+        return [p for p in self.profiles() if p.pending]
+
+    def flush(self):
+        for profile in self.pending():
+            profile.flush()
+        self.saved()
+
+    def saved(self):
+        # Called once a command has written its changes, so the session's own settings writes don't look external.
+        # Profiles keep track of their own writes (see Profile.changed).
+        if self.__settings is not None:
+            self.__settings_stamp = self.__stamp([Settings.path])
+
+    def discard(self):
+        # Drops everything held in memory, e.g. after a command failed part way through changing a profile
+        self.__settings = None
+        self.__settings_stamp = None
+        self.__profiles.clear()
+
+    def __stamp(self, paths: list[str]) -> tuple:
+        stamp = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_size, st.st_mtime_ns, st.st_ino))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
@@ -2,6 +2,7 @@ import os
 
 from fir.config import DATA_DIR
 from fir.data.defaults import default_settings
+from fir.types import codec
 from fir.types.dtos import SettingsDto
 from fir.utils.files import read_toml_file, write_toml_file
 
@@ -34,11 +35,11 @@ class Settings:
             self.save()
 
         d = read_toml_file(self.path)
-        self.data = SettingsDto.Schema().load(d)
+        self.data = codec.load_settings(d)
 
     def __save(self):
         self.__check_dir()
-        s = SettingsDto.Schema().dump(self.data)
+        s = codec.dump_settings(self.data)
         write_toml_file(self.path, s)
 
     def __check_dir(self):
@@ -0,0 +1,89 @@
+import heapq
+from typing import Callable, Iterable
+
+from fir.types.dtos import StatusDto, TaskDto
+
+# Sort specs are comma separated fields, '-' in front sorts that field descending: 'status,priority,due,-modified'.
+# Keys are built once per task, tasks with equal keys keep the profile's order like 'fir ls' always has. A cursor
+# is a task's key & position, so continuing after it gives the same order as one longer page.
+
+SORT_FIELDS = ("status", "priority", "due", "added", "modified", "name", "id")
+DEFAULT_SORT = "status"
+UNKNOWN_STATUS_ORDER = 1000
+
+
+class Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "Descending") -> bool:
+        return other.value < self.value
+
+    def __gt__(self, other: "Descending") -> bool:
+        return other.value > self.value
+
+    def __eq__(self, other: "Descending") -> bool:
+        return self.value == other.value
+
+
+def sort_key(spec: str, statuses: Iterable[StatusDto]) -> Callable[[TaskDto], tuple]:
+    orders = {s.name: s.order for s in statuses}
+    getters = []
+    for field in spec.split(","):
+        field = field.strip()
+        descending = field.startswith("-")
+        name = field.lstrip("-")
+        if name not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field '{name}', expected one of: {', '.join(SORT_FIELDS)}")
+        getters.append(_getter(name, descending, orders))
+
+    return lambda t: tuple(get(t) for get in getters)
+
+
+def page(tasks: Iterable[TaskDto], key: Callable[[TaskDto], tuple], limit: int = None, offset: int = 0,
+         after: str = None) -> tuple[list[TaskDto], int]:
+    """Orders tasks by key, returning the requested page & how many tasks there are after the task with id after"""
+    keyed = [(key(t), i, t) for i, t in enumerate(tasks)]
+    if after is not None:
+        cursor = next((k[:2] for k in keyed if k[2].id == after), None)
+        if cursor is None:
+            raise ValueError(f"Task {after} isn't in the listed tasks")
+        keyed = [k for k in keyed if k[:2] > cursor]
+
+    # Only the first offset + limit are ordered, O(n log k) instead of sorting everything
+    if limit is None:
+        rows = sorted(keyed, key=_rank)[offset:]
+    else:
+        rows = heapq.nsmallest(offset + limit, keyed, key=_rank)[offset:]
+    return [t for _, _, t in rows], len(keyed)
+
+
+def _rank(item: tuple) -> tuple:
+    # Key then position, tasks themselves are never compared
+    return item[:2]
+
+
+def _getter(name: str, descending: bool, orders: dict[str, int]) -> Callable[[TaskDto], object]:
+    sign = -1 if descending else 1
+    if name == "status":
+        return lambda t: sign * orders.get(t.status, UNKNOWN_STATUS_ORDER)
+    if name == "priority":
+        return lambda t: sign * (t.priority or 0)
+    if name in ("due", "added", "modified"):
+        # Tasks without the date go last either way
+        return lambda t: _date(getattr(t, name), sign)
+    if descending:
+        return lambda t: Descending(getattr(t, name) or "")
+    return lambda t: getattr(t, name) or ""
+
+
+def _date(value: str, sign: int) -> tuple[bool, int]:
+    # 'YYYY-MM-DD' or 'YYYY-MM-DD hh:mm:ss' as YYYYMMDDhhmmss, so it can be negated for descending
+    if not value:
+        return True, 0
+    try:
+        return False, sign * int(value.replace("-", "").replace(" ", "").replace(":", "").ljust(14, "0"))
+    except ValueError:
+        return True, 0
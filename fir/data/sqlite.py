@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from fir.data.journal import ProfileChanges
+from fir.types.dtos import ProfileDto, StatusDto, TaskDto
+
+SCHEMA_VERSION = "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS config (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS statuses (
+    name TEXT NOT NULL,
+    color TEXT NOT NULL,
+    "order" INTEGER NOT NULL,
+    hide_by_default INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    due TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    added TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    link TEXT NOT NULL,
+    description TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    assigned_to TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+"""
+
+TASK_COLUMNS = "id, name, status, due, tags, added, modified, link, description, priority, assigned_to"
+UPSERT_TASK = f"""
+INSERT INTO tasks ({TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name, status = excluded.status, due = excluded.due, tags = excluded.tags,
+    added = excluded.added, modified = excluded.modified, link = excluded.link,
+    description = excluded.description, priority = excluded.priority, assigned_to = excluded.assigned_to
+"""
+
+
+class SqliteStore:
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def read(self) -> ProfileDto:
+        try:
+            with closing(self.__connect()) as db:
+                meta = dict(db.execute("SELECT key, value FROM profile"))
+                config = dict(db.execute("SELECT key, value FROM config"))
+                statuses = [StatusDto(n, c, o, bool(h)) for n, c, o, h in
+                            db.execute('SELECT name, color, "order", hide_by_default FROM statuses ORDER BY rowid')]
+                tasks = [self.__task_from_row(r) for r in
+                         db.execute(f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY rowid")]
+        except sqlite3.Error as e:
+            print(e)
+            print(f'ERROR!\nCould not read from profile database "{self.path}"!')
+            raise SystemExit(1)
+
+        return ProfileDto(meta.get("name", ""), meta.get("description", ""), config, tasks=tasks, statuses=statuses)
+
+    def write(self, data: ProfileDto):
+        def replace_all(db: sqlite3.Connection):
+            db.execute("DELETE FROM tasks")
+            db.executemany(UPSERT_TASK, (self.__task_to_row(t) for t in data.tasks))
+            self.__write_meta(db, data)
+            self.__write_config(db, data)
+            self.__write_statuses(db, data)
+
+        self.__transaction(replace_all)
+
+    def commit(self, data: ProfileDto, changes: ProfileChanges):
+        def apply(db: sqlite3.Connection):
+            if changes.removed:
+                db.executemany("DELETE FROM tasks WHERE id = ?", ((id,) for id in changes.removed))
+            if changes.tasks:
+                db.executemany(UPSERT_TASK, (self.__task_to_row(t) for t in changes.tasks.values()))
+            if changes.config:
+                self.__write_config(db, data)
+            if changes.statuses:
+                self.__write_statuses(db, data)
+
+        self.__transaction(apply)
+
+    def vacuum(self):
+        with closing(self.__connect()) as db:
+            db.execute("VACUUM")
+
+    def __transaction(self, fn):
+        try:
+            with closing(self.__connect()) as db:
+                with db:
+                    fn(db)
+        except sqlite3.Error as e:
+            print(e)
+            print(f'ERROR!\nCould not write to profile database "{self.path}"!')
+            raise SystemExit(1)
+
+    def __connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = FULL")
+        db.executescript(SCHEMA)
+        return db
+
+    def __write_meta(self, db: sqlite3.Connection, data: ProfileDto):
+        db.executemany("INSERT OR REPLACE INTO profile (key, value) VALUES (?, ?)", [
+            ("schema_version", SCHEMA_VERSION),
+            ("name", data.name),
+            ("description", data.description)])
+
+    def __write_config(self, db: sqlite3.Connection, data: ProfileDto):
+        db.execute("DELETE FROM config")
+        db.executemany("INSERT INTO config (key, value) VALUES (?, ?)", data.config.items())
+
+    def __write_statuses(self, db: sqlite3.Connection, data: ProfileDto):
+        db.execute("DELETE FROM statuses")
+        db.executemany('INSERT INTO statuses (name, color, "order", hide_by_default) VALUES (?, ?, ?, ?)',
+                       ((s.name, s.color, s.order, int(s.hide_by_default)) for s in data.statuses))
+
+    def __task_to_row(self, t: TaskDto) -> tuple:
+        return (t.id, t.name, t.status, t.due, json.dumps(t.tags), t.added, t.modified, t.link, t.description,
+                t.priority, json.dumps(t.assigned_to))
+
+    def __task_from_row(self, r: tuple) -> TaskDto:
+        return TaskDto(r[0], r[1], r[2], r[3], json.loads(r[4]), r[5], r[6], r[7], r[8], r[9], json.loads(r[10]))
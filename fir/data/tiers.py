@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import Callable
+
+from fir.data.archive import Archive
+from fir.data.columnar import TaskStoreIdIndex
+from fir.data.index import TaskIdIndex
+from fir.types.dtos import TaskDto
+from fir.utils import timings
+from fir.utils.dates import datetime_to_date_string
+
+# A profile's tasks live in two tiers, the profile itself & its Archive (see fir.data.archive). Moves between them
+# are queued & written by the next save: archived tasks before they leave the profile & restored ones only removed
+# from the archive once back in it, a crash in between leaves a task in both tiers rather than in neither.
+
+
+class ProfileTiers:
+    archive: Archive
+
+    def __init__(self, profile_path: str):
+        self.archive = Archive(profile_path)
+        self.archiving: list[TaskDto] = []
+        self.restoring: set[str] = set()
+
+    def archivable(self, tasks: list[TaskDto], hidden: set[str], days: int) -> list[TaskDto]:
+        # Tasks in hidden statuses not modified for the given number of days
+        cutoff = datetime_to_date_string(datetime.now() - timedelta(days=days))
+        return [t for t in tasks if t.status in hidden and t.modified and t.modified < cutoff]
+
+    def tier_due(self, days: int) -> bool:
+        # Automatic tiering runs at most once per TIER_INTERVAL
+        return days > 0 and self.archive.tier_due()
+
+    def write_archived(self):
+        if self.archiving:
+            with timings.span("archive.write"):
+                self.archive.append(self.archiving)
+            self.archiving = []
+
+    def write_restored(self):
+        if self.restoring:
+            with timings.span("archive.write"):
+                self.archive.remove(self.restoring)
+            self.restoring = set()
+
+    def queued(self) -> tuple[int, set[str]]:
+        # What reset() goes back to, see Profile.checkpoint
+        return len(self.archiving), set(self.restoring)
+
+    def reset(self, archiving: int, restoring: set[str]):
+        del self.archiving[archiving:]
+        self.restoring = restoring
+
+    def archived(self, id_index: TaskIdIndex | TaskStoreIdIndex,
+                 match: Callable[[TaskDto], bool] | None) -> list[TaskDto]:
+        # Archived tasks that aren't back in the profile yet
+        if not self.archive.ids():
+            return []
+        with timings.span("archive.read"):
+            return [t for id, t in self.archive.tasks().items()
+                    if id not in id_index and (match is None or match(t))]
+
+    def get_task(self, id: str, id_index: TaskIdIndex | TaskStoreIdIndex,
+                 include_archived: bool) -> (TaskDto | None, str):
+        if not self.archive.ids():
+            return id_index.resolve(id)
+
+        # Prefixes resolve across both tiers, the profile's copy wins for an id found in both
+        task = id_index.get(id)
+        if task is not None:
+            return task, None
+        if id in self.archive:
+            found = [id]
+        else:
+            found = [t.id for t in id_index.find(id, limit=2)]
+            found += [a for a in self.archive.find(id, limit=2) if a not in found]
+            if len(found) > 1:
+                return None, "Conflicting tasks found, use full id value"
+            if len(found) == 0:
+                return None, "Task not found"
+            task = id_index.get(found[0])
+            if task is not None:
+                return task, None
+
+        if not include_archived:
+            return None, f"Task {found[0]} is archived, restore it with 'fir archive restore {found[0]}'"
+        with timings.span("archive.read"):
+            task = self.archive.get(found[0])
+        if task is None:
+            return None, "Task not found"
+        return task, None
+
+    def unique_prefix_length(self, id: str, id_index: TaskIdIndex | TaskStoreIdIndex) -> int:
+        # Shortest prefix of the id that's unique across both tiers
+        length = id_index.unique_prefix_length(id)
+        if self.archive.ids():
+            length = max(length, min(self.archive.shared_prefix_length(id) + 1, len(id)))
+        return length
@@ -0,0 +1,528 @@
+import asyncio
+import itertools
+import json
+import re
+import secrets
+import signal
+import traceback
+import weakref
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from fir.data import sorting
+from fir.data.profile import Profile
+from fir.data.query import QueryError
+from fir.data.session import Session
+from fir.types import codec
+from fir.types.dtos import StatusDto, TaskDto
+from fir.utils import generate_task_id, str2bool
+from fir.utils.dates import datetime_to_date_string
+from fir.utils.parse import parse_date_from_arg
+
+# HTTP JSON API over the profiles (fir serve), on asyncio & the standard library only. Profiles stay loaded in a
+# write-behind Session, writes to a profile run one at a time & a write is only answered once it's saved. Writes
+# made while a save is running share the next save, so concurrent clients don't each cost a full write. Reads wait
+# for a running save, which can replace the profile's data while it merges.
+#
+#   GET    /tasks?status=&tag=&assigned=&name=&all=&where=&sort=&limit=&offset=&after=
+#   POST   /tasks                    {"name": "...", "status": "todo", "tags": [...], ...}
+#   GET    /tasks/<id>               (id prefixes are accepted as on the command line)
+#   PATCH  /tasks/<id>               {"status": "done"}
+#   DELETE /tasks/<id>
+#   GET    /statuses, POST /statuses, PATCH /statuses/<name>, DELETE /statuses/<name>
+#   GET    /profiles
+#
+# Every endpoint takes ?profile=<name>, otherwise the profile in scope is used. Responses carry an ETag of the
+# profile's version, GETs answer If-None-Match with 304 & writes refuse a stale If-Match with 412.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY = 1 << 20
+MAX_HEADERS = 100
+REQUEST_TIMEOUT = 30
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+TASK_FIELDS = ("name", "status", "due", "tags", "link", "description", "priority", "assigned_to")
+STATUS_FIELDS = ("name", "color", "order", "hide_by_default")
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 411: "Length Required", 412: "Precondition Failed",
+           413: "Content Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    status: int
+    message: str
+    details: dict | None
+
+    def __init__(self, status: int, message: str, details: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> dict:
+        try:
+            value = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HttpError(400, f"Invalid JSON: {e}")
+        if not isinstance(value, dict):
+            raise HttpError(400, "Expected a JSON object")
+        return value
+
+
+@dataclass
+class Response:
+    status: int
+    body: dict | list | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ProfileWriter:
+    # Serialises the writes to one profile & groups their saves, reads hold the same lock so they never see a save
+    # half done
+
+    def __init__(self, session: Session, path: str | None, delay: float):
+        self.session = session
+        self.path = path
+        self.delay = delay
+        self.lock = asyncio.Lock()
+        self.__commit: asyncio.Future | None = None
+
+    async def read(self, read: Callable[[Profile], Response]) -> Response:
+        async with self.lock:
+            return read(self.__profile())
+
+    async def write(self, change: Callable[[Profile], Response]) -> Response:
+        async with self.lock:
+            profile = self.__profile()
+            # Validated before anything is changed, an HttpError leaves the profile as it was
+            response = change(profile)
+            profile.save()
+            commit = self.__next_commit()
+        await commit
+        return response
+
+    async def drain(self):
+        # Waits for the save of writes already made, e.g. on the way out
+        if self.__commit is not None:
+            try:
+                await self.__commit
+            except HttpError:
+                pass
+
+    def __profile(self) -> Profile:
+        profile = self.session.profile(self.path)
+        if not profile.has_read:
+            profile.read()
+        return profile
+
+    def __next_commit(self) -> asyncio.Future:
+        if self.__commit is None:
+            self.__commit = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().create_task(self.__flush(self.__commit))
+        return self.__commit
+
+    async def __flush(self, commit: asyncio.Future):
+        await asyncio.sleep(self.delay)
+        async with self.lock:
+            # Writes after this point wait for the lock & then start the next commit
+            self.__commit = None
+            profile = self.session.profile(self.path)
+            try:
+                await asyncio.to_thread(profile.flush)
+            except (Exception, SystemExit) as e:
+                # The profile stays pending, the next write retries the save
+                return commit.set_exception(HttpError(500, f"Changes could not be saved: {e}"))
+            commit.set_result(None)
+
+
+class Server:
+    session: Session
+    host: str
+    port: int
+    delay: float
+    scope: str | None
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, delay: float = 0.0, scope: str = None):
+        self.session = Session(write_behind=True)
+        self.host = host
+        self.port = port
+        self.delay = delay
+        # Profile for requests without ?profile=, otherwise the one in scope when the request arrives
+        self.scope = scope
+        # Part of every ETag, so tags handed out by an earlier run or an earlier load of a profile never match
+        self.__token = secrets.token_hex(4)
+        self.__loads = weakref.WeakKeyDictionary()
+        self.__load_numbers = itertools.count(1)
+        self.__writers: dict[str | None, ProfileWriter] = {}
+        self.__routes: list[tuple[re.Pattern, dict[str, Callable]]] = [
+            (re.compile(r"/tasks/?"), {"GET": self.list_tasks, "POST": self.create_task}),
+            (re.compile(r"/tasks/([^/]+)"), {"GET": self.get_task, "PATCH": self.update_task,
+                                             "DELETE": self.remove_task}),
+            (re.compile(r"/statuses/?"), {"GET": self.list_statuses, "POST": self.create_status}),
+            (re.compile(r"/statuses/([^/]+)"), {"GET": self.get_status, "PATCH": self.update_status,
+                                                "DELETE": self.remove_status}),
+            (re.compile(r"/profiles/?"), {"GET": self.list_profiles}),
+        ]
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for s in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(s, stop.set)
+        print(f"Serving on http://{self.host}:{self.port}/ (Ctrl+C to stop)", flush=True)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            for s in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(s)
+            for writer in self.__writers.values():
+                await writer.drain()
+            # Anything a failed save left pending
+            self.session.flush()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.__read_request(reader), REQUEST_TIMEOUT)
+                except HttpError as e:
+                    self.__send(writer, Response(e.status, {"error": e.message}), False)
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                self.__send(writer, response, request.keep_alive)
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request) -> Response:
+        try:
+            for pattern, methods in self.__routes:
+                match = pattern.fullmatch(request.path)
+                if match is None:
+                    continue
+                handler = methods.get(request.method)
+                if handler is None:
+                    return Response(405, {"error": f"{request.method} is not supported on {request.path}"},
+                                    {"Allow": ", ".join(methods)})
+                return await handler(request, *[unquote(g) for g in match.groups()])
+            raise HttpError(404, f"No such endpoint: {request.path}")
+        except HttpError as e:
+            body = {"error": e.message}
+            if e.details:
+                body["details"] = e.details
+            return Response(e.status, body)
+        except Exception:
+            traceback.print_exc()
+            return Response(500, {"error": "Internal error, see the fir serve output"})
+
+    async def list_tasks(self, request: Request) -> Response:
+        limit = self.__int_query(request, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+        offset = self.__int_query(request, "offset", 0, 0, None)
+        q = request.query
+
+        def read(profile: Profile) -> Response:
+            try:
+                tasks = profile.find_tasks(status=q.get("status"), name=q.get("name"), assignee=q.get("assigned"),
+                                           tag=q.get("tag"), include_hidden=str2bool(q.get("all", "")),
+                                           where=q.get("where"))
+            except QueryError as e:
+                raise HttpError(400, f"Invalid where: {e}")
+            # Same order & cursor as 'fir ls'
+            try:
+                key = sorting.sort_key(q.get("sort") or sorting.DEFAULT_SORT, profile.data.statuses)
+                after = self.__task(profile, q["after"]).id if q.get("after") else None
+                page, total = sorting.page(tasks, key, limit, offset, after)
+            except ValueError as e:
+                raise HttpError(400, str(e))
+
+            more = total - offset - len(page) > 0
+            return self.__ok(profile, {"tasks": [codec.dump_task(t) for t in page], "total": total,
+                                       "offset": offset, "limit": limit,
+                                       "next_offset": offset + limit if more else None,
+                                       "next_after": page[-1].id if more else None})
+
+        return await self.__read(request, read)
+
+    async def get_task(self, request: Request, id: str) -> Response:
+        return await self.__read(request, lambda profile: self.__ok(profile, codec.dump_task(self.__task(profile, id))))
+
+    async def create_task(self, request: Request) -> Response:
+        body = request.json()
+
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            task = self.__load_task(profile, body, None)
+            profile.add_task(task)
+            return Response(201, codec.dump_task(task), {"Location": f"/tasks/{task.id}"})
+
+        return await self.__write(request, change)
+
+    async def update_task(self, request: Request, id: str) -> Response:
+        body = request.json()
+
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            task = self.__task(profile, id)
+            updated = self.__load_task(profile, body, task)
+            for f in fields(TaskDto):
+                setattr(task, f.name, getattr(updated, f.name))
+            profile.update_task(task)
+            return Response(200, codec.dump_task(task))
+
+        return await self.__write(request, change)
+
+    async def remove_task(self, request: Request, id: str) -> Response:
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            profile.remove_task(self.__task(profile, id))
+            return Response(204)
+
+        return await self.__write(request, change)
+
+    async def list_statuses(self, request: Request) -> Response:
+        return await self.__read(request, lambda profile: self.__ok(
+            profile, {"statuses": [codec.dump_status(s) for s in profile.data.statuses]}))
+
+    async def get_status(self, request: Request, name: str) -> Response:
+        return await self.__read(request, lambda profile: self.__ok(
+            profile, codec.dump_status(self.__status(profile, name))))
+
+    async def create_status(self, request: Request) -> Response:
+        body = request.json()
+
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            # Same defaults as 'fir status new'
+            status = self.__load_status({"color": "light_blue", "order": 600, "hide_by_default": True, **body})
+            if profile.get_status_by_name(status.name) is not None:
+                raise HttpError(409, f"Status \"{status.name}\" already exists")
+            profile.add_status(status)
+            return Response(201, codec.dump_status(status), {"Location": f"/statuses/{status.name}"})
+
+        return await self.__write(request, change)
+
+    async def update_status(self, request: Request, name: str) -> Response:
+        body = request.json()
+
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            status = self.__status(profile, name)
+            if body.get("name", status.name) != status.name:
+                raise HttpError(400, "Statuses can't be renamed")
+            updated = self.__load_status({**codec.dump_status(status), **body})
+            for f in fields(StatusDto):
+                setattr(status, f.name, getattr(updated, f.name))
+            profile.update_status(status)
+            return Response(200, codec.dump_status(status))
+
+        return await self.__write(request, change)
+
+    async def remove_status(self, request: Request, name: str) -> Response:
+        def change(profile: Profile) -> Response:
+            self.__check_if_match(request, profile)
+            profile.remove_status(self.__status(profile, name))
+            return Response(204)
+
+        return await self.__write(request, change)
+
+    async def list_profiles(self, request: Request) -> Response:
+        settings = self.session.settings()
+        return Response(200, {"scope": settings.data.scope, "profiles": settings.data.profiles})
+
+    async def __read(self, request: Request, read: Callable[[Profile], Response]) -> Response:
+        def read_or_not_modified(profile: Profile) -> Response:
+            not_modified = self.__not_modified(request, profile)
+            return read(profile) if not_modified is None else not_modified
+
+        return await self.__writer(request).read(read_or_not_modified)
+
+    async def __write(self, request: Request, change: Callable[[Profile], Response]) -> Response:
+        writer = self.__writer(request)
+        response = await writer.write(change)
+        response.headers["ETag"] = self.__etag(self.session.profile(writer.path))
+        return response
+
+    def __writer(self, request: Request) -> ProfileWriter:
+        path = self.__profile_path(request)
+        writer = self.__writers.get(path)
+        if writer is None:
+            writer = self.__writers[path] = ProfileWriter(self.session, path, self.delay)
+        return writer
+
+    def __profile_path(self, request: Request) -> str | None:
+        settings = self.session.settings()
+        name = request.query.get("profile", self.scope)
+        if name is None:
+            return settings.get_scoped_profile()[1]
+        if name not in settings.data.profiles:
+            raise HttpError(404, f"No such profile: {name}")
+        return settings.get_profile(name)[1]
+
+    def __task(self, profile: Profile, id: str) -> TaskDto:
+        task, err = profile.get_task(id)
+        if task is None:
+            raise HttpError(404, err)
+        return task
+
+    def __status(self, profile: Profile, name: str) -> StatusDto:
+        status = profile.get_status_by_name(name)
+        if status is None:
+            raise HttpError(404, f"No such status: {name}")
+        return status
+
+    def __load_task(self, profile: Profile, body: dict, task: TaskDto | None) -> TaskDto:
+        unknown = [k for k in body if k not in TASK_FIELDS]
+        if unknown:
+            raise HttpError(400, f"Unknown fields: {', '.join(unknown)}")
+
+        now = datetime_to_date_string(datetime.now())
+        if task is None:
+            d = {"id": generate_task_id(not_in=profile.id_index), "added": now,
+                 "status": profile.data.config.get("status.default", "")}
+        else:
+            d = codec.dump_task(task)
+        d.update(body)
+        d["modified"] = now
+        try:
+            loaded = codec.load_task(d)
+        except codec.CodecError as e:
+            raise HttpError(400, "Invalid task", e.messages)
+
+        if loaded.status not in profile.get_status_names():
+            raise HttpError(400, "Invalid status provided")
+        if "due" in body:
+            success, loaded.due = parse_date_from_arg(loaded.due)
+            if not success:
+                raise HttpError(400, "Unable to parse date from due date")
+        return loaded
+
+    def __load_status(self, d: dict) -> StatusDto:
+        unknown = [k for k in d if k not in STATUS_FIELDS]
+        if unknown:
+            raise HttpError(400, f"Unknown fields: {', '.join(unknown)}")
+        try:
+            return codec.load_status(d)
+        except codec.CodecError as e:
+            raise HttpError(400, "Invalid status", e.messages)
+
+    def __etag(self, profile: Profile) -> str:
+        load = self.__loads.get(profile)
+        if load is None:
+            load = self.__loads[profile] = next(self.__load_numbers)
+        return f'"{self.__token}-{load}-{profile.version}"'
+
+    def __ok(self, profile: Profile, body: dict) -> Response:
+        return Response(200, body, {"ETag": self.__etag(profile)})
+
+    def __not_modified(self, request: Request, profile: Profile) -> Response | None:
+        tags = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+        etag = self.__etag(profile)
+        if etag in tags or "*" in tags:
+            return Response(304, None, {"ETag": etag})
+        return None
+
+    def __check_if_match(self, request: Request, profile: Profile):
+        if_match = request.headers.get("if-match")
+        if if_match is None:
+            return
+        tags = [t.strip() for t in if_match.split(",")]
+        if "*" not in tags and self.__etag(profile) not in tags:
+            raise HttpError(412, "The profile has changed since it was read")
+
+    def __int_query(self, request: Request, name: str, default: int, min: int, max: int | None) -> int:
+        value = request.query.get(name)
+        if value is None:
+            return default
+        try:
+            n = int(value)
+        except ValueError:
+            raise HttpError(400, f"Invalid value for {name}: {value}")
+        if n < min or (max is not None and n > max):
+            raise HttpError(400, f"{name} must be between {min} and {max}" if max else f"{name} must be at least {min}")
+        return n
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise HttpError(400, "Malformed request line")
+
+        headers = await self.__read_headers(reader)
+        if parts[2] == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+            headers["connection"] = "close"
+        body = await self.__read_body(reader, headers)
+
+        url = urlsplit(parts[1])
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return Request(parts[0].upper(), url.path, query, headers, body)
+
+    async def __read_headers(self, reader: asyncio.StreamReader) -> dict[str, str]:
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n"):
+                return headers
+            if not header or len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "Malformed headers")
+            name, sep, value = header.decode("latin-1").partition(":")
+            if not sep:
+                raise HttpError(400, "Malformed headers")
+            headers[name.strip().lower()] = value.strip()
+
+    async def __read_body(self, reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+        if "transfer-encoding" in headers:
+            raise HttpError(411, "Chunked request bodies aren't supported, send a Content-Length")
+        if "content-length" not in headers:
+            return b""
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY:
+            raise HttpError(413, f"Request bodies are limited to {MAX_BODY} bytes")
+        return await reader.readexactly(length)
+
+    def __send(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+        body = b""
+        headers = dict(response.headers)
+        if response.body is not None and response.status not in (204, 304):
+            body = json.dumps(response.body, separators=(",", ":")).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+        if response.status != 304:
+            headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+        head = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, '')}"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
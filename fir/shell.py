@@ -0,0 +1,274 @@
+import os
+import shlex
+import signal
+import threading
+import traceback
+from typing import Iterable
+
+from fir.batch import split_scope, task_ids
+from fir.cmd import cmd, load_handlers
+from fir.cmd.builder import Cmd, CmdBuilder
+from fir.cmd.builder.arg_parser import ArgParserSetup
+from fir.config import DATA_DIR
+from fir.context import Context
+from fir.data.profile import Profile, ProfileCheckpoint
+from fir.data.session import Session
+from fir.types.config_options import ConfigOptionsMap
+
+# Interactive prompt running the usual fir commands against a Session that stays loaded between them. Profiles
+# are write-behind: a command's save() only marks the profile as pending & it's written every few seconds, on
+# 'save' & on the way out, so a run of edits costs a few writes instead of one each.
+
+HISTORY_PATH = os.path.join(DATA_DIR, "shell_history")
+HISTORY_LENGTH = 1000
+BUILTINS = {"save": "Write pending changes now", "exit": "Save & leave the shell", "quit": "Save & leave the shell",
+            "help": "List commands, or 'help <command>'"}
+COMPLETION_LIMIT = 50
+
+
+class Shell:
+    session: Session
+    interval: float
+
+    def __init__(self, interval: float = 5.0):
+        self.session = Session(write_behind=True)
+        self.interval = interval
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__busy = False
+        self.__exiting = False
+        self.__matches: list[str] = []
+        # Every handler, only used to look up command names & arguments for completion
+        self.__handlers: list[CmdBuilder] = load_handlers(Context())
+        self.__setup = ArgParserSetup(*self.__handlers)
+
+    def run(self):
+        readline = self.__setup_readline()
+        flusher = threading.Thread(target=self.__flush_periodically, name="fir-shell-flush", daemon=True)
+        flusher.start()
+        previous = {s: signal.signal(s, self.__signal) for s in (signal.SIGTERM, signal.SIGHUP)}
+        try:
+            while not self.__exiting:
+                try:
+                    line = input(self.__prompt())
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                self.execute(line)
+        except SystemExit:
+            pass
+        finally:
+            self.__stop.set()
+            flusher.join()
+            for s, handler in previous.items():
+                signal.signal(s, handler)
+            self.save()
+            if readline is not None:
+                try:
+                    readline.write_history_file(HISTORY_PATH)
+                except OSError:
+                    pass
+
+    def execute(self, line: str):
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            return print(f"Could not parse command: {e}")
+        if not argv or self.__builtin(argv):
+            return
+
+        with self.__lock:
+            self.__busy = True
+            try:
+                self.__run(argv)
+            finally:
+                self.__busy = False
+        if self.__exiting:
+            raise SystemExit(0)
+
+    def __builtin(self, argv: list[str]) -> bool:
+        # The shell's own commands, True when the line was one of them
+        if argv[0] in ("exit", "quit"):
+            self.__exiting = True
+        elif argv[0] == "save":
+            self.save(verbose=True)
+        elif argv[0] == "help":
+            self.__help(argv[1:])
+        elif argv[0] == "shell":
+            print("Already in a fir shell")
+        else:
+            if argv[0] in ("batch", "serve"):
+                # These load & save profiles themselves, they have to start from what this shell has changed
+                self.save()
+            return False
+        return True
+
+    def __run(self, argv: list[str]):
+        # A failed command is undone like a failed batch line, or its half made changes would go out with the next save
+        profile, cp = self.__checkpoint(argv)
+        ok = False
+        try:
+            cmd(argv, self.session)
+            ok = True
+        except SystemExit as e:
+            # Argument errors & log_error exit as they would on the command line, the shell carries on
+            ok = e.code in (0, None)
+        except KeyboardInterrupt:
+            print()
+        except Exception:
+            traceback.print_exc()
+
+        if cp is None:
+            return
+        if ok:
+            profile.release(cp)
+        else:
+            profile.rollback(cp)
+
+    def __checkpoint(self, argv: list[str]) -> (Profile | None, ProfileCheckpoint | None):
+        scope, words = split_scope(argv)
+        _, command, rest = self.__setup.find_command(words)
+        if command is None:
+            return None, None
+        settings = self.session.settings()
+        profile = self.session.profile(settings.get_profile(scope or settings.data.scope)[1])
+        if not profile.has_read:
+            profile.read()
+        return profile, profile.checkpoint(task_ids(profile, command, rest))
+
+    def save(self, verbose: bool = False):
+        with self.__lock:
+            pending = self.session.pending()
+            try:
+                self.session.flush()
+            except SystemExit:
+                return print("Changes could not be saved, they're kept until the next attempt")
+        if verbose:
+            print(f"Saved {', '.join(p.path for p in pending)}" if pending else "Nothing to save")
+
+    def __flush_periodically(self):
+        while not self.__stop.wait(self.interval):
+            self.save()
+
+    def __signal(self, signum, frame):
+        # Pending changes are saved on the way out, a command that's running is left to finish first
+        self.__exiting = True
+        if not self.__busy:
+            raise SystemExit(0)
+
+    def __prompt(self) -> str:
+        pending = "*" if self.session.pending() else ""
+        return f"fir ({self.session.settings().data.scope}{pending})> "
+
+    def __help(self, argv: list[str]):
+        if argv:
+            return self.execute(shlex.join(argv + ["--help"]))
+        for name, description in BUILTINS.items():
+            print(f"  {name:<16}{description}")
+        for h in self.__handlers:
+            if h.name is None:
+                for c in h.cmds.values():
+                    print(f"  {c.name:<16}{c.description or ''}")
+            else:
+                print(f"  {h.name:<16}See: 'help {h.name}'")
+
+    def __setup_readline(self):
+        try:
+            import readline
+        except ImportError:
+            return None
+
+        readline.set_history_length(HISTORY_LENGTH)
+        if os.path.exists(HISTORY_PATH):
+            try:
+                readline.read_history_file(HISTORY_PATH)
+            except OSError:
+                pass
+        readline.set_completer_delims(" \t\n")
+        readline.set_completer(self.__complete)
+        # libedit (macOS) takes a different binding syntax
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
+        return readline
+
+    def __complete(self, text: str, state: int) -> str | None:
+        if state == 0:
+            import readline
+            before = readline.get_line_buffer()[:readline.get_begidx()]
+            try:
+                with self.__lock:
+                    self.__matches = sorted(set(m for m in self.complete(before, text) if m.startswith(text)))
+            except Exception:
+                self.__matches = []
+        return self.__matches[state] if state < len(self.__matches) else None
+
+    def complete(self, before: str, text: str) -> Iterable[str]:
+        words = before.split()
+        if words and words[0] == "--scope":
+            words = words[2:]
+        if not words:
+            return list(BUILTINS) + self.__command_names()
+
+        handler, command, rest = self.__setup.find_command(words)
+        if command is None:
+            if handler is not None and handler.name is not None and len(words) == 1:
+                return [n for c in handler.cmds.values() for n in [c.name] + c.aliases]
+            return []
+
+        if text.startswith("-"):
+            return [a for arg in command.optionals + command.flags for a in arg.aliases]
+        return self.__complete_value(command, rest, text)
+
+    def __complete_value(self, command: Cmd, rest: list[str], text: str) -> list[str]:
+        # The value for an option, e.g. 'ls --status <tab>'
+        if rest and rest[-1].startswith("-"):
+            for arg in command.optionals:
+                if rest[-1] in arg.aliases:
+                    return self.__values(arg.name, text)
+            rest = rest[:-1]
+
+        positionals = [w for i, w in enumerate(rest) if not w.startswith("-")
+                       and not (i > 0 and self.__takes_value(command, rest[i - 1]))]
+        if not command.args:
+            return []
+        arg = command.args[min(len(positionals), len(command.args) - 1)]
+        if len(positionals) >= len(command.args) and arg.nargs not in ("+", "*"):
+            return []
+        return self.__values(arg.name, text)
+
+    def __command_names(self) -> list[str]:
+        names = []
+        for h in self.__handlers:
+            if h.name is None:
+                names += [n for c in h.cmds.values() for n in [c.name] + c.aliases]
+            else:
+                names += [h.name] + h.aliases
+        return names
+
+    def __takes_value(self, command: Cmd, word: str) -> bool:
+        return any(word in arg.aliases for arg in command.optionals)
+
+    def __values(self, name: str, text: str) -> list[str]:
+        settings = self.session.settings()
+        if name == "profile_name":
+            return list(settings.data.profiles)
+        if name == "config_name":
+            return list(ConfigOptionsMap)
+
+        profile = self.session.profile(settings.get_profile(settings.data.scope)[1])
+        if not profile.has_read:
+            profile.read()
+        if name == "task_id":
+            return [t.id for t in profile.id_index.find(text, limit=COMPLETION_LIMIT)]
+        if name in ("status", "filter_status"):
+            return profile.get_status_names()
+        if name in ("tags", "filter_tags"):
+            return profile.field_values("tags")
+        if name in ("assignee", "filter_assignee"):
+            return profile.field_values("assigned_to")
+        return []
@@ -0,0 +1,254 @@
+from fir.types.dtos import ProfileDto, SettingsDto, StatusDto, TaskDto
+
+# Hand written equivalents of the marshmallow schemas in fir.types.schemas. They apply the same validation in a single
+# pass and are used on the hot load/save paths, the schemas remain the reference (see test/test_codec.py).
+
+MISSING = "Missing data for required field."
+NULL = "Field may not be null."
+INVALID_STRING = "Not a valid string."
+INVALID_LIST = "Not a valid list."
+INVALID_DICT = "Not a valid mapping type."
+INVALID_BOOL = "Not a valid boolean."
+
+TRUTHY = {"t", "T", "true", "True", "TRUE", "on", "On", "ON", "y", "Y", "yes", "Yes", "YES", "1", 1}
+FALSY = {"f", "F", "false", "False", "FALSE", "off", "Off", "OFF", "n", "N", "no", "No", "NO", "0", 0}
+
+TASK_STRING_FIELDS = ("status", "added", "modified", "due", "link", "description")
+
+
+class CodecError(ValueError):
+    messages: dict
+
+    def __init__(self, messages: dict):
+        super().__init__(messages)
+        self.messages = messages
+
+
+def load_task(d: dict) -> TaskDto:
+    __check_dict(d)
+    data = {
+        "id": __load_str(d, "id", required=True, min=8, max=8),
+        "name": __load_str(d, "name", required=True, max=250),
+    }
+    for key in TASK_STRING_FIELDS:
+        if key in d:
+            data[key] = __load_str(d, key)
+        elif key == "status":
+            raise CodecError({key: [MISSING]})
+    if "tags" in d:
+        data["tags"] = __load_str_list(d, "tags")
+    if "priority" in d:
+        data["priority"] = __load_int(d, "priority", 0, 999)
+    if "assigned_to" in d:
+        data["assigned_to"] = __load_str_list(d, "assigned_to")
+
+    return TaskDto(**data)
+
+
+def load_status(d: dict) -> StatusDto:
+    __check_dict(d)
+    data = {
+        "name": __load_str(d, "name", required=True, max=50),
+        "color": __load_str(d, "color", required=True, max=20),
+    }
+    if "order" in d:
+        data["order"] = __load_int(d, "order", 0, 9999)
+    if "hide_by_default" in d:
+        data["hide_by_default"] = __load_bool(d, "hide_by_default")
+
+    return StatusDto(**data)
+
+
+def load_profile(d: dict) -> ProfileDto:
+    __check_dict(d)
+    data = {"name": __load_str(d, "name", required=True, max=250)}
+    if "description" in d:
+        data["description"] = __load_str(d, "description", max=250)
+    if "config" in d:
+        data["config"] = __load_str_dict(d, "config")
+    if "tasks" in d:
+        data["tasks"] = [load_task(t) for t in __load_list(d, "tasks")]
+    if "statuses" in d:
+        data["statuses"] = [load_status(s) for s in __load_list(d, "statuses")]
+
+    return ProfileDto(**data)
+
+
+def load_settings(d: dict) -> SettingsDto:
+    __check_dict(d)
+    data = {}
+    if "scope" in d:
+        data["scope"] = __load_str(d, "scope")
+    if "profiles" in d:
+        data["profiles"] = __load_str_dict(d, "profiles")
+
+    return SettingsDto(**data)
+
+
+def dump_task(t: TaskDto) -> dict:
+    return {
+        "id": __dump_str(t.id),
+        "name": __dump_str(t.name),
+        "tags": __dump_str_list(t.tags),
+        "status": __dump_str(t.status),
+        "added": __dump_str(t.added),
+        "modified": __dump_str(t.modified),
+        "due": __dump_str(t.due),
+        "link": __dump_str(t.link),
+        "description": __dump_str(t.description),
+        "priority": t.priority,
+        "assigned_to": __dump_str_list(t.assigned_to),
+    }
+
+
+def dump_status(s: StatusDto) -> dict:
+    return {
+        "name": __dump_str(s.name),
+        "color": __dump_str(s.color),
+        "order": s.order,
+        "hide_by_default": __dump_bool(s.hide_by_default),
+    }
+
+
+def dump_profile(p: ProfileDto) -> dict:
+    return {
+        "name": __dump_str(p.name),
+        "description": __dump_str(p.description),
+        "config": __dump_str_dict(p.config),
+        "tasks": [dump_task(t) for t in p.tasks],
+        "statuses": [dump_status(s) for s in p.statuses],
+    }
+
+
+def dump_settings(s: SettingsDto) -> dict:
+    return {
+        "scope": __dump_str(s.scope),
+        "profiles": __dump_str_dict(s.profiles),
+    }
+
+
+def __check_dict(d):
+    if not isinstance(d, dict):
+        raise CodecError({"_schema": ["Invalid input type."]})
+
+
+def __load_str(d: dict, key: str, required: bool = False, min: int = None, max: int = None) -> str:
+    value = d.get(key)
+    if value is None:
+        if key not in d and not required:
+            return None
+        raise CodecError({key: [MISSING if key not in d else NULL]})
+    if value.__class__ is not str:
+        if isinstance(value, bytes):
+            try:
+                value = value.decode("utf-8")
+            except UnicodeDecodeError:
+                raise CodecError({key: ["Not a valid utf-8 string."]})
+        elif isinstance(value, str):
+            value = str(value)
+        else:
+            raise CodecError({key: [INVALID_STRING]})
+    if (min is not None and len(value) < min) or (max is not None and len(value) > max):
+        raise CodecError({key: [__length_message(min, max)]})
+    return value
+
+
+def __load_list(d: dict, key: str) -> list:
+    value = d[key]
+    if value is None:
+        raise CodecError({key: [NULL]})
+    if isinstance(value, (str, bytes, dict)) or not hasattr(value, "__iter__"):
+        raise CodecError({key: [INVALID_LIST]})
+    return value
+
+
+def __load_str_list(d: dict, key: str) -> list[str]:
+    values = list(__load_list(d, key))
+    for i, v in enumerate(values):
+        if v.__class__ is not str:
+            try:
+                values[i] = __load_str({i: v}, i, required=True)
+            except CodecError as e:
+                raise CodecError({key: e.messages})
+    return values
+
+
+def __load_str_dict(d: dict, key: str) -> dict[str, str]:
+    value = d[key]
+    if value is None:
+        raise CodecError({key: [NULL]})
+    if not isinstance(value, dict):
+        raise CodecError({key: [INVALID_DICT]})
+    for k, v in value.items():
+        if k.__class__ is not str or v.__class__ is not str:
+            return {__load_str({"key": k}, "key", required=True): __load_str({"value": v}, "value", required=True)
+                    for k, v in value.items()}
+    return dict(value)
+
+
+def __load_int(d: dict, key: str, min: int, max: int):
+    value = d[key]
+    if value is None:
+        raise CodecError({key: [NULL]})
+    try:
+        valid = min <= value <= max
+    except TypeError:
+        raise CodecError({key: [f"Must be greater than or equal to {min} and less than or equal to {max}."]})
+    if not valid:
+        raise CodecError({key: [f"Must be greater than or equal to {min} and less than or equal to {max}."]})
+    return value
+
+
+def __load_bool(d: dict, key: str) -> bool:
+    value = d[key]
+    if value is None:
+        raise CodecError({key: [NULL]})
+    try:
+        if value in TRUTHY:
+            return True
+        if value in FALSY:
+            return False
+    except TypeError:
+        pass
+    raise CodecError({key: [INVALID_BOOL]})
+
+
+def __length_message(min: int, max: int) -> str:
+    if min == max:
+        return f"Length must be {min}."
+    if min is None:
+        return f"Longer than maximum length {max}."
+    if max is None:
+        return f"Shorter than minimum length {min}."
+    return f"Length must be between {min} and {max}."
+
+
+def __dump_str(value):
+    if value is None or value.__class__ is str:
+        return value
+    return str(value)
+
+
+def __dump_str_list(values):
+    if values is None:
+        return None
+    return [v if v.__class__ is str else __dump_str(v) for v in values]
+
+
+def __dump_str_dict(values):
+    if values is None:
+        return None
+    return {__dump_str(k): __dump_str(v) for k, v in values.items()}
+
+
+def __dump_bool(value):
+    if value is None:
+        return None
+    try:
+        if value in TRUTHY:
+            return True
+        if value in FALSY:
+            return False
+    except TypeError:
+        pass
+    return bool(value)
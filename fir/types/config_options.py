@@ -10,7 +10,13 @@ ConfigOptions = Literal[
     "enable.column.description",
     "enable.column.assigned",
     "enable.column.priority",
+    "enable.short_ids",
     "name.truncate",
+    "journal.compact_threshold",
+    "write.verify",
+    "store.columnar",
+    "write.concurrency",
+    "archive.after_days",
 ]
 
 
@@ -58,6 +64,11 @@ ConfigOptionsMap: dict[ConfigOptions, ConfigOptionsData] = {
         "Show [1] or hide [0] priority column",
         "1",
         "0"),
+    "enable.short_ids": ConfigOptionsData(
+        "enable.short_ids",
+        "Show the shortest unique prefix of task ids [1] or full ids [0] in table views",
+        "1",
+        "0"),
     "enable.log_task_post_modify": ConfigOptionsData(
         "enable.log_task_post_modify",
         "Print full task details after modifying it",
@@ -68,4 +79,31 @@ ConfigOptionsMap: dict[ConfigOptions, ConfigOptionsData] = {
         "Truncate task name in table views. 0 to disable.",
         "50",
         "50"),
+    "journal.compact_threshold": ConfigOptionsData(
+        "journal.compact_threshold",
+        "Number of journal entries kept before they are compacted into the profile file. 0 to disable the journal.",
+        "200",
+        "200"),
+    "write.verify": ConfigOptionsData(
+        "write.verify",
+        "Check the profile file before it replaces the old one: off, checksum or full (re-parse).",
+        "full",
+        "checksum"),
+    "store.columnar": ConfigOptionsData(
+        "store.columnar",
+        "Keep tasks in packed, dictionary encoded columns [1] instead of one object per task [0]. For large profiles.",
+        "1",
+        "0"),
+    "write.concurrency": ConfigOptionsData(
+        "write.concurrency",
+        "When another fir process saved the profile first: 'optimistic' re-reads it & merges changes by task id, "
+        "'lock' also makes other processes wait from when a command reads the profile until it saves.",
+        "lock",
+        "optimistic"),
+    "archive.after_days": ConfigOptionsData(
+        "archive.after_days",
+        "Move tasks in hidden statuses to the profile's archive once unmodified for this many days, checked at most "
+        "daily when saving. 0 to disable.",
+        "30",
+        "0"),
 }
@@ -21,7 +21,43 @@ Parameters = Literal[
     "color",
     "hide_status",
     "all",
-    "order"
+    "order",
+    "sqlite",
+    "task_count",
+    "status_count",
+    "tag_count",
+    "assignee_count",
+    "hidden_fraction",
+    "description_length",
+    "due_fraction",
+    "due_days",
+    "due_distribution",
+    "seed",
+    "metrics_file",
+    "command_filter",
+    "period",
+    "limit",
+    "keep",
+    "keep_days",
+    "foreground",
+    "interval",
+    "batch_file",
+    "continue_on_error",
+    "json_output",
+    "filter_status",
+    "filter_tags",
+    "filter_assignee",
+    "dry_run",
+    "host",
+    "port",
+    "flush_delay",
+    "sort",
+    "offset",
+    "after",
+    "query",
+    "where",
+    "archive_days",
+    "everything",
 ]
 
 ParameterMap: dict[Parameters, CmdArg] = {
@@ -53,4 +89,78 @@ ParameterMap: dict[Parameters, CmdArg] = {
     "hide_status": CmdArg("hide_status", "Hide tasks assigned to this status by default.", aliases=["--hide"]),
     "color": CmdArg("color", "Set the color of a status", aliases=["--colour", "--color"]),
     "all": CmdArg("all", "Show all, even if they're usually hidden", aliases=["--all", "-a"]),
+    "sqlite": CmdArg("sqlite", "Store the profile in a SQLite database instead of a toml file", aliases=["--sqlite"]),
+    "task_count": CmdArg("task_count", "Number of tasks to generate. Default: 1000.", aliases=["--tasks"]),
+    "status_count": CmdArg("status_count", "Number of statuses to generate. Default: 6.", aliases=["--statuses"]),
+    "tag_count": CmdArg("tag_count", "Number of distinct tags. Default: 20.", aliases=["--tags"]),
+    "assignee_count": CmdArg("assignee_count", "Number of distinct assignees. Default: 10.", aliases=["--assignees"]),
+    "hidden_fraction": CmdArg(
+        "hidden_fraction",
+        "Fraction of tasks in hidden statuses, 0 - 1. Default: 0.3.",
+        aliases=["--hidden"]),
+    "description_length": CmdArg(
+        "description_length",
+        "Maximum length of task descriptions. Default: 0.",
+        aliases=["--desc-length"]),
+    "due_fraction": CmdArg(
+        "due_fraction",
+        "Fraction of tasks with a due date, 0 - 1. Default: 0.3.",
+        aliases=["--due-fraction"]),
+    "due_days": CmdArg("due_days", "Due dates fall within this many days. Default: 90.", aliases=["--due-days"]),
+    "due_distribution": CmdArg(
+        "due_distribution",
+        "Distribution of due dates, 'uniform' or 'normal'. Default: uniform.",
+        aliases=["--due-dist"]),
+    "seed": CmdArg("seed", "Random seed, the same seed generates the same profile. Default: 1.", aliases=["--seed"]),
+    "metrics_file": CmdArg(
+        "metrics_file",
+        "Metrics log to read. Default: the FIR_METRICS path, or metrics.jsonl in the data directory.",
+        aliases=["--file"]),
+    "command_filter": CmdArg("command_filter", "Only include this command, e.g. 'list'.", aliases=["--command"]),
+    "period": CmdArg("period", "Group trends by 'day', 'week' or 'month'. Default: day.", aliases=["--period"]),
+    "limit": CmdArg("limit", "Maximum number of rows to show.", aliases=["--limit"]),
+    "keep": CmdArg("keep", "Number of rotated files to keep. Default: 5.", aliases=["--keep"]),
+    "keep_days": CmdArg(
+        "keep_days",
+        "Keep lines from the last number of days, older lines are summarised. Default: 30.",
+        aliases=["--days"]),
+    "foreground": CmdArg("foreground", "Run in this terminal instead of in the background", aliases=["--foreground"]),
+    "interval": CmdArg("interval", "Seconds between background saves. Default: 5.", aliases=["--interval"]),
+    "batch_file": CmdArg("batch_file", "File of commands, one per line, or '-' for stdin. Default: stdin."),
+    "continue_on_error": CmdArg(
+        "continue_on_error",
+        "Skip lines that fail & save the rest, instead of saving nothing when a line fails.",
+        aliases=["--continue"]),
+    "json_output": CmdArg("json_output", "Print a JSON result per line.", aliases=["--json"]),
+    "filter_status": CmdArg("filter_status", "Only tasks with this status.", aliases=["--status", "-s"]),
+    "filter_tags": CmdArg("filter_tags", "Only tasks with this tag.", aliases=["--tag", "-t"]),
+    "filter_assignee": CmdArg("filter_assignee", "Only tasks assigned to this person.", aliases=["--assigned"]),
+    "dry_run": CmdArg("dry_run", "Print the tasks that would change without changing them", aliases=["--dry-run"]),
+    "everything": CmdArg("everything", "Change every task when no filter is given", aliases=["--everything"]),
+    "host": CmdArg("host", "Address to listen on. Default: 127.0.0.1.", aliases=["--host"]),
+    "port": CmdArg("port", "Port to listen on. Default: 8080.", aliases=["--port"]),
+    "flush_delay": CmdArg(
+        "flush_delay",
+        "Seconds to wait before saving, writes arriving meanwhile share the save. Default: 0.",
+        aliases=["--flush-delay"]),
+    "sort": CmdArg(
+        "sort",
+        "Comma separated fields to sort by, '-' for descending, e.g. --sort=status,priority,due,-modified (with '=' "
+        "when the first field is descending). Fields: status, priority, due, added, modified, name, id. "
+        "Default: status.",
+        aliases=["--sort"]),
+    "offset": CmdArg("offset", "Number of rows to skip.", aliases=["--offset"]),
+    "after": CmdArg("after", "Continue after this task id, as printed at the end of a limited list.",
+                    aliases=["--after"]),
+    "query": CmdArg("query", "Words to find in task names & descriptions, 'word*' matches words starting with 'word'.",
+                    nargs="+"),
+    "where": CmdArg(
+        "where",
+        "Filter expression, e.g. \"status in (todo, prog) and (priority <= 2 or due < today+7) and not tags = x\". "
+        "Operators: =, !=, <, <=, >, >=, in (...), ~ (contains) & !~, combined with and, or, not & brackets.",
+        aliases=["--where", "-w"]),
+    "archive_days": CmdArg(
+        "archive_days",
+        "Archive tasks in hidden statuses not modified for this many days. Default: the archive.after_days config.",
+        aliases=["--days"]),
 }
@@ -0,0 +1,62 @@
+from marshmallow import Schema, fields, post_load, validate, EXCLUDE
+
+from fir.types.dtos import ProfileDto, SettingsDto, StatusDto, TaskDto
+
+
+class TaskSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Str(required=True, validate=validate.Length(min=8, max=8))
+    name = fields.Str(required=True, validate=validate.Length(max=250))
+    tags = fields.List(fields.String())
+    status = fields.Str(required=True, default="")
+    added = fields.Str(default="")
+    modified = fields.Str(default="")
+    due = fields.Str(default="")
+    link = fields.Str(default="")
+    description = fields.Str(default="")
+    priority = fields.Field(strict=True, validate=validate.Range(min=0, max=999))
+    assigned_to = fields.List(fields.String())
+
+    @post_load
+    def make_task(self, data, **kwargs):
+        return TaskDto(**data)
+
+
+class StatusSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    name = fields.String(required=True, validate=validate.Length(max=50))
+    color = fields.String(required=True, validate=validate.Length(max=20))
+    order = fields.Field(strict=True, validate=validate.Range(min=0, max=9999))
+    hide_by_default = fields.Bool()
+
+    @post_load
+    def make_task(self, data, **kwargs):
+        return StatusDto(**data)
+
+
+class ProfileSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    name = fields.String(required=True, validate=validate.Length(max=250))
+    description = fields.String(validate=validate.Length(max=250), default="")
+    config = fields.Dict(keys=fields.String(), values=fields.String())
+    tasks = fields.List(fields.Nested(TaskSchema()))
+    statuses = fields.List(fields.Nested(StatusSchema()))
+
+    @post_load
+    def make_profile(self, data, **kwargs):
+        return ProfileDto(**data)
+
+
+class SettingsSchema(Schema):
+    scope = fields.Str()
+    profiles = fields.Dict(keys=fields.String(), values=fields.String())
+
+    @post_load
+    def make(self, data, **kwargs):
+        return SettingsDto(**data)
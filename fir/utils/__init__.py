@@ -1,9 +1,11 @@
+from typing import Container
 
-def generate_task_id(not_in: list[str] = []):
+
+def generate_task_id(not_in: Container[str] = []):
     return __generate_id(not_in=not_in)
 
 
-def __generate_id(not_in: list[str] = [], i: int = 0):
+def __generate_id(not_in: Container[str] = [], i: int = 0):
     if i > 10000:
         raise Exception("Max iterations exceeded")
     import shortuuid
@@ -31,3 +33,31 @@ def truncate(s: str, length: int = 0):
         return s
 
     return s[:length] + (s[length:] and '...')
+
+
+def display_width(s: str) -> int:
+    # Terminal columns s takes up, wide (CJK, emoji) characters take two & combining ones none. Uses wcwidth like
+    # tabulate does when it's installed
+    if s.isascii():
+        return len(s)
+    try:
+        from wcwidth import wcswidth
+        width = wcswidth(s)
+        if width >= 0:
+            return width
+    except ImportError:
+        pass
+    import unicodedata
+    return sum(0 if unicodedata.combining(c) else 2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in s)
+
+
+def truncate_width(s: str, width: int) -> str:
+    # Cuts s to at most width terminal columns, ending in '...' when it was cut
+    if display_width(s) <= width:
+        return s
+    end = "..." if width >= 3 else ""
+    # A character takes at least a column unless it's combining, so the cut starts close & shrinks from there
+    s = s[:width - len(end)]
+    while display_width(s) > width - len(end):
+        s = s[:-1]
+    return s + end
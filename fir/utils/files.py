@@ -1,29 +1,129 @@
-
 import os
+from typing import Iterable, Literal
+
+WriteVerify = Literal["off", "checksum", "full"]
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def write_toml_file(file_path, to: dict, verify: WriteVerify = "checksum") -> bytes:
+    import tomli_w
+    try:
+        content = tomli_w.dumps(to).encode("utf-8")
+    except Exception as e:
+        print(e)
+        print(f'ERROR!\nCould not write to config location "{file_path}"!')
+        raise SystemExit(1)
+
+    write_file_atomic(file_path, content, verify=verify)
+    return content
 
 
-def write_toml_file(file_path, to: dict, test_write: bool = True):
+def write_toml_stream(file_path, head: dict, key: str, rows: Iterable[dict], verify: WriteVerify = "checksum",
+                      batch_size: int = 1000):
+    # Writes head followed by rows as an array of tables under key, serialising a batch of rows at a time so
+    # neither the rows nor the document are ever held in memory as a whole
     import tomli_w
-    if test_write:
-        write_toml_file(file_path + '.tmp', to, test_write=False)
 
+    def chunks():
+        yield tomli_w.dumps(head).encode("utf-8")
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield b"\n" + tomli_w.dumps({key: batch}).encode("utf-8")
+                batch = []
+        if batch:
+            yield b"\n" + tomli_w.dumps({key: batch}).encode("utf-8")
+
+    write_chunks_atomic(file_path, chunks(), verify=verify)
+
+
+def write_file_atomic(file_path, content: bytes, verify: WriteVerify = "checksum"):
+    write_chunks_atomic(file_path, [content], verify=verify)
+
+
+def write_chunks_atomic(file_path, chunks: Iterable[bytes], verify: WriteVerify = "checksum"):
+    import hashlib
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory)
     try:
-        with open(file_path, "wb") as f:
-            tomli_w.dump(to, f)
-        if file_path.endswith(".tmp") and os.path.exists(file_path):
-            read_toml_file(file_path)
-            os.remove(file_path)
+        checksum = hashlib.sha256()
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                checksum.update(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if verify != "off":
+            __verify_written_file(tmp_path, checksum.digest(), verify)
+
+        os.chmod(tmp_path, __file_mode(file_path))
+        os.replace(tmp_path, file_path)
+        __fsync_dir(directory)
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         print(e)
         print(f'ERROR!\nCould not write to config location "{file_path}"!')
         raise SystemExit(1)
 
 
+def __verify_written_file(file_path, digest: bytes, verify: WriteVerify):
+    if verify == "full":
+        import tomllib
+        with open(file_path, "rb") as f:
+            tomllib.load(f)
+        return
+
+    import hashlib
+    written = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            written.update(block)
+    if written.digest() != digest:
+        raise IOError(f"Checksum mismatch after writing {file_path}")
+
+
+def __file_mode(file_path) -> int:
+    try:
+        return os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def __fsync_dir(directory):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 def read_toml_file(file_path):
+    return read_toml_bytes(file_path, read_binary_file(file_path))
+
+
+def read_toml_bytes(file_path, content: bytes):
     import tomllib
+    try:
+        return tomllib.loads(content.decode("utf-8"))
+    except Exception as e:
+        print(e)
+        print(f'ERROR!\nCould not read from config location "{file_path}"!')
+        raise SystemExit(1)
+
+
+def read_binary_file(file_path) -> bytes:
     try:
         with open(file_path, "rb") as f:
-            return tomllib.load(f)
+            return f.read()
     except Exception as e:
         print(e)
         print(f'ERROR!\nCould not read from config location "{file_path}"!')
@@ -50,3 +150,7 @@ def read_json_file(file_path) -> dict:
         print(e)
         print(f'ERROR!\nCould not read to config location "{file_path}"!')
         raise SystemExit(1)
+
+
+def is_sqlite_path(path: str) -> bool:
+    return path.lower().endswith(SQLITE_EXTENSIONS)
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows), profiles are then written without locking
+    fcntl = None
+
+# Advisory locks on a '<profile>.lock' file beside each profile, shared while reading & exclusive while writing.
+# There's one FileLock per path in a process, so a second Profile for the same file shares the lock instead of
+# waiting on itself.
+
+POLL_INTERVAL = 0.02
+# Seconds to wait for another process to finish with a profile
+TIMEOUT_ENV = "FIR_LOCK_TIMEOUT"
+DEFAULT_TIMEOUT = 10.0
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class FileLock:
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__fd: int | None = None
+        self.__held = {True: 0, False: 0}
+        self.__mode: bool | None = None
+        self.__mutex = threading.RLock()
+
+    def acquire(self, exclusive: bool, timeout: float):
+        with self.__mutex:
+            self.__held[exclusive] += 1
+            try:
+                self.__apply(timeout)
+            except BaseException:
+                self.__held[exclusive] -= 1
+                raise
+
+    def release(self, exclusive: bool):
+        with self.__mutex:
+            if self.__held[exclusive] > 0:
+                self.__held[exclusive] -= 1
+            self.__apply(0)
+
+    def holding(self, exclusive: bool) -> bool:
+        return self.__held[exclusive] > 0
+
+    def __apply(self, timeout: float):
+        # The OS lock follows the strongest hold, exclusive if any, shared if any, otherwise none
+        mode = True if self.__held[True] else False if self.__held[False] else None
+        if mode == self.__mode or fcntl is None:
+            return
+
+        if mode is None:
+            os.close(self.__fd)
+            self.__fd = None
+            self.__mode = None
+            return
+
+        if self.__fd is None:
+            try:
+                self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                # e.g. a read only directory, nothing else can write there either
+                return
+        self.__flock(fcntl.LOCK_EX if mode else fcntl.LOCK_SH, timeout)
+        self.__mode = mode
+
+    def __flock(self, flags: int, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(self.__fd, flags | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    if self.__mode is None:
+                        os.close(self.__fd)
+                        self.__fd = None
+                    raise LockTimeout(self.path)
+                time.sleep(POLL_INTERVAL)
+
+
+__locks: dict[str, FileLock] = {}
+__locks_mutex = threading.Lock()
+
+
+def lock_timeout() -> float:
+    try:
+        return float(os.environ.get(TIMEOUT_ENV, DEFAULT_TIMEOUT))
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+
+def lock_for(path: str) -> FileLock:
+    key = os.path.abspath(path)
+    with __locks_mutex:
+        lock = __locks.get(key)
+        if lock is None:
+            lock = __locks[key] = FileLock(key)
+        return lock
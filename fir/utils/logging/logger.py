@@ -1,7 +1,5 @@
 import json
 
-from termcolor import colored
-
 
 class Logger:
     verbose: bool = False
@@ -26,7 +24,7 @@ class Logger:
     def log_debug(self, message: str):
         if not self.debug:
             return
-        self.log(f'{colored("[Debug]:", "blue", attrs=["bold"])} {message}')
+        self.log(f'{self.__label("[Debug]:", "blue")} {message}')
 
     def log_dict(self, obj: dict):
         if self.pretty:
@@ -36,19 +34,23 @@ class Logger:
         self.log(str(obj))
 
     def log_error(self, message: str, exit: bool = True):
-        self.log(f'{colored("[Error]:", "red", attrs=["bold"])} {message}')
+        self.log(f'{self.__label("[Error]:", "red")} {message}')
         if exit:
             raise SystemExit(1)
 
     def log_success(self, message: str):
-        self.log(f'{colored("[Success]:", "green", attrs=["bold"])} {message}')
+        self.log(f'{self.__label("[Success]:", "green")} {message}')
 
     def log_warning(self, message: str):
         if not self.verbose and not self.debug:
             return
-        self.log(f'{colored("[Warning]:", "yellow", attrs=["bold"])} {message}')
+        self.log(f'{self.__label("[Warning]:", "yellow")} {message}')
 
     def log_info(self, message: str):
         if not self.verbose and not self.debug:
             return
-        self.log(f'{colored("[Info]:", "cyan", attrs=["bold"])} {message}')
+        self.log(f'{self.__label("[Info]:", "cyan")} {message}')
+
+    def __label(self, label: str, color: str):
+        from termcolor import colored
+        return colored(label, color, attrs=["bold"])
@@ -1,11 +1,16 @@
+import itertools
+from typing import Callable
 
-from logging import Logger
-from tabulate import tabulate
-
-from termcolor import colored
 from fir.data.profile import Profile
 from fir.types.dtos import TaskDto
-from fir.utils import truncate
+from fir.utils import display_width, timings, truncate, truncate_width
+from fir.utils.logging.logger import Logger
+
+# termcolor is imported where it's used, commands that never render a table don't pay for it
+
+# Rows used to size the task table's columns & rows written per chunk
+SAMPLE_ROWS = 1000
+FLUSH_ROWS = 256
 
 
 class ProfileLoggingExtensions:
@@ -16,38 +21,130 @@ class ProfileLoggingExtensions:
         self.logger = logger
 
     def log_task_table(self, tasks: list[TaskDto], order: bool = True):
-        table = []
-        if order:
-            tasks.sort(key=lambda x: self.sort_by_status_type(x))
-
-        enabled = self.__enabled_columns()
-
-        for task in tasks:
-            status = self.__get_status_colour(task.status)
-
-            values = [colored(task.id, 'light_grey'),
-                      truncate(task.name, self.profile.try_get_config_value_int("name.truncate")),
-                      status]
-            if enabled.get("description"):
-                values.append(task.description)
-            if enabled.get("link"):
-                values.append(task.link)
-            if enabled.get("due"):
-                values.append(task.due)
-            if enabled.get("priority"):
-                values.append(task.priority)
-            if enabled.get("assigned"):
-                values.append(', '.join(task.assigned_to))
-            if enabled.get("tags"):
-                values.append(', '.join(task.tags))
+        with timings.span("render"):
+            self.__log_task_table(tasks, order)
 
-            table.append(values)
+    def __log_task_table(self, tasks: list[TaskDto], order: bool):
+        statuses = {s.name: s for s in self.profile.data.statuses}
+        if order:
+            tasks.sort(key=lambda x: statuses[x.status].order if x.status in statuses else 1000)
+
+        columns = self.__get_columns(self.__enabled_columns(), statuses)
+        sample = [tuple(get(task) for _, get, _, _ in columns) for task in tasks[:SAMPLE_ROWS]]
+
+        widths = self.__get_widths(columns, sample, tasks)
+        render = self.__get_row_renderer(columns, widths, statuses)
+        lines = self.__get_header_lines(columns, widths)
+
+        # Rows are written in chunks as they're formatted, output starts before the whole table is built
+        rest = (tuple(get(task) for _, get, _, _ in columns) for task in tasks[SAMPLE_ROWS:])
+        for row in itertools.chain(sample, rest):
+            lines.append(render(row))
+            if len(lines) >= FLUSH_ROWS:
+                self.logger.log("\n".join(lines))
+                lines = []
+        if lines:
+            self.logger.log("\n".join(lines))
+
+    def __get_widths(self, columns: list[tuple], sample: list[tuple], tasks: list[TaskDto]) -> list[int]:
+        # Widths come from the sample, past that a column's known cap wins & longer cells are cut so the rows further
+        # down still line up
+        caps = [cap for _, _, _, cap in columns]
+        if len(tasks) > SAMPLE_ROWS:
+            # Short ids are never longer than the full ones
+            caps[0] = max(len(t.id) for t in tasks)
+
+        widths = []
+        for i, (header, _, _, _) in enumerate(columns):
+            width = max((display_width(row[i]) for row in sample), default=0)
+            if len(tasks) > SAMPLE_ROWS and caps[i]:
+                width = max(width, caps[i])
+            widths.append(max(width, len(header) + 2))
+        return widths
+
+    def __get_row_renderer(self, columns: list[tuple], widths: list[int], statuses: dict) -> Callable[[tuple], str]:
+        from termcolor import colored
+
+        # Statuses are coloured & padded once, the status cell is then a dict lookup per row
+        status_width = widths[2]
+        status_cells = {}
+        for name, status in statuses.items():
+            cell = colored(name, status.color) if status.color else name
+            status_cells[name] = cell + " " * (status_width - display_width(name))
+
+        id_start, id_end = colored("\0", "light_grey").split("\0")
+        cells = [f"{id_start}{{0:<{widths[0]}}}{id_end}", f"{{1:<{widths[1]}}}", "{2}"]
+        for i, (_, _, right, _) in enumerate(columns[3:], 3):
+            cells.append(f"{{{i}:{'>' if right else '<'}{widths[i]}}}")
+        row_format = "  ".join(cells).format
+        padded_format = "  ".join([f"{id_start}{{0}}{id_end}"] + [f"{{{i}}}" for i in range(1, len(columns))]).format
+        aligns = [right for _, _, right, _ in columns]
+
+        def pad(cell: str, width: int, right: bool) -> str:
+            # Rows past the sample can be wider than their column, those cells are cut to fit
+            cell = truncate_width(cell, width)
+            fill = " " * (width - display_width(cell))
+            return fill + cell if right else cell + fill
+
+        def render(row: tuple) -> str:
+            status = status_cells.get(row[2])
+            if not all(cell.isascii() and len(cell) <= width for cell, width in zip(row, widths)):
+                # str.format pads by characters, cells with wide characters or too long for their column are padded
+                # by display width instead
+                cells = [pad(cell, width, right) for cell, width, right in zip(row, widths, aligns)]
+                return padded_format(*cells[:2], status or cells[2], *cells[3:]).rstrip()
+            if status is None:
+                status = row[2].ljust(status_width)
+            return row_format(row[0], row[1], status, *row[3:]).rstrip()
+
+        return render
+
+    def __get_header_lines(self, columns: list[tuple], widths: list[int]) -> list[str]:
+        from termcolor import colored
+
+        start, end = colored("\0", "light_blue", attrs=["bold"]).split("\0")
+        headers = []
+        for (header, _, right, _), width in zip(columns, widths):
+            pad = " " * (width - len(header))
+            headers.append(f"{pad}{start}{header}{end}" if right else f"{start}{header}{end}{pad}")
+        return ["  ".join(headers).rstrip(), "  ".join("-" * width for width in widths)]
+
+    def __get_columns(self, enabled: dict[str, bool], statuses: dict):
+        # (header, plain cell text, right aligned, known width cap)
+        if enabled.get("short_ids"):
+            unique_prefix_length = self.profile.unique_prefix_length
+
+            def get_id(task: TaskDto):
+                return task.id[:unique_prefix_length(task.id)]
+        else:
+            def get_id(task: TaskDto):
+                return task.id
+
+        length = self.profile.try_get_config_value_int("name.truncate") or 0
+
+        columns = [
+            ("Id", get_id, False, None),
+            ("Task", lambda t: truncate(t.name, length), False, length + 3 if length > 0 else None),
+            ("Status", lambda t: t.status, False, max((display_width(s) for s in statuses), default=0))]
 
-        headers = self.__get_headers(enabled)
+        if enabled.get("description"):
+            columns.append(("Description", lambda t: t.description or "", False, None))
+        if enabled.get("link"):
+            columns.append(("Link", lambda t: t.link or "", False, None))
+        if enabled.get("due"):
+            columns.append(("Due Date", lambda t: t.due or "", False, None))
+        if enabled.get("priority"):
+            columns.append(("Priority", lambda t: "" if t.priority is None else str(t.priority), True, None))
+        if enabled.get("assigned"):
+            columns.append(("Assigned To", lambda t: ', '.join(t.assigned_to), False, None))
+        if enabled.get("tags"):
+            columns.append(("Tags", lambda t: ', '.join(t.tags), False, None))
 
-        self.logger.log(tabulate(table, headers=headers))
+        return columns
 
     def log_task(self, task: TaskDto):
+        from termcolor import colored
+
         self.logger.log(f"{colored('Id', 'light_blue', attrs=['bold'])}: {task.id}")
         self.logger.log(f"{colored('Name', 'light_blue', attrs=['bold'])}: {task.name}")
         self.logger.log(f"{colored('Status', 'light_blue', attrs=['bold'])}: {task.status}")
@@ -81,38 +178,6 @@ class ProfileLoggingExtensions:
 
         return p
 
-    def __get_status_colour(self, status: str):
-        s = self.profile.get_status_by_name(status)
-        color = None
-        if s is not None:
-            color = s.color
-
-        if color is not None:
-            return colored(status, color)
-
-        return status
-
-    def __get_headers(self, enabled: dict[str, bool]):
-        headers = [
-            f"{colored('Id', 'light_blue', attrs=['bold'])}",
-            f"{colored('Task', 'light_blue', attrs=['bold'])}",
-            f"{colored('Status', 'light_blue', attrs=['bold'])}"]
-
-        if enabled.get("description"):
-            headers.append(f"{colored('Description', 'light_blue', attrs=['bold'])}")
-        if enabled.get("link"):
-            headers.append(f"{colored('Link', 'light_blue', attrs=['bold'])}")
-        if enabled.get("due"):
-            headers.append(f"{colored('Due Date', 'light_blue', attrs=['bold'])}")
-        if enabled.get("priority"):
-            headers.append(f"{colored('Priority', 'light_blue', attrs=['bold'])}")
-        if enabled.get("assigned"):
-            headers.append(f"{colored('Assigned To', 'light_blue', attrs=['bold'])}")
-        if enabled.get("tags"):
-            headers.append(f"{colored('Tags', 'light_blue', attrs=['bold'])}")
-
-        return headers
-
     def __enabled_columns(self):
         return {
             "tags": self.profile.try_get_config_value_bool("enable.column.tags"),
@@ -121,4 +186,5 @@ class ProfileLoggingExtensions:
             "link": self.profile.try_get_config_value_bool("enable.column.link"),
             "assigned": self.profile.try_get_config_value_bool("enable.column.assigned"),
             "priority": self.profile.try_get_config_value_bool("enable.column.priority"),
+            "short_ids": self.profile.try_get_config_value_bool("enable.short_ids"),
         }
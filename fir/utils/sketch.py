@@ -0,0 +1,104 @@
+import math
+
+# Streaming quantiles with a relative error guarantee (DDSketch). Values fall into logarithmic bins, so memory
+# depends on the range of the values rather than how many were added, & two sketches merge by adding counts.
+
+
+class QuantileSketch:
+    relative_accuracy: float
+    max_bins: int
+    bins: dict[int, int]
+    zeros: int
+    count: int
+    total: float
+    min: float
+    max: float
+
+    # Values at or below this are counted as zero, timings are in milliseconds so this is a microsecond
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.bins = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        if value <= self.MIN_VALUE:
+            self.zeros += 1
+        else:
+            key = math.ceil(math.log(value) / self.__log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self.__collapse()
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different accuracies can't be merged")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self.__collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if seen > rank:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.__gamma ** key / (self.__gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": [[k, c] for k, c in self.bins.items()],
+            "zeros": self.zeros,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        sketch = cls(d["relative_accuracy"])
+        sketch.bins = {int(k): int(c) for k, c in d["bins"]}
+        sketch.zeros = d["zeros"]
+        sketch.count = d["count"]
+        sketch.total = d["total"]
+        if sketch.count:
+            sketch.min = d["min"]
+            sketch.max = d["max"]
+        return sketch
+
+    def __collapse(self):
+        # Folds the lowest bins together, accuracy is only lost for the smallest values
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
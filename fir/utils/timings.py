@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+
+# Named spans around the phases of an invocation. Until enable() is called span() hands back a shared no-op
+# context manager, so instrumented code pays for a function call & nothing else.
+
+METRICS_ENV = "FIR_METRICS"
+
+enabled = False
+_totals: dict[str, list] = {}
+_depth = 0
+
+
+class Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        if self.name not in _totals:
+            # Registered on entry so the report lists phases in the order they started, parents first
+            _totals[self.name] = [0, 0, _depth]
+        _depth += 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        global _depth
+        elapsed = time.perf_counter_ns() - self.start
+        _depth -= 1
+        record(self.name, elapsed, _depth)
+        return False
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP = NoopSpan()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def reset():
+    global _depth
+    _totals.clear()
+    _depth = 0
+
+
+def span(name: str) -> Span | NoopSpan:
+    if not enabled:
+        return NOOP
+    return Span(name)
+
+
+def record(name: str, elapsed_ns: int, depth: int = 0):
+    # Totals per name, depth is kept from the first occurrence only
+    total = _totals.get(name)
+    if total is None:
+        _totals[name] = [elapsed_ns, 1, depth]
+    else:
+        total[0] += elapsed_ns
+        total[1] += 1
+
+
+def phases() -> dict[str, float]:
+    return {name: round(t[0] / 1e6, 3) for name, t in _totals.items()}
+
+
+def report() -> str:
+    lines = [f"{'phase':<28}{'ms':>10}{'calls':>7}"]
+    for name, (elapsed, calls, depth) in _totals.items():
+        lines.append(f"{'  ' * depth + name:<28}{elapsed / 1e6:>10.2f}{calls:>7}")
+    return "\n".join(lines)
+
+
+def print_report():
+    print(report(), file=sys.stderr)
+
+
+def metrics_path(data_dir: str) -> str | None:
+    # FIR_METRICS=1 writes to <data dir>/metrics.jsonl, any other value is taken as the path to write to
+    value = os.environ.get(METRICS_ENV)
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return os.path.join(data_dir, "metrics.jsonl")
+    return os.path.expanduser(value)
+
+
+def append_metrics(path: str, entry: dict):
+    import json
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # A single O_APPEND write, so lines from concurrent invocations don't interleave
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        print(f"Could not write metrics to {path}: {e}", file=sys.stderr)
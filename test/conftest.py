@@ -0,0 +1,51 @@
+import copy
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fir.data.defaults import default_profile
+from fir.data.profile import Profile
+from fir.types.dtos import TaskDto
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 'fir <argv>' as the console script runs it
+FIR_MAIN = "import sys; sys.argv = ['fir'] + sys.argv[1:]; from fir.cmd import cmd; cmd()"
+
+
+@pytest.fixture
+def fir_env(tmp_path) -> dict[str, str]:
+    # Environment for fir processes with tmp_path as their home, tests add variables to it before running them
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=ROOT)
+    env.pop("POETRY_ACTIVE", None)
+    return env
+
+
+@pytest.fixture
+def python(tmp_path, fir_env):
+    def run(code: str, *argv: str, stdin: str = None, check: bool = False) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, "-c", code, *argv], input=stdin, env=fir_env, cwd=tmp_path,
+                              capture_output=True, text=True, check=check)
+    return run
+
+
+@pytest.fixture
+def fir(python):
+    def run(*argv: str, stdin: str = None, check: bool = False) -> subprocess.CompletedProcess:
+        return python(FIR_MAIN, *argv, stdin=stdin, check=check)
+    return run
+
+
+@pytest.fixture
+def new_profile(tmp_path):
+    # Saves a profile with the default statuses plus copies of the given tasks & config
+    def create(tasks: list[TaskDto] = (), config: dict = None, name: str = "p.toml") -> Profile:
+        p = Profile(str(tmp_path / name), read=False)
+        p.data = default_profile("p")
+        p.data.tasks = copy.deepcopy(list(tasks))
+        p.data.config.update(config or {})
+        p.save()
+        return p
+    return create
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from fir.data.profile import Profile
+from fir.types.dtos import TaskDto
+
+OLD = "2020-01-01 00:00:00"
+
+
+TASKS = [
+    TaskDto("aaaa1111", "old done", status="done", modified=OLD),
+    TaskDto("aaaa2222", "old todo", status="todo", modified=OLD),
+    TaskDto("bbbb1111", "new done", status="done", modified="2099-01-01 00:00:00"),
+]
+
+
+def test_archived_tasks_resolve_across_tiers(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    assert [t.id for t in profile.archivable(30)] == ["aaaa1111"]
+    profile.archive_tasks(profile.archivable(30))
+    profile.save()
+
+    profile = Profile(path)
+    assert [t.id for t in profile.data.tasks] == ["aaaa2222", "bbbb1111"]
+    assert profile.archive.ids() == ["aaaa1111"]
+
+    # A prefix matching a task in each tier is ambiguous, the archive is only read when asked for
+    assert profile.get_task("aaaa")[0] is None
+    task, err = profile.get_task("aaaa1")
+    assert task is None and "archived" in err
+    assert profile.get_task("aaaa1", include_archived=True)[0].name == "old done"
+    assert profile.unique_prefix_length("aaaa2222") == 5
+
+    assert len(profile.find_tasks(include_hidden=True)) == 2
+    assert {t.id for t in profile.find_tasks(include_hidden=True, include_archived=True)} == \
+        {"aaaa1111", "aaaa2222", "bbbb1111"}
+    assert [t.id for t in profile.find_tasks(include_archived=True, where="name ~ old")] == ["aaaa2222", "aaaa1111"]
+
+    task, _ = profile.get_task("aaaa1", include_archived=True)
+    profile.restore_task(task)
+    profile.save()
+
+    profile = Profile(path)
+    assert profile.archive.ids() == []
+    assert profile.get_task("aaaa1")[0].name == "old done"
+
+
+def test_saves_tier_once_due(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    profile.set_config_value("archive.after_days", "30")
+    profile.save()
+    assert Profile(path).archive.ids() == ["aaaa1111"]
+
+    # Checked at most once a day
+    profile = Profile(path)
+    task, _ = profile.get_task("bbbb")
+    task.modified = OLD
+    profile.update_task(task)
+    profile.save()
+    assert Profile(path).archive.ids() == ["aaaa1111"]
+
+    os.utime(profile.archive.ids_path, (0, 0))
+    profile = Profile(path)
+    profile.add_task(TaskDto("cccc1111", "another", status="todo"))
+    profile.save()
+    profile = Profile(path)
+    assert profile.archive.ids() == ["aaaa1111", "bbbb1111"]
+    assert profile.archive.get("bbbb1111").name == "new done"
+
+
+def test_status_changes_restart_the_age(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    task, _ = profile.get_task("aaaa2222")
+    assert profile.set_status(task, "done")
+    assert [t.id for t in profile.archivable(30)] == ["aaaa1111"]
+
+
+def test_damaged_archive_is_an_error(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    profile.archive_tasks(profile.archivable(30))
+    profile.save()
+    archive = Profile(path).archive
+
+    # A batch cut short before its ids were listed is ignored
+    with open(archive.path, "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00partial")
+    assert list(archive.tasks()) == ["aaaa1111"]
+
+    with open(archive.path, "r+b") as f:
+        f.seek(12)
+        f.write(b"\x00" * 8)
+    archive.clear()
+    with pytest.raises(SystemExit):
+        archive.tasks()
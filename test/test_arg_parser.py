@@ -0,0 +1,57 @@
+import pytest
+
+from fir.cmd.base_commands import CommandHandlers
+from fir.cmd.builder.arg_parser import ArgParserSetup
+from fir.cmd.config_commands import ConfigHandlers
+from fir.cmd.profile_commands import ProfileHandlers
+from fir.cmd.set_commands import SetHandlers
+from fir.cmd.status_commands import StatusHandlers
+from fir.context import Context
+
+
+@pytest.fixture
+def setup():
+    c = Context()
+    return ArgParserSetup(CommandHandlers(c), ConfigHandlers(c), ProfileHandlers(c), StatusHandlers(c), SetHandlers(c))
+
+
+@pytest.mark.parametrize("argv", [
+    ["ls"],
+    ["--scope", "work", "-v", "ls", "-a", "--tag", "x"],
+    ["new", "a", "task", "--priority", "5"],
+    ["status", "new", "review", "--hide"],
+    ["set", "priority", "abc", "10"],
+    ["config", "get", "status.default"],
+    ["profile", "create", "work", "--sqlite"],
+])
+def test_lazy_parser_matches_full_parser(setup, argv):
+    full = vars(setup.configure_argparser().parse_args(argv))
+    lazy = vars(setup.configure_argparser(argv).parse_args(argv))
+
+    assert lazy == full
+    assert setup.get_command(lazy).name == setup.get_command(full).name
+
+
+def test_lazy_parser_only_builds_matching_command(setup):
+    parser = setup.configure_argparser(["config", "get", "status.default"])
+    commands = parser._subparsers._group_actions[0].choices
+
+    assert list(commands.keys()) == ["config"]
+    assert list(commands["config"]._subparsers._group_actions[0].choices.keys()) == ["get"]
+
+
+@pytest.mark.parametrize("argv", [
+    ["ls", "--bogus"],
+    ["new"],
+    ["status", "new"],
+    ["config", "get", "status.default", "extra"],
+])
+def test_lazy_parser_errors_match_full_parser(setup, capsys, argv):
+    output = []
+    for parser in (setup.configure_argparser(), setup.configure_argparser(argv)):
+        with pytest.raises(SystemExit):
+            parser.parse_args(argv)
+        output.append(capsys.readouterr())
+
+    assert output[1] == output[0]
+    assert "error:" in output[0].err
@@ -0,0 +1,98 @@
+import json
+
+from fir.data.profile import Profile
+from fir.types.dtos import TaskDto
+from test.conftest import FIR_MAIN
+
+
+def task_id(fir, name: str) -> str:
+    out = fir("new", name).stdout
+    return out.strip().split("[")[-1].rstrip("]")
+
+
+def test_batch_saves_nothing_when_a_line_fails(fir):
+    id = task_id(fir, "existing")
+    lines = f"tag {id} batched\nnew added in batch\ninfo nosuchtask\nnew never run\n"
+
+    result = fir("batch", stdin=lines)
+    assert result.returncode == 1
+    assert "Line 3" in result.stdout
+
+    listed = fir("ls", "--all").stdout
+    assert "added in batch" not in listed
+    assert "batched" not in fir("info", id).stdout
+
+
+def test_batch_continues_past_failed_lines(tmp_path, fir):
+    id = task_id(fir, "existing")
+    ops = [
+        json.dumps({"command": "tag", "task_id": id, "tags": ["a", "b"]}),
+        # Sets the status before the priority fails to parse, the whole line is undone
+        f"modify {id} --status prog --priority notanumber",
+        json.dumps(["new", "from an array"]),
+        json.dumps({"command": "new", "task_name": "from an object", "nosuchfield": 1}),
+        "profile ls",
+    ]
+    (tmp_path / "ops.txt").write_text("\n".join(ops) + "\n")
+
+    result = fir("batch", str(tmp_path / "ops.txt"), "--continue", "--json")
+    assert result.returncode == 1
+    results = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["ok"] for r in results[:-1]] == [True, False, True, False, False]
+    assert results[-1] == {"applied": 2, "failed": 3, "saved": True}
+
+    info = fir("info", id).stdout
+    assert "a, b" in info
+    assert "todo" in info
+    assert "from an array" in fir("ls").stdout
+
+
+def test_failed_new_line_leaves_no_task(tmp_path, fir):
+    (tmp_path / "ops.txt").write_text("new broken --priority abc\nnew ok\n")
+
+    result = fir("batch", str(tmp_path / "ops.txt"), "--continue")
+    assert result.returncode == 1
+    assert "Line 1" in result.stdout
+
+    listed = fir("ls", "--all").stdout
+    assert "ok" in listed
+    assert "broken" not in listed
+
+
+def test_failed_bulk_line_is_undone(fir, python):
+    ids = [task_id(fir, name) for name in ("first", "second", "third")]
+    # The bulk line fails once on the second task, after tagging the first
+    code = ("from fir.data.profile import Profile\n"
+            "update = Profile.update_task\n"
+            "failed = []\n"
+            "def update_task(self, task):\n"
+            "    if task.name == 'second' and not failed:\n"
+            "        failed.append(task)\n"
+            "        raise RuntimeError('failed part way')\n"
+            "    update(self, task)\n"
+            "Profile.update_task = update_task\n" + FIR_MAIN)
+
+    lines = f"bulk tag x --everything\ntag {ids[0]} y\n"
+    result = python(code, "batch", "--continue", stdin=lines)
+    assert result.returncode == 1
+    assert "failed part way" in result.stdout
+
+    assert "Tags: y\n" in fir("info", ids[0]).stdout
+    for id in ids[1:]:
+        assert "Tags" not in fir("info", id).stdout
+
+
+def test_rollback_restores_tracked_changes(new_profile):
+    path = new_profile().path
+
+    profile = Profile(path)
+    profile.add_task(TaskDto("aaaaaaaa", "kept", status="todo"))
+    cp = profile.checkpoint()
+    profile.add_task(TaskDto("bbbbbbbb", "undone", status="todo"))
+    profile.set_config_value("name.truncate", "10")
+    profile.rollback(cp)
+    profile.save()
+
+    assert [t.id for t in Profile(path).data.tasks] == ["aaaaaaaa"]
+    with open(profile.journal.path) as f:
+        assert "bbbbbbbb" not in f.read()
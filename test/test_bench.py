@@ -0,0 +1,17 @@
+from bench import results
+
+
+def result(command: str, median: float) -> dict:
+    return {"mode": "in-process", "size": 100, "command": command, "wall_ms": {"median": median}}
+
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = {"results": [result("ls", 100.0), result("info", 100.0), result("new", 0.5)]}
+    current = {"results": [result("ls", 105.0), result("info", 130.0), result("new", 1.0), result("modify", 1.0)]}
+
+    rows = {r["command"]: r for r in results.compare(baseline, current, threshold=0.1)}
+
+    assert set(rows) == {"ls", "info", "new"}
+    assert not rows["ls"]["regression"]
+    assert rows["info"]["regression"]
+    assert not rows["new"]["regression"]  # doubled, but still under the absolute noise floor
@@ -0,0 +1,35 @@
+def test_bulk_changes_tasks_matching_ls_filters(fir):
+    ids = []
+    for name in ("first", "second", "third"):
+        ids.append(fir("new", name).stdout.strip().split("[")[-1].rstrip("]"))
+    fir("tag", ids[0], "release")
+    fir("tag", ids[1], "release")
+
+    # Tasks that already have the change aren't counted
+    dry = fir("bulk", "tag", "release", "--everything", "--dry-run").stdout
+    assert "Would update 1 task(s)" in dry
+    assert ids[2] in dry and ids[0] not in dry
+    invalid = fir("bulk", "status", "nosuch", "--everything")
+    assert invalid.returncode == 1 and "Invalid status provided" in invalid.stdout
+
+    dry = fir("bulk", "status", "prog", "--tag", "release", "--dry-run").stdout
+    assert "Would update 2 task(s)" in dry
+    assert ids[0] in dry and ids[1] in dry and ids[2] not in dry
+    assert "prog" not in fir("ls").stdout
+
+    assert "Updated 2 of 2" in fir("bulk", "status", "prog", "--tag", "release").stdout
+    assert "Updated 2 of 2" in fir("bulk", "assign", "alice", "--status", "prog").stdout
+    assert "No changes" in fir("bulk", "assign", "alice", "--status", "prog").stdout
+    assert "Updated 2 of 2" in fir("bulk", "rmtag", "release", "--assigned", "alice").stdout
+    assert "release" not in fir("ls").stdout
+
+    assert "Removed 2 task(s)" in fir("bulk", "rm", "--assigned", "alice").stdout
+    listed = fir("ls", "--all").stdout
+    assert "third" in listed
+    assert "first" not in listed and "second" not in listed
+
+    # Without a filter nothing changes unless asked for explicitly
+    unfiltered = fir("bulk", "rm")
+    assert unfiltered.returncode == 1 and "No filter given" in unfiltered.stdout
+    assert "third" in fir("ls", "--all").stdout
+    assert "Removed 1 task(s)" in fir("bulk", "rm", "--everything").stdout
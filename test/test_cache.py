@@ -0,0 +1,25 @@
+import os
+
+from fir.data import cache
+from fir.data.cache import SnapshotCache
+from fir.data.defaults import default_profile
+from fir.types.dtos import TaskDto
+
+
+def test_snapshot_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "profile.toml"
+    path.write_bytes(b"name = 'test'")
+
+    data = default_profile("test")
+    data.tasks = [TaskDto("aaaaaaaa", "first", status="todo", tags=["a"])]
+
+    c = SnapshotCache(str(path))
+    assert c.load(path.read_bytes()) is None
+
+    c.store(path.read_bytes(), data)
+    assert c.load(path.read_bytes()) == data
+
+    path.write_bytes(b"name = 'next'")
+    os.utime(path, ns=(0, 0))
+    assert c.load(path.read_bytes()) is None
@@ -0,0 +1,109 @@
+import random
+from datetime import datetime
+
+import pytest
+from marshmallow import ValidationError
+
+from fir.data.defaults import default_profile
+from fir.types import codec, dtos
+from fir.types.dtos import ProfileDto, SettingsDto, StatusDto, TaskDto
+
+
+def random_task(r: random.Random) -> dict:
+    task = {
+        "id": ''.join(r.choice("abcdefghXYZ0123") for _ in range(8)),
+        "name": ' '.join(r.choice(["fix", "the", "bug", "in", "fir", "ü"]) for _ in range(r.randint(1, 20))),
+        "status": r.choice(["todo", "prog", "done", ""]),
+    }
+    optional = {
+        "tags": [r.choice(["a", "b", "c"]) for _ in range(r.randint(0, 3))],
+        "added": "2023-12-01 10:00:00",
+        "modified": "2023-12-02",
+        "due": r.choice(["", "2024-01-01"]),
+        "link": "https://github.com/weavc/fir/issues/1",
+        "description": "some description",
+        "priority": r.randint(0, 999),
+        "assigned_to": [r.choice(["alice", "bob"]) for _ in range(r.randint(0, 2))],
+        "unknown": 1,
+    }
+    for key, value in optional.items():
+        if r.random() > 0.3:
+            task[key] = value
+    return task
+
+
+def random_profile(seed: int) -> dict:
+    r = random.Random(seed)
+    profile = codec.dump_profile(default_profile(f"profile {seed}", "description"))
+    profile["tasks"] = [random_task(r) for _ in range(50)]
+    profile["statuses"].append({"name": "maybe", "color": "red", "hide_by_default": r.choice(["yes", 0, True])})
+    return profile
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_codec_matches_marshmallow(seed):
+    d = random_profile(seed)
+
+    expected = ProfileDto.Schema().load(d)
+    actual = codec.load_profile(d)
+    assert actual == expected
+    assert codec.dump_profile(actual) == ProfileDto.Schema().dump(expected)
+
+
+def test_codec_dump_matches_marshmallow():
+    task = TaskDto("aaaaaaaa", "name", tags=["a", 1], priority=5)
+    status = StatusDto("todo", "red", hide_by_default=1)
+    settings = SettingsDto("default", {"default": "/tmp/default.toml"})
+
+    assert codec.dump_task(task) == TaskDto.Schema().dump(task)
+    assert codec.dump_status(status) == StatusDto.Schema().dump(status)
+    assert codec.dump_settings(settings) == SettingsDto.Schema().dump(settings)
+    assert codec.load_settings(codec.dump_settings(settings)) == SettingsDto.Schema().load(settings.__dict__)
+
+
+@pytest.mark.parametrize("task", [
+    {"name": "x", "status": "todo"},
+    {"id": "aaaaaaa", "name": "x", "status": "todo"},
+    {"id": "aaaaaaaaa", "name": "x", "status": "todo"},
+    {"id": "aaaaaaaa", "name": "x" * 251, "status": "todo"},
+    {"id": "aaaaaaaa", "name": 5, "status": "todo"},
+    {"id": "aaaaaaaa", "name": "x"},
+    {"id": "aaaaaaaa", "name": "x", "status": None},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "due": None},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "tags": "a"},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "tags": [None]},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "assigned_to": [1]},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "priority": 1000},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "priority": -1},
+    {"id": "aaaaaaaa", "name": "x", "status": "todo", "priority": None},
+])
+def test_codec_rejects_invalid_tasks(task):
+    with pytest.raises(ValidationError):
+        TaskDto.Schema().load(task)
+    with pytest.raises(codec.CodecError):
+        codec.load_task(task)
+
+
+@pytest.mark.parametrize("status", [
+    {"name": "x" * 51, "color": "red"},
+    {"name": "todo", "color": "x" * 21},
+    {"name": "todo"},
+    {"name": "todo", "color": "red", "order": 10000},
+    {"name": "todo", "color": "red", "hide_by_default": "maybe"},
+])
+def test_codec_rejects_invalid_statuses(status):
+    with pytest.raises(ValidationError):
+        StatusDto.Schema().load(status)
+    with pytest.raises(codec.CodecError):
+        codec.load_status(status)
+
+
+def test_task_dates_default_to_creation_time(monkeypatch):
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2030, 1, 2, 3, 4, 5)
+
+    monkeypatch.setattr(dtos, "datetime", Later)
+    task = TaskDto("aaaaaaaa", "created later")
+    assert task.added == task.modified == "2030-01-02 03:04:05"
@@ -0,0 +1,57 @@
+import pickle
+
+import pytest
+
+from fir.data.columnar import TaskStore, TaskStoreIdIndex, decode_date, encode_date
+from fir.types.dtos import TaskDto
+
+
+def tasks():
+    return [
+        TaskDto("aaaaaaaa", "Write docs", "todo", "", ["docs"], "2023-12-01", "2023-12-02 12:53:19", priority=5),
+        TaskDto("aabbbbbb", "Fix bug", "done", "2024-01-01", ["bug", "docs"], assigned_to=["alice"]),
+        TaskDto("cccccccc", "Release", "prog", tags=[], assigned_to=["alice", "bob"]),
+    ]
+
+
+@pytest.mark.parametrize("value", ["", "2023-12-01", "2023-12-02 12:53:19"])
+def test_date_encoding(value):
+    assert decode_date(encode_date(value)) == value
+
+
+def test_task_store_round_trip():
+    store = TaskStore.from_tasks(tasks())
+
+    assert len(store) == 3
+    assert list(store) == tasks()
+    assert list(pickle.loads(pickle.dumps(store))) == tasks()
+
+
+def test_task_store_mutations():
+    store = TaskStore.from_tasks(tasks())
+
+    task = store.get("aabbbbbb")
+    task.status = "todo"
+    task.tags.remove("docs")
+    store.update(task)
+    store.discard("aaaaaaaa")
+    store.append(TaskDto("bbbbbbbb", "New", "todo", tags=["docs"]))
+
+    assert store.get("aabbbbbb") == task
+    assert [t.id for t in store] == ["aabbbbbb", "cccccccc", "bbbbbbbb"]
+    assert list(store.compacted()) == list(store)
+
+    index = TaskStoreIdIndex(store)
+    assert index.resolve("a")[0].id == "aabbbbbb"
+    assert index.resolve("b")[0].id == "bbbbbbbb"
+    assert index.unique_prefix_length("aabbbbbb") == 1
+
+
+def test_task_store_select():
+    store = TaskStore.from_tasks(tasks())
+
+    assert store.select(tag="docs") == [0, 1]
+    assert store.select(tag="docs", hidden_statuses={"done"}) == [0]
+    assert store.select(assignee="alice", status="prog") == [2]
+    assert store.select(name="BUG") == [1]
+    assert store.select(status="unknown") == []
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fir.data.profile import Profile
+from fir.data.session import Session
+from fir.types.dtos import TaskDto
+
+CLIENT_MAIN = "import sys; sys.argv = ['fir'] + sys.argv[1:]; from fir.client import main; main()"
+
+
+def test_session_reloads_profiles_changed_elsewhere(new_profile):
+    path = new_profile().path
+
+    session = Session()
+    first = session.profile(path)
+    first.read()
+    assert session.profile(path) is first
+
+    other = Profile(path)
+    other.add_task(TaskDto(id="abcdefgh", name="elsewhere", status="todo"))
+    other.save()
+
+    second = session.profile(path)
+    assert second is not first
+    second.read()
+    assert [t.name for t in second.data.tasks] == ["elsewhere"]
+
+    second.add_task(TaskDto(id="defghijk", name="here", status="todo"))
+    second.save()
+    session.saved()
+    assert session.profile(path) is second
+
+
+@pytest.fixture
+def daemon(tmp_path, fir_env):
+    fir_env["FIR_SOCKET"] = str(tmp_path / "fir.sock")
+    process = subprocess.Popen([sys.executable, "-m", "fir.daemon"], env=fir_env, cwd=tmp_path,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(fir_env["FIR_SOCKET"]) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    yield fir_env
+    process.terminate()
+    process.wait(10)
+
+
+def test_client_runs_commands_in_the_daemon(daemon, python):
+    created = python(CLIENT_MAIN, "new", "from the client")
+    assert created.returncode == 0
+    assert "from the client" in created.stdout
+
+    status = python(CLIENT_MAIN, "daemon", "status")
+    assert "1 commands served" in status.stdout
+
+    failed = python(CLIENT_MAIN, "info", "nosuchtask")
+    assert failed.returncode == 1
+    assert "Task not found" in failed.stdout
+
+    # Saved with the usual durability, a plain in process read sees the task
+    daemon["FIR_SOCKET"] += ".missing"
+    listed = python(CLIENT_MAIN, "ls")
+    assert "from the client" in listed.stdout
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from fir.utils.files import read_toml_file, write_file_atomic, write_toml_file
+
+
+@pytest.mark.parametrize("verify", ["off", "checksum", "full"])
+def test_write_toml_file(tmp_path, verify):
+    path = str(tmp_path / "profile.toml")
+    write_toml_file(path, {"name": "test", "tasks": [{"id": "aaaaaaaa"}]}, verify=verify)
+
+    assert read_toml_file(path) == {"name": "test", "tasks": [{"id": "aaaaaaaa"}]}
+    assert os.listdir(tmp_path) == ["profile.toml"]
+
+
+def test_write_file_atomic_keeps_original_on_failed_verify(tmp_path):
+    path = str(tmp_path / "profile.toml")
+    write_toml_file(path, {"name": "test"})
+
+    with pytest.raises(SystemExit):
+        write_file_atomic(path, b"name = ", verify="full")
+
+    assert read_toml_file(path) == {"name": "test"}
+    assert os.listdir(tmp_path) == ["profile.toml"]
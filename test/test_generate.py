@@ -0,0 +1,44 @@
+import filecmp
+
+import pytest
+
+from fir.data.generate import GenerateOptions, generate_profile, generate_statuses, generate_tasks
+from fir.data.profile import Profile
+
+
+@pytest.mark.parametrize("ext", ["toml", "db"])
+def test_generate_profile(tmp_path, ext):
+    options = GenerateOptions(tasks=2500, statuses=8, tags=5, assignees=3, hidden_fraction=0.4,
+                              description_length=30, due_fraction=0.5, due_distribution="normal", seed=7)
+    path = str(tmp_path / f"generated.{ext}")
+    generate_profile(path, "generated", options)
+
+    profile = Profile(path)
+    tasks = profile.data.tasks
+    hidden = profile.get_hidden_status_names()
+
+    assert len(tasks) == 2500
+    assert len({t.id for t in tasks}) == 2500
+    assert len(profile.data.statuses) == 8
+    assert {tag for t in tasks for tag in t.tags} <= {f"tag{i}" for i in range(5)}
+    assert {a for t in tasks for a in t.assigned_to} <= {f"user{i}" for i in range(3)}
+    assert all(len(t.description) <= 30 for t in tasks)
+    assert 0.35 < sum(t.status in hidden for t in tasks) / 2500 < 0.45
+    assert 0.45 < sum(bool(t.due) for t in tasks) / 2500 < 0.55
+    assert tasks == list(generate_tasks(options, generate_statuses(options)))
+
+
+def test_generate_profile_is_deterministic(tmp_path):
+    generate_profile(str(tmp_path / "a.toml"), "a", GenerateOptions(tasks=100, seed=3))
+    generate_profile(str(tmp_path / "b.toml"), "a", GenerateOptions(tasks=100, seed=3))
+    generate_profile(str(tmp_path / "c.toml"), "a", GenerateOptions(tasks=100, seed=4))
+
+    assert filecmp.cmp(tmp_path / "a.toml", tmp_path / "b.toml", shallow=False)
+    assert not filecmp.cmp(tmp_path / "a.toml", tmp_path / "c.toml", shallow=False)
+
+
+def test_generate_rejects_invalid_options():
+    with pytest.raises(ValueError):
+        generate_tasks(GenerateOptions(hidden_fraction=1.5), generate_statuses(GenerateOptions()))
+    with pytest.raises(ValueError):
+        generate_statuses(GenerateOptions(statuses=1, hidden_fraction=0.5))
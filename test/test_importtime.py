@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs a command in a fresh interpreter & records what it imported on top of the interpreter's own start up
+RUN = """
+import json, sys
+before = set(sys.modules)
+sys.argv = ["fir"] + sys.argv[1:]
+from fir.cmd import cmd
+cmd()
+with open(OUT, "w") as f:
+    json.dump(sorted(set(sys.modules) - before), f)
+"""
+
+COMMAND_MODULES = {"fir.cmd", "fir.cmd.builder", "fir.cmd.builder.arg_parser"}
+
+# Third party packages, sqlite3 & command modules each command may import, anything new fails the test
+BASELINE = {
+    ("config", "get", "status.default"): COMMAND_MODULES | {"fir.cmd.config_commands"},
+    ("ls",): COMMAND_MODULES | {"fir.cmd.base_commands", "fir.cmd.set_commands", "tabulate", "termcolor", "wcwidth"},
+    ("new", "task"): COMMAND_MODULES | {"fir.cmd.base_commands", "fir.cmd.set_commands", "shortuuid", "termcolor"},
+    ("status", "ls"): COMMAND_MODULES | {"fir.cmd.status_commands", "tabulate", "termcolor", "wcwidth"},
+    ("profile", "ls"): COMMAND_MODULES | {"fir.cmd.profile_commands", "tabulate", "termcolor", "wcwidth"},
+}
+# Optional packages only some commands need, checked whether or not they're installed here
+DEFERRED = {"numpy"}
+
+
+def imported(home: str, argv: list[str], path: str = ROOT) -> set[str]:
+    out = os.path.join(home, "modules.json")
+    env = dict(os.environ, HOME=home, PYTHONPATH=path)
+    env.pop("POETRY_ACTIVE", None)
+    subprocess.run([sys.executable, "-c", f"OUT = {out!r}\n{RUN}", *argv], env=env, cwd=home, check=True,
+                   stdout=subprocess.DEVNULL)
+    with open(out) as f:
+        return set(json.load(f))
+
+
+def tracked(modules: set[str]) -> set[str]:
+    result = set()
+    for m in modules:
+        top = m.split(".")[0]
+        if m.startswith("fir.cmd") or m == "sqlite3":
+            result.add(m)
+        elif top != "fir" and not top.startswith("_") and top not in sys.stdlib_module_names:
+            result.add(top)
+    return result
+
+
+@pytest.fixture(scope="module")
+def home(tmp_path_factory):
+    home = str(tmp_path_factory.mktemp("home"))
+    imported(home, ["ls"])  # creates the default profile
+    return home
+
+
+@pytest.mark.parametrize("argv", BASELINE.keys())
+def test_import_set_does_not_grow(home, argv):
+    extra = tracked(imported(home, list(argv))) - BASELINE[argv]
+    assert extra == set(), f"'fir {' '.join(argv)}' now imports {sorted(extra)}, see python -X importtime"
+
+
+def test_ls_does_not_import_deferred_packages(home, tmp_path):
+    # Empty stand-ins on the path, so an import shows up even where the real package isn't installed
+    for name in DEFERRED:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "__init__.py").write_text("")
+    modules = imported(home, ["ls"], path=os.pathsep.join([ROOT, str(tmp_path)]))
+    assert modules & DEFERRED == set()
@@ -0,0 +1,51 @@
+from fir.data.index import TaskFieldIndex, TaskIdIndex
+from fir.types.dtos import TaskDto
+
+
+def test_task_id_index_resolve():
+    index = TaskIdIndex([TaskDto("abcdefgh", "a"), TaskDto("abczzzzz", "b"), TaskDto("xyz12345", "c")])
+
+    assert index.resolve("x")[0].name == "c"
+    assert index.resolve("abcd")[0].name == "a"
+    assert index.resolve("abc") == (None, "Conflicting tasks found, use full id value")
+    assert index.resolve("q") == (None, "Task not found")
+
+    index.add(TaskDto("q0000000", "d"))
+    assert index.resolve("q")[0].name == "d"
+
+    index.remove(index.get("abczzzzz"))
+    assert index.resolve("abc")[0].name == "a"
+    assert "abczzzzz" not in index
+
+
+def test_task_id_index_unique_prefix_length():
+    index = TaskIdIndex([TaskDto("abcdefgh", "a"), TaskDto("abczzzzz", "b"), TaskDto("xyz12345", "c")])
+
+    assert index.unique_prefix_length("abcdefgh") == 4
+    assert index.unique_prefix_length("abczzzzz") == 4
+    assert index.unique_prefix_length("xyz12345") == 1
+
+
+def test_task_field_index():
+    tasks = [TaskDto("aaaaaaaa", "a", status="todo", tags=["x"]),
+             TaskDto("bbbbbbbb", "b", status="done", tags=["x", "y"], assigned_to=["alice"])]
+    index = TaskFieldIndex(tasks)
+
+    assert index.lookup("tags", "x") == {"aaaaaaaa", "bbbbbbbb"}
+    assert index.lookup("status", "done") == {"bbbbbbbb"}
+
+    tasks[0].status = "done"
+    tasks[0].tags.remove("x")
+    index.update(tasks[0])
+    assert index.lookup("tags", "x") == {"bbbbbbbb"}
+    assert index.ordered(index.lookup("status", "done")) == ["aaaaaaaa", "bbbbbbbb"]
+
+    task = TaskDto("cccccccc", "c", status="todo", assigned_to=["alice"])
+    tasks.append(task)
+    index.add(task)
+    assert index.lookup("assigned_to", "alice") == {"bbbbbbbb", "cccccccc"}
+
+    tasks.remove(tasks[1])
+    index.remove(TaskDto("bbbbbbbb", "b"))
+    assert index.lookup("assigned_to", "alice") == {"cccccccc"}
+    assert index.lookup("tags", "y") == set()
@@ -0,0 +1,62 @@
+from fir.data.defaults import default_profile
+from fir.data.journal import Journal, ProfileChanges
+from fir.data.profile import Profile
+from fir.types.dtos import TaskDto
+
+
+def test_journal_replay(tmp_path):
+    path = str(tmp_path / "profile.toml")
+    data = default_profile("test")
+    data.tasks = [TaskDto("aaaaaaaa", "first"), TaskDto("bbbbbbbb", "second")]
+
+    changes = ProfileChanges()
+    changes.put_task(TaskDto("aaaaaaaa", "first renamed"))
+    changes.put_task(TaskDto("cccccccc", "third"))
+    changes.remove_task(data.tasks[1])
+    data.config["name.truncate"] = "10"
+    changes.config = True
+
+    journal = Journal(path)
+    journal.append(data, changes)
+    assert journal.count == 4
+
+    replayed = default_profile("test")
+    replayed.tasks = [TaskDto("aaaaaaaa", "first"), TaskDto("bbbbbbbb", "second")]
+    Journal(path).replay(replayed)
+
+    assert [(t.id, t.name) for t in replayed.tasks] == [("aaaaaaaa", "first renamed"), ("cccccccc", "third")]
+    assert replayed.config["name.truncate"] == "10"
+
+
+def test_journal_skips_torn_record(tmp_path):
+    path = str(tmp_path / "profile.toml")
+    journal = Journal(path)
+
+    with open(journal.path, "w") as f:
+        f.write('{"op":"rm","id":"aaaaaaaa"}\n{"op":"put","task":{"id":"bbb')
+
+    changes = ProfileChanges()
+    changes.put_task(TaskDto("cccccccc", "third"))
+    journal.append(default_profile("test"), changes)
+
+    data = default_profile("test")
+    data.tasks = [TaskDto("aaaaaaaa", "first")]
+    journal.replay(data)
+
+    assert [t.id for t in data.tasks] == ["cccccccc"]
+    assert journal.count == 2
+
+
+def test_changes_to_tasks_not_added_are_not_journaled(tmp_path):
+    path = str(tmp_path / "profile.toml")
+    profile = Profile(path, read=False)
+    profile.data = default_profile("test")
+    profile.save()
+
+    # A command that fails after setting the status of its new task, then one that succeeds in the same process
+    profile = Profile(path)
+    assert profile.set_status(TaskDto("aaaaaaaa", "broken"), "todo")
+    profile.add_task(TaskDto("bbbbbbbb", "ok", status="todo"))
+    profile.save()
+
+    assert [t.id for t in Profile(path).data.tasks] == ["bbbbbbbb"]
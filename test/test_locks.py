@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pytest
+
+from fir.data.profile import Profile
+from fir.types.dtos import StatusDto, TaskDto
+
+
+def tasks() -> list[TaskDto]:
+    return [TaskDto("aaaaaaaa", "first", status="todo"), TaskDto("bbbbbbbb", "second", status="todo")]
+
+
+@pytest.mark.parametrize("name, config", [
+    ("p.toml", {}),
+    # Every save rewrites the whole file
+    ("p.toml", {"journal.compact_threshold": "1"}),
+    ("p.db", {}),
+])
+def test_concurrent_saves_are_merged(new_profile, name, config):
+    path = new_profile(tasks(), config, name).path
+    a = Profile(path)
+    b = Profile(path)
+
+    a.add_task(TaskDto("cccccccc", "from a", status="todo"))
+    a.add_status(StatusDto("review", "yellow"))
+    a.save()
+
+    task, _ = b.get_task("aaaaaaaa")
+    task.name = "renamed by b"
+    b.update_task(task)
+    b.remove_task(b.get_task("bbbbbbbb")[0])
+    b.add_status(StatusDto("blocked", "red"))
+    b.set_config_value("name.truncate", "20")
+    b.save()
+
+    merged = Profile(path)
+    assert sorted((t.id, t.name) for t in merged.data.tasks) == [("aaaaaaaa", "renamed by b"), ("cccccccc", "from a")]
+    assert {"review", "blocked"} <= set(merged.get_status_names())
+    assert merged.data.config["name.truncate"] == "20"
+    # b now holds the merged profile, not its stale copy
+    assert sorted(t.id for t in b.data.tasks) == ["aaaaaaaa", "cccccccc"]
+
+
+def test_lock_mode_makes_other_processes_wait(new_profile, fir_env, monkeypatch):
+    path = new_profile(tasks(), {"write.concurrency": "lock"}).path
+    code = f"import time; from fir.data.profile import Profile; p = Profile({path!r}); print('read', flush=True); " \
+           "time.sleep(30)"
+    holder = subprocess.Popen([sys.executable, "-c", code], env=fir_env,
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "read"
+        monkeypatch.setenv("FIR_LOCK_TIMEOUT", "0.2")
+        with pytest.raises(SystemExit):
+            Profile(path)
+    finally:
+        holder.kill()
+        holder.wait()
+    assert len(Profile(path).data.tasks) == 2
+
+
+def test_convert_releases_the_profiles_locks(fir, python):
+    fir("profile", "create", "p", check=True)
+    fir("--scope", "p", "config", "set", "write.concurrency", "lock", check=True)
+    code = ("from fir.cmd import cmd\n"
+            "from fir.data.settings import Settings\n"
+            "from fir.utils.locks import lock_for\n"
+            "source = Settings().data.profiles['p']\n"
+            "cmd(['profile', 'convert', 'p'])\n"
+            "target = Settings().data.profiles['p']\n"
+            "print(source != target, [lock_for(f'{p}.lock').holding(True) for p in (source, target)])\n")
+
+    assert python(code, check=True).stdout.splitlines()[-1] == "True [False, False]"
@@ -0,0 +1,86 @@
+import json
+import random
+
+from fir.data import metrics
+from fir.utils.sketch import QuantileSketch
+
+DAY = 24 * 3600
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    r = random.Random(1)
+    values = [r.lognormvariate(3, 1.5) for _ in range(20000)]
+    sketch = QuantileSketch(0.01)
+    for v in values:
+        sketch.add(v)
+
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= exact * 0.01 + 1e-9
+
+
+def test_merged_sketches_match_a_single_sketch():
+    r = random.Random(2)
+    values = [r.uniform(0, 500) for _ in range(5000)]
+    whole, a, b = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, v in enumerate(values):
+        whole.add(v)
+        (a if i % 2 else b).add(v)
+
+    a.merge(b)
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(a.to_dict())))
+    for q in (0.5, 0.95, 0.99):
+        assert restored.quantile(q) == whole.quantile(q)
+    assert restored.count == whole.count
+
+
+def test_sketch_bins_are_capped():
+    sketch = QuantileSketch(0.01, max_bins=100)
+    for i in range(1, 100000):
+        sketch.add(float(i))
+    assert len(sketch.bins) <= 100
+    assert abs(sketch.quantile(0.99) - 99000) < 99000 * 0.01
+
+
+def test_size_buckets():
+    assert metrics.size_bucket(None) == "-"
+    assert metrics.size_bucket(3) == "0-10"
+    assert metrics.size_bucket(501) == "100-1k"
+    assert metrics.size_bucket(100000) == "100k-1M"
+
+
+def __write_log(path, now, days):
+    with open(path, "w") as f:
+        for i, day in enumerate(days):
+            f.write(json.dumps({"ts": now - day * DAY, "command": "list", "profile": "work", "size": 50,
+                                "exit": 0, "phases": {"profile.read": i, "total": i + 10}}) + "\n")
+        f.write("not json\n")
+
+
+def test_compact_keeps_report_totals(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    now = 1_700_000_000
+    __write_log(path, now, [40, 35, 20, 2, 1, 0])
+    before = metrics.aggregate([path])
+
+    folded, kept = metrics.compact(path, 10, now)
+    assert (folded, kept) == (3, 3)
+    with open(path) as f:
+        assert len(f.readlines()) == 3
+
+    after = metrics.aggregate([path], into=metrics.load_summary(path))
+    assert after.lines == before.lines == 6
+    assert after.skipped == before.skipped == 1
+    assert after.commands["list"].quantile(0.5) == before.commands["list"].quantile(0.5)
+    assert [p for p, _ in after.trend("list", "month")] == [p for p, _ in before.trend("list", "month")]
+
+
+def test_rotate_keeps_a_bounded_number_of_files(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    for i in range(4):
+        __write_log(path, 1_700_000_000, [i])
+        metrics.rotate(path, keep=2)
+
+    assert metrics.rotated_paths(path) == [path + ".1", path + ".2"]
+    assert metrics.aggregate(metrics.rotated_paths(path)).lines == 2
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from fir.data.defaults import default_profile
+from fir.data.profile import Profile
+from fir.data.query import Query, QueryError
+from fir.types.dtos import TaskDto
+
+
+@pytest.fixture(scope="module")
+def profile(tmp_path_factory) -> Profile:
+    r = random.Random(5)
+    p = Profile(str(tmp_path_factory.mktemp("q") / "p.toml"), read=False)
+    p.data = default_profile("p")
+    statuses = [s.name for s in p.data.statuses]
+    p.data.tasks = [TaskDto(f"t{i:04}", r.choice(["fix parser", "write docs", "Release notes", "triage"]),
+                            status=r.choice(statuses), priority=r.randint(1, 5),
+                            due=r.choice(["", "2024-01-05", "2024-02-10", "2024-03-15"]),
+                            modified=f"2024-0{r.randint(1, 3)}-1{r.randint(0, 9)} 09:30:00",
+                            tags=r.sample(["a", "b", "c", "d"], r.randint(0, 2)),
+                            assigned_to=r.sample(["ann", "bo"], r.randint(0, 1)))
+                    for i in range(400)]
+    return p
+
+
+@pytest.mark.parametrize("expression", [
+    "status = todo",
+    "status in (todo, prog) and priority <= 2",
+    "tags = a and not assigned = ann",
+    "tags in (a, b) or priority > 4",
+    "(tags = c or tags = d) and due < 2024-02-11 and due != ''",
+    "name ~ PARSER or description ~ docs",
+    "modified >= 2024-02-15 and modified <= 2024-03-12 and name !~ release",
+    "not (status = todo or tags = a) and priority in (1, 3)",
+])
+def test_planned_selection_matches_the_predicate(profile, expression):
+    query = Query(expression)
+    hidden = set() if "status" in query.fields() else profile.get_hidden_status_names()
+    expected = [t for t in profile.data.tasks if t.status not in hidden and query.match(t)]
+
+    assert query.select(profile) == expected
+
+
+def test_plan_starts_from_the_index(profile):
+    ids, residual = Query("tags = a and status = todo and priority > 2").root.plan(profile.field_index.lookup)
+    assert ids == profile.field_index.lookup("tags", "a") & profile.field_index.lookup("status", "todo")
+    assert residual is not None and residual.fields() == {"priority"}
+
+
+@pytest.mark.parametrize("expression", [
+    "", "status", "status = ", "(status = todo", "priority < soon", "tags > a", "due ~ 2024", "due < tomorrow",
+    "size = 1", "status = todo !",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(QueryError):
+        Query(expression)
@@ -0,0 +1,66 @@
+from fir.data.profile import Profile
+from fir.data.search import SearchIndex
+from fir.types.dtos import TaskDto
+
+
+TASKS = [
+    TaskDto("aaaaaaaa", "fix parser crash", status="todo", description="parser fails on empty files"),
+    TaskDto("bbbbbbbb", "write docs", status="todo", description="explain the parser options"),
+    TaskDto("cccccccc", "release notes", status="todo"),
+]
+
+
+def ids(profile: Profile, query: str) -> list[str]:
+    return [id for id, _ in profile.search_index.search(query)]
+
+
+def test_ranked_multi_term_and_prefix_queries(new_profile):
+    profile = Profile(new_profile(TASKS).path)
+
+    # Name matches rank above description matches
+    assert ids(profile, "parser") == ["aaaaaaaa", "bbbbbbbb"]
+    assert ids(profile, "parser docs") == ["bbbbbbbb"]
+    assert ids(profile, "rel*") == ["cccccccc"]
+    assert ids(profile, "rel") == []
+    assert ids(profile, "parser missing") == []
+
+
+def test_saves_keep_the_sidecar_up_to_date(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    assert ids(profile, "notes") == ["cccccccc"]
+
+    # Another process changes tasks, its save appends a delta rather than leaving the sidecar stale
+    other = Profile(path)
+    other.add_task(TaskDto("dddddddd", "release checklist", status="todo"))
+    task, _ = other.get_task("cccccccc")
+    task.name = "changelog"
+    other.update_task(task)
+    other.save()
+
+    fresh = Profile(path)
+    index, stale = SearchIndex.load(fresh.search_path, fresh.stamp(), [])
+    assert not stale
+    assert [id for id, _ in index.search("release")] == ["dddddddd"]
+    assert ids(fresh, "notes") == []
+
+
+def test_untracked_changes_are_reconciled(new_profile):
+    path = new_profile(TASKS).path
+    profile = Profile(path)
+    assert ids(profile, "docs") == ["bbbbbbbb"]
+
+    # Direct edits to the data rewrite the whole profile & can't be described as a delta
+    other = Profile(path)
+    other.data.tasks[1].name = "write manual"
+    other.save()
+
+    assert ids(Profile(path), "docs") == []
+    assert ids(Profile(path), "manual") == ["bbbbbbbb"]
+
+
+def test_search_command_limit(fir):
+    for name in ("parser crash", "parser docs"):
+        fir("new", name, check=True)
+    assert len([line for line in fir("search", "parser", "--limit", "1").stdout.splitlines() if "parser" in line]) == 1
+    assert "No matching tasks" in fir("search", "parser", "--limit", "0").stdout
@@ -0,0 +1,134 @@
+import asyncio
+import http.client
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fir.data.profile import Profile
+from fir.data.session import Session
+from fir.server import ProfileWriter, Response
+from fir.types.dtos import TaskDto
+from test.conftest import FIR_MAIN
+
+
+def test_concurrent_writes_share_saves(new_profile):
+    path = new_profile().path
+
+    session = Session(write_behind=True)
+    writer = ProfileWriter(session, path, 0.0)
+    profile = session.profile(path)
+    profile.read()
+    flushes = []
+    flush = profile.flush
+    profile.flush = lambda: (flushes.append(profile.pending), flush())
+
+    async def write(i: int):
+        def change(profile: Profile) -> Response:
+            profile.add_task(TaskDto(id=f"task{i:04d}", name=f"task {i}", status="todo"))
+            return Response(201)
+
+        return await writer.write(change)
+
+    async def main():
+        return await asyncio.gather(*[write(i) for i in range(50)])
+
+    assert {r.status for r in asyncio.run(main())} == {201}
+    assert 1 <= len(flushes) < 50
+    assert len(Profile(path).data.tasks) == 50
+
+
+def test_reads_wait_for_a_running_save(new_profile):
+    path = new_profile().path
+    session = Session(write_behind=True)
+    writer = ProfileWriter(session, path, 0.0)
+    profile = session.profile(path)
+    profile.read()
+    events = []
+    flush = profile.flush
+
+    def slow_flush():
+        events.append("flush")
+        time.sleep(0.2)
+        flush()
+        events.append("flushed")
+
+    profile.flush = slow_flush
+
+    def change(profile: Profile) -> Response:
+        profile.add_task(TaskDto(id="task0001", name="task", status="todo"))
+        return Response(201)
+
+    def read(profile: Profile) -> Response:
+        events.append("read")
+        return Response(200)
+
+    async def main():
+        write = asyncio.create_task(writer.write(change))
+        while "flush" not in events:
+            await asyncio.sleep(0.01)
+        await writer.read(read)
+        await write
+
+    asyncio.run(main())
+    assert events == ["flush", "flushed", "read"]
+
+
+@pytest.fixture
+def server(tmp_path, fir_env):
+    process = subprocess.Popen([sys.executable, "-c", FIR_MAIN, "serve", "--port", "0"],
+                               env=fir_env, cwd=tmp_path, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    port = int(line.rsplit(":", 1)[1].split("/")[0])
+    yield port
+    process.terminate()
+    process.wait(10)
+
+
+def request(port: int, method: str, path: str, body: dict = None, headers: dict = None):
+    c = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    c.request(method, path, json.dumps(body) if body is not None else None, headers or {})
+    r = c.getresponse()
+    data = r.read()
+    c.close()
+    return r.status, dict(r.getheaders()), json.loads(data) if data else None
+
+
+def test_server_task_crud_with_etags(server, fir):
+    port = server
+    status, headers, task = request(port, "POST", "/tasks", {"name": "from http", "tags": ["api"]})
+    assert status == 201
+    assert task["status"] == "todo"
+
+    status, headers, listed = request(port, "GET", "/tasks?tag=api&limit=1")
+    assert status == 200
+    assert [t["id"] for t in listed["tasks"]] == [task["id"]]
+    etag = headers["ETag"]
+    assert request(port, "GET", "/tasks?tag=api&limit=1", headers={"If-None-Match": etag})[0] == 304
+
+    status, _, updated = request(port, "PATCH", f"/tasks/{task['id'][:4]}", {"status": "prog"},
+                                 headers={"If-Match": etag})
+    assert status == 200 and updated["status"] == "prog"
+    assert request(port, "PATCH", f"/tasks/{task['id']}", {"status": "done"}, headers={"If-Match": etag})[0] == 412
+    assert request(port, "GET", "/tasks", headers={"If-None-Match": etag})[0] == 200
+    assert request(port, "POST", "/tasks", {"name": "bad", "status": "nosuch"})[0] == 400
+
+    # Saved by the time the write was answered
+    listed = fir("ls").stdout
+    assert "from http" in listed and "prog" in listed
+
+
+def test_list_order_matches_fir_ls(server, fir):
+    port = server
+    ids = [request(port, "POST", "/tasks", {"name": f"task {i}", "priority": i % 3})[2]["id"] for i in range(6)]
+    listed = fir("ls", "--sort=-priority").stdout
+    expected = [id for line in listed.splitlines() for id in ids if id in line]
+
+    _, _, first = request(port, "GET", "/tasks?sort=-priority&limit=4")
+    assert [t["id"] for t in first["tasks"]] == expected[:4]
+    _, _, rest = request(port, "GET", f"/tasks?sort=-priority&limit=4&after={first['next_after']}")
+    assert [t["id"] for t in rest["tasks"]] == expected[4:]
+    assert rest["next_after"] is None
+    assert request(port, "GET", "/tasks?sort=size")[0] == 400
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def metrics(tmp_path, fir_env):
+    fir_env["FIR_METRICS"] = str(tmp_path / "metrics.jsonl")
+
+
+def test_shell_defers_saves_until_exit(tmp_path, fir, python):
+    # Creates the default profile, the shell's own commands should then never write it
+    fir("ls")
+    python("from fir.shell import Shell; Shell(interval=60).run()", check=True,
+           stdin="new first\nnew second\ntag 00000000 x\nset status nosuch done\nexit\n")
+
+    entries = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [e["command"] for e in entries][1:3] == ["new", "new"]
+    assert not any("profile.save" in e["phases"] for e in entries[1:])
+
+    listed = fir("ls")
+    assert "first" in listed.stdout
+    assert "second" in listed.stdout
+
+
+def test_shell_completes_from_profile_data(fir, python):
+    fir("new", "a", "task")
+    code = """
+import json
+from fir.shell import Shell
+s = Shell()
+task = s.session.profile(s.session.settings().get_scoped_profile()[1])
+task.read()
+id = task.data.tasks[0].id
+print(json.dumps({
+    "commands": sorted(s.complete("", "st")),
+    "sub": sorted(s.complete("status ", "")),
+    "id": sorted(s.complete("info ", id[:2])),
+    "status": sorted(s.complete("set-status " + id + " ", "")),
+    "option": sorted(s.complete("ls --status ", "")),
+    "flags": sorted(s.complete("ls ", "-")),
+    "id_value": id,
+}))
+"""
+    result = json.loads(python(code, check=True).stdout)
+    assert {"status", "save"} <= set(result["commands"])
+    assert "ls" in result["sub"]
+    assert result["id"] == [result["id_value"]]
+    assert {"todo", "prog", "done"} <= set(result["status"])
+    assert result["option"] == result["status"]
+    assert {"--all", "--tag"} <= set(result["flags"])
+
+
+def test_shell_undoes_failed_commands(fir, python):
+    fir("new", "existing")
+    code = """
+from fir.shell import Shell
+s = Shell(interval=60)
+profile = s.session.profile(s.session.settings().get_scoped_profile()[1])
+profile.read()
+id = profile.data.tasks[0].id
+s.execute("new broken --priority abc")
+s.execute(f"modify {id} --status done --due garbage")
+s.execute("new ok")
+s.save()
+"""
+    python(code, check=True)
+
+    listed = fir("ls", "--all").stdout
+    assert "ok" in listed
+    assert "broken" not in listed
+    assert "done" not in listed
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from fir.data import sorting
+from fir.data.defaults import default_statuses
+from fir.types.dtos import TaskDto
+
+
+def tasks(n: int) -> list[TaskDto]:
+    r = random.Random(3)
+    statuses = [s.name for s in default_statuses()]
+    return [TaskDto(f"t{i:05}", f"task {r.randint(0, 50)}", status=r.choice(statuses), priority=r.randint(1, 5),
+                    due=r.choice(["", "2024-01-02", "2024-03-01"]),
+                    modified=f"2024-01-{r.randint(10, 28)} 12:{r.randint(10, 59)}:00")
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("spec", ["status", "status,priority,due,-modified", "-name,-due", "-priority,added"])
+def test_limited_pages_match_a_full_sort(spec):
+    ts = tasks(500)
+    key = sorting.sort_key(spec, default_statuses())
+    ordered = sorted(ts, key=key)
+
+    rows, total = sorting.page(ts, key, limit=20, offset=40)
+    assert rows == ordered[40:60]
+    assert total == 500
+
+    # Continuing after the last row of a page gives the next page
+    rows, total = sorting.page(ts, key, limit=20, after=rows[-1].id)
+    assert rows == ordered[60:80]
+    assert total == 500 - 60
+
+
+def test_descending_dates_keep_missing_last():
+    ts = [TaskDto("a", "a", due=""), TaskDto("b", "b", due="2024-01-02"), TaskDto("c", "c", due="2024-05-01")]
+    rows, _ = sorting.page(ts, sorting.sort_key("-due", []))
+    assert [t.id for t in rows] == ["c", "b", "a"]
+
+
+def test_equal_keys_keep_the_profile_order():
+    ts = [TaskDto("c", "c", status="todo"), TaskDto("a", "a", status="todo"), TaskDto("b", "b", status="prog")]
+    key = sorting.sort_key(sorting.DEFAULT_SORT, default_statuses())
+    assert [t.id for t in sorting.page(ts, key)[0]] == ["b", "c", "a"]
+    assert [t.id for t in sorting.page(ts, key, limit=1, after="c")[0]] == ["a"]
+
+
+def test_ls_lists_same_status_tasks_in_the_order_they_were_added(fir):
+    names = [f"task {i}" for i in range(8)]
+    for name in names:
+        fir("new", name, check=True)
+    assert [n for line in fir("ls").stdout.splitlines() for n in names if n in line] == names
+
+
+def test_unknown_field():
+    with pytest.raises(ValueError):
+        sorting.sort_key("status,size", default_statuses())
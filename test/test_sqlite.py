@@ -0,0 +1,31 @@
+from fir.data.defaults import default_profile
+from fir.data.journal import ProfileChanges
+from fir.data.sqlite import SqliteStore
+from fir.types.dtos import TaskDto
+from fir.utils.files import is_sqlite_path
+
+
+def test_is_sqlite_path():
+    assert is_sqlite_path("/tmp/work.db")
+    assert is_sqlite_path("/tmp/work.SQLITE")
+    assert not is_sqlite_path("/tmp/work.toml")
+
+
+def test_sqlite_store(tmp_path):
+    store = SqliteStore(str(tmp_path / "profile.db"))
+    data = default_profile("test", "description")
+    data.tasks = [TaskDto("aaaaaaaa", "first", status="todo", tags=["a", "b"]), TaskDto("bbbbbbbb", "second")]
+    store.write(data)
+
+    assert store.read() == data
+
+    changes = ProfileChanges()
+    data.tasks[0].assigned_to.append("alice")
+    changes.put_task(data.tasks[0])
+    changes.remove_task(data.tasks[1])
+    data.tasks.pop()
+    data.tasks.append(TaskDto("cccccccc", "third"))
+    changes.put_task(data.tasks[1])
+    store.commit(data, changes)
+
+    assert store.read() == data
@@ -0,0 +1,65 @@
+from tabulate import tabulate
+
+from fir.data.profile import Profile
+from fir.types.dtos import TaskDto
+from fir.utils import display_width, truncate
+from fir.utils.logging.logger import Logger
+from fir.utils.logging.profile_logging import SAMPLE_ROWS, ProfileLoggingExtensions
+
+COLUMNS = ["description", "link", "due", "priority", "assigned", "tags"]
+CONFIG = {f"enable.column.{column}": "true" for column in COLUMNS}
+
+
+def render(profile: Profile, capsys) -> list[str]:
+    capsys.readouterr()
+    ProfileLoggingExtensions(Logger(), profile).log_task_table(list(profile.data.tasks))
+    return capsys.readouterr().out.splitlines()
+
+
+def test_matches_tabulate(new_profile, capsys):
+    tasks = [TaskDto(f"id{i:06}", "task " + "x" * (i * 7), status=["todo", "prog", "done", "gone"][i % 4],
+                     description="d" * i, priority=i * 50 + 1, assigned_to=["me"] * (i % 2), tags=["a", "b"][:i % 3])
+             for i in range(12)]
+    profile = new_profile(tasks, CONFIG)
+
+    order = {s.name: s.order for s in profile.data.statuses}
+    tasks = sorted(tasks, key=lambda t: order.get(t.status, 1000))
+    table = [[t.id, truncate(t.name, 50), t.status, t.description, t.link, t.due, t.priority,
+              ", ".join(t.assigned_to), ", ".join(t.tags)] for t in tasks]
+    headers = ["Id", "Task", "Status", "Description", "Link", "Due Date", "Priority", "Assigned To", "Tags"]
+
+    assert render(profile, capsys) == tabulate(table, headers=headers).splitlines()
+
+
+def test_rows_past_the_sample_line_up(new_profile, capsys):
+    tasks = [TaskDto(f"id{i:06}", "short", status="todo") for i in range(SAMPLE_ROWS)]
+    tasks.append(TaskDto("long0000", "y" * 80, status="todo"))
+    profile = new_profile(tasks, CONFIG)
+
+    lines = render(profile, capsys)
+    assert len(lines) == SAMPLE_ROWS + 3
+    assert len({line.index("todo") for line in lines[2:]}) == 1
+
+
+def test_wide_characters_match_tabulate(new_profile, capsys):
+    tasks = [TaskDto("id000001", "修复解析器崩溃", status="todo", description="ok", tags=["🚀", "b"]),
+             TaskDto("id000002", "plain", status="todo", description="описание 説明", tags=["a"]),
+             TaskDto("id000003", "emoji 🐛🐛", status="prog", description="", tags=[])]
+    profile = new_profile(tasks, {"enable.column.description": "true", "enable.column.tags": "true"})
+
+    table = [[t.id, t.name, t.status, t.description, ", ".join(t.tags)] for t in [tasks[2], tasks[0], tasks[1]]]
+    assert render(profile, capsys) == \
+        tabulate(table, headers=["Id", "Task", "Status", "Description", "Tags"]).splitlines()
+
+
+def test_cells_past_the_sample_are_cut_to_their_column(new_profile, capsys):
+    tasks = [TaskDto(f"id{i:06}", "short", status="todo", description="d", due="2024-01-01")
+             for i in range(SAMPLE_ROWS)]
+    tasks.append(TaskDto("long0000", "长" * 80, status="todo", description="x" * 200, due="2024-01-01",
+                         tags=["界" * 30]))
+    profile = new_profile(tasks, CONFIG)
+
+    lines = render(profile, capsys)
+    assert len({display_width(line[:line.index("2024-01-01")]) for line in lines[2:]}) == 1
+    assert "x" * 200 not in lines[-1]
+    assert lines[-1].endswith("界...")
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from fir.utils import timings
+
+
+@pytest.fixture
+def enabled():
+    timings.enable()
+    timings.reset()
+    yield
+    timings.enabled = False
+    timings.reset()
+
+
+def test_disabled_spans_are_shared_noops():
+    assert timings.span("a") is timings.NOOP
+    with timings.span("a"):
+        pass
+    assert timings.phases() == {}
+
+
+def test_spans_are_totalled_in_start_order(enabled):
+    with timings.span("command"):
+        with timings.span("read"):
+            pass
+        with timings.span("read"):
+            pass
+
+    assert list(timings.phases()) == ["command", "read"]
+    lines = timings.report().splitlines()
+    assert lines[1].startswith("command")
+    assert lines[2].startswith("  read")
+    assert lines[2].split()[-1] == "2"
+
+
+def test_metrics_env_appends_a_line_per_invocation(tmp_path, fir_env, fir):
+    metrics = tmp_path / "metrics.jsonl"
+    fir_env["FIR_METRICS"] = str(metrics)
+    for argv in (["ls"], ["config", "get", "status.default"]):
+        fir(*argv, check=True)
+
+    entries = [json.loads(line) for line in metrics.read_text().splitlines()]
+    assert [e["command"] for e in entries] == ["list", "config get"]
+    assert entries[0]["profile"] == "default"
+    assert entries[0]["size"] == 0
+    assert entries[0]["exit"] == 0
+    assert {"import", "settings", "argparse", "command", "profile.read", "total"} <= set(entries[0]["phases"])